@@ -18,18 +18,29 @@ from dumper import SourceLineDumper, SourceStatementDumper
 from linenumbers import DeclarationLineNumberFinder, EndStatementLineNumberFinder, FirstDocumentationLineFinder, LastSpecificationLineFinder, AllLineFinder,\
     LastUseLineFinder, ContainsLineFinder
 from useprinter import UsedModuleNamePrinter, UsedFileNamePrinter
-from assembler import GNUx86AssemblerCallGraphBuilder
+from assembler import GNUx86AssemblerCallGraphBuilder, GlobalAssemblerCallGraphBuilder, ObjectFileCallGraphBuilder, GlobalObjectFileCallGraphBuilder,\
+    CallGraphInfoCallGraphBuilder, GlobalCallGraphInfoCallGraphBuilder
+from assemblercalls import AssemblerCallTable
+from objectcalls import ObjectFileCallTable
+from callgraphinfo import CallGraphInfoTable
+from fileindex import FileNameIndex
+from moduleindex import ModuleFileIndex
+from parsecache import SourceFileCache
 from treecache import CachedAssemblerCallGraphBuilder
 from fcgconfigurator import loadFortranCallGraphConfiguration, CFG_SOURCE_DIRS, CFG_ASSEMBLER_DIRS, CFG_SPECIAL_MODULE_FILES,\
     CFG_CACHE_DIR, CFG_SOURCE_FILES_PREPROCESSED, CFG_EXCLUDE_MODULES, CFG_IGNORE_GLOBALS_FROM_MODULES, CFG_IGNORE_DERIVED_TYPES,\
-    CFG_ABSTRACT_TYPES, CFG_ALWAYS_FULL_TYPES
-from printout import printErrorAndExit
+    CFG_ABSTRACT_TYPES, CFG_ALWAYS_FULL_TYPES, CFG_CACHE_MEMORY_LIMIT, CFG_CALL_GRAPH_FILES
+from printout import printErrorAndExit, printLine, printWarning
 
 GRAPH_PRINTERS = {'tree': 'in a tree-like form',
                   'dot': 'in DOT format for Graphviz',
                   'list-subroutines': 'only list subroutines',
                   'list-modules': 'only list modules containing subroutines from the call graph',
                   'list-files': 'only list files containing subroutines from the call graph'}
+CALL_GRAPH_BUILDERS = {'assembler': (AssemblerCallTable, GNUx86AssemblerCallGraphBuilder, GlobalAssemblerCallGraphBuilder),
+                       'objects': (ObjectFileCallTable, ObjectFileCallGraphBuilder, GlobalObjectFileCallGraphBuilder),
+                       'callgraphinfo': (CallGraphInfoTable, CallGraphInfoCallGraphBuilder, GlobalCallGraphInfoCallGraphBuilder)}
+
 def graphPrinter(key, sourceFiles):
     if key not in GRAPH_PRINTERS: raise KeyError('No such CallGraphPrinter: ' + str(key))
     elif key == 'tree': return TreeLikeCallGraphPrinter()
@@ -95,6 +106,8 @@ def parseArguments():
     actionArg.add_argument('-d', '--dump', choices=SUBROUTINE_DUMPER.keys(), help='Dump subroutine or module source code (' + optionHelp(SUBROUTINE_DUMPER) + '). When no subroutine is given, the whole module is dumped.');
     actionArg.add_argument('-l', '--line', choices=LINE_NUMBER_FINDER.keys(), help='Show some interesting source lines of the subroutine (' + optionHelp(LINE_NUMBER_FINDER) + ').');
     actionArg.add_argument('-u', '--use', choices=USE_PRINTERS.keys(), help='Prints use dependencies of a subroutine (' + optionHelp(USE_PRINTERS) + ').');
+    actionArg.add_argument('-x', '--index', action="store_true", help='Parse all source files in parallel and store the results in the cache directory. No module name needed.');
+    actionArg.add_argument('-cr', '--cacheReport', action="store_true", help='Print hit rates and saved parse time of the source file cache for the recorded runs. No module name needed.');
     argParser.add_argument('-v', '--variable', type=str, help='Restrict the analysis to the given variable which has to be a subroutine argument and of a derived type. Applicable with -a arguments.');
     argParser.add_argument('-ml', '--maxLevel', type=int, help='Limits depth of callgraph output. Applicable with -p.');
     argParser.add_argument('-po', '--pointersOnly', action="store_true", help='Limit result output to pointer variables. Applicable with -a.');
@@ -103,7 +116,10 @@ def parseArguments():
     argParser.add_argument('-q', '--quiet', action="store_true", help='Reduce the output. Applicable with -a and -l.');
     argParser.add_argument('-i', '--ignore', type=str, help='Leave out subroutines matching a given regular expression. Applicable with -p and -a.');
     argParser.add_argument('-cf', '--configFile', type=str, help='Import configuration from this file.');
-    argParser.add_argument('module', help='Module name');
+    argParser.add_argument('-g', '--globalGraph', action="store_true", help='Extract the call graph from a call graph of the whole program, built from all assembler files in parallel. Applicable with -p or -a.');
+    argParser.add_argument('-ob', '--objectFiles', action="store_true", help='Build the call graph from the object files (.o) in the assembler directories instead of the assembler files, overrides CALL_GRAPH_FILES of the config file. Applicable with -p or -a.');
+    argParser.add_argument('-j', '--jobs', type=int, help='Number of parallel processes, default: number of cores. Applicable with -x or -g.');
+    argParser.add_argument('module', nargs='?', default=None, help='Module name');
     argParser.add_argument('subroutine', nargs='?', default=None, help='Subroutine or function name');
     return argParser.parse_args();
 
@@ -113,18 +129,50 @@ def main():
     if config is None:
         exit(3)
 
-    graphBuilder = GNUx86AssemblerCallGraphBuilder(config[CFG_ASSEMBLER_DIRS], config[CFG_SPECIAL_MODULE_FILES])
+    sourceFileIndex = FileNameIndex(config[CFG_SOURCE_DIRS], config[CFG_CACHE_DIR], 'source')
+    moduleIndex = ModuleFileIndex(sourceFileIndex, config[CFG_CACHE_DIR])
+    assemblerFileIndex = FileNameIndex(config[CFG_ASSEMBLER_DIRS], config[CFG_CACHE_DIR], 'assembler')
+    callGraphFiles = 'objects' if args.objectFiles else config[CFG_CALL_GRAPH_FILES]
+    callTableClass, builderClass, globalBuilderClass = CALL_GRAPH_BUILDERS[callGraphFiles]
+    callTable = callTableClass(config[CFG_CACHE_DIR])
+    if args.globalGraph:
+        graphBuilder = globalBuilderClass(config[CFG_ASSEMBLER_DIRS], config[CFG_SPECIAL_MODULE_FILES], moduleIndex, callTable, args.jobs, assemblerFileIndex)
+    else:
+        graphBuilder = builderClass(config[CFG_ASSEMBLER_DIRS], config[CFG_SPECIAL_MODULE_FILES], moduleIndex, callTable, fileIndex = assemblerFileIndex)
     if config[CFG_CACHE_DIR]:
         graphBuilder = CachedAssemblerCallGraphBuilder(config[CFG_CACHE_DIR], graphBuilder)
-    sourceFiles = SourceFiles(config[CFG_SOURCE_DIRS], config[CFG_SPECIAL_MODULE_FILES], config[CFG_SOURCE_FILES_PREPROCESSED])
+    parseCache = None
+    if config[CFG_CACHE_DIR]:
+        parseCache = SourceFileCache(config[CFG_CACHE_DIR])
+    memoryLimit = None
+    if config[CFG_CACHE_MEMORY_LIMIT]:
+        memoryLimit = int(config[CFG_CACHE_MEMORY_LIMIT] * 1024 * 1024)
+    sourceFiles = SourceFiles(config[CFG_SOURCE_DIRS], config[CFG_SPECIAL_MODULE_FILES], config[CFG_SOURCE_FILES_PREPROCESSED], sourceFileIndex, moduleIndex, parseCache, memoryLimit)
     excludeModules = config[CFG_EXCLUDE_MODULES]
     ignoreGlobalsFromModules = config[CFG_IGNORE_GLOBALS_FROM_MODULES]
     ignoreDerivedTypes = config[CFG_IGNORE_DERIVED_TYPES]
     alwaysFullTypes = config[CFG_ALWAYS_FULL_TYPES]
     abstractTypes = config[CFG_ABSTRACT_TYPES]
     
+    if args.index:
+        if parseCache is None:
+            printErrorAndExit(11, 'No ' + CFG_CACHE_DIR + ' configured!')
+        sourceFileIndex.refresh()
+        moduleIndex.refresh()
+        parsed, cached = sourceFiles.parseAll(args.jobs)
+        parseCache.saveStatistics()
+        printLine('Parsed ' + str(parsed) + ' source files, ' + str(cached) + ' already cached.')
+        return
+    elif args.cacheReport:
+        if parseCache is None:
+            printErrorAndExit(11, 'No ' + CFG_CACHE_DIR + ' configured!')
+        parseCache.printReport()
+        return
+    
     moduleName = args.module
     subroutineName = args.subroutine
+    if moduleName is None:
+        printErrorAndExit(12, 'Missing Module name!')
     subroutineFullName = None
     sourceFileName = None
     
@@ -209,6 +257,11 @@ def main():
     elif args.use is not None:
         printer = usePrinter(args.use, sourceFiles, excludeModules)
         printer.printUses(subroutineFullName)
+        
+    if parseCache is not None:
+        parseCache.saveStatistics()
+    if sourceFiles.getEvictionCount() > 0:
+        printWarning(str(sourceFiles.getEvictionCount()) + ' parsed source files dropped from memory, consider raising ' + CFG_CACHE_MEMORY_LIMIT, 'SourceFiles')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,19 +1,35 @@
 # coding=utf8
 
 import os.path;
-import re
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from source import SubroutineFullName, InnerSubroutineName
 from callgraph import CallGraph
 from assertions import assertType, assertTypeAll
 from supertypes import CallGraphBuilder
 from printout import printWarning
+from moduleindex import ModuleFileIndex
+from assemblercalls import AssemblerCallTable
+from objectcalls import ObjectFileCallTable
+from callgraphinfo import CallGraphInfoTable
+from fileindex import FileNameIndex
 
 class GNUx86AssemblerCallGraphBuilder(CallGraphBuilder):
     
     FILE_SUFFIX = '.s'
+    COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz')
+    FILE_SUFFIXES = ('.s', '.s.gz', '.s.bz2', '.s.xz')
 
-    def __init__(self, baseDirs, specialModuleFiles = {}):
+    PREFETCH_THREADS = 4
+
+    def __init__(self, baseDirs, specialModuleFiles = {}, moduleIndex = None, callTable = None, threads = None, fileIndex = None):
+        '''threads: Number of threads reading the assembler files of callees in advance, 0 means that all files are read one after another
+           fileIndex: FileNameIndex of the base directories, used instead of walking through them for every module'''
         assertType(specialModuleFiles, 'specialModuleFiles', dict)
+        assertType(moduleIndex, 'moduleIndex', ModuleFileIndex, True)
+        assertType(callTable, 'callTable', AssemblerCallTable, True)
+        assertType(threads, 'threads', int, True)
+        assertType(fileIndex, 'fileIndex', FileNameIndex, True)
        
         if isinstance(baseDirs, str):
             baseDirs = [baseDirs]
@@ -23,6 +39,14 @@ class GNUx86AssemblerCallGraphBuilder(CallGraphBuilder):
                 raise IOError("Not a directory: " + baseDir);
         
         self.__baseDirs = baseDirs
+        self.__moduleIndex = moduleIndex
+        if callTable is None:
+            callTable = AssemblerCallTable()
+        self.__callTable = callTable
+        if threads is None:
+            threads = GNUx86AssemblerCallGraphBuilder.PREFETCH_THREADS
+        self.__threads = threads
+        self.__fileIndex = fileIndex
         self.setSpecialModuleFiles(specialModuleFiles)
         
     def setSpecialModuleFiles(self, specialModuleFiles):
@@ -36,52 +60,106 @@ class GNUx86AssemblerCallGraphBuilder(CallGraphBuilder):
         assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)     
         ### clear only for compatibility ### 
         
+        return self.buildCallGraphWithSources(rootSubroutine)[0]
+    
+    def buildCallGraphWithSources(self, rootSubroutine, knownCalls = None):
+        '''Returns the call graph and a dictionary subroutine name => path of the assembler file its calls were read from, None if there is no file.
+           knownCalls: dictionary subroutine name => (list of calls, assembler file path), e.g. from a cached call graph, the files of these subroutines are not read.'''
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
+        assertType(knownCalls, 'knownCalls', dict, True)
+        if knownCalls is None:
+            knownCalls = dict()
+        
         callGraph = CallGraph();
-        self.__buildCallGraphRecursive(rootSubroutine, callGraph);
-        return callGraph;
+        sources = dict()
+        if self.__threads > 0:
+            with ThreadPoolExecutor(self.__threads) as executor:
+                self.__buildCallGraph(rootSubroutine, callGraph, sources, knownCalls, executor)
+        else:
+            self.__buildCallGraph(rootSubroutine, callGraph, sources, knownCalls, None)
+        return (callGraph, sources)
         
-    def __buildCallGraphRecursive(self, rootSubroutine, callGraph, oldFilePath = None):
-        if rootSubroutine in callGraph:
-            return;
-        else:      
-            callGraph.addSubroutine(rootSubroutine);
-            filePath = self.__getSubroutinesFilePath(rootSubroutine)
-            if filePath is None:
-                filePath = oldFilePath
-            if filePath is None:
-                printWarning('No Assembler file to start with for subroutine: ' + str(rootSubroutine), 'GNUx86AssemblerCallGraphBuilder')
-                return;
-            elif not os.path.isfile(filePath):
-                filename = os.path.basename(filePath).lower()
-                directory = os.path.dirname(filePath)
-                foundFile = False
-                for dirFile in os.listdir(directory):
-                    if dirFile.lower() == filename:
-                        filePath = os.path.join(directory, dirFile)
-                        foundFile = True
-                        break
-                if not foundFile:
-                    printWarning('Assembler file not found for subroutine: ' + str(rootSubroutine) + '. Expected: ' + filePath, 'GNUx86AssemblerCallGraphBuilder')
-                return;
-            else:  
-                for callTriple in self.__findCalledSubroutines(rootSubroutine, filePath):
-                    calledSubroutine = callTriple[0]
-                    lineNumber = callTriple[1]
-                    discriminator = callTriple[2]
-                    callGraph.addCall(rootSubroutine, calledSubroutine, lineNumber, discriminator);
-                    self.__buildCallGraphRecursive(calledSubroutine, callGraph, filePath);
+    def __buildCallGraph(self, rootSubroutine, callGraph, sources, knownCalls, executor):
+        '''Depth-first traversal with an explicit stack of pending calls instead of recursion, so deep call chains don't hit the recursion limit.
+           The assembler files of newly discovered callees are read by the executor while the traversal goes on.
+           Subroutines and calls are added to the call graph in the same order as by a recursive traversal.'''
+        modulePaths = dict()
+        prefetched = dict()
+        callGraph.addSubroutine(rootSubroutine)
+        calls, filePath = self.__expand(rootSubroutine, None, modulePaths, prefetched, knownCalls, executor)
+        sources[rootSubroutine] = filePath
+        stack = [(rootSubroutine, iter(calls), filePath)]
+        while stack:
+            subroutine, calls, filePath = stack[-1]
+            callTriple = next(calls, None)
+            if callTriple is None:
+                stack.pop()
+                continue
+            calledSubroutine, lineNumber, discriminator = callTriple
+            callGraph.addCall(subroutine, calledSubroutine, lineNumber, discriminator);
+            if calledSubroutine not in callGraph:
+                callGraph.addSubroutine(calledSubroutine);
+                calls, calleesFilePath = self.__expand(calledSubroutine, filePath, modulePaths, prefetched, knownCalls, executor)
+                sources[calledSubroutine] = calleesFilePath
+                stack.append((calledSubroutine, iter(calls), calleesFilePath))
+                        
+    def __expand(self, subroutine, oldFilePath, modulePaths, prefetched, knownCalls, executor):
+        '''Returns the calls of the subroutine and the path of its assembler file'''
+        if subroutine in knownCalls:
+            return knownCalls[subroutine]
+        filePath = self.__getSubroutinesFilePath(subroutine, modulePaths)
+        if filePath is None:
+            filePath = oldFilePath
+        if filePath is None:
+            printWarning('No Assembler file to start with for subroutine: ' + str(subroutine), 'GNUx86AssemblerCallGraphBuilder')
+            return ([], None)
+        elif not os.path.isfile(filePath):
+            filename = os.path.basename(filePath).lower()
+            directory = os.path.dirname(filePath)
+            foundFile = False
+            for dirFile in os.listdir(directory):
+                if dirFile.lower() == filename:
+                    filePath = os.path.join(directory, dirFile)
+                    foundFile = True
+                    break
+            if not foundFile:
+                printWarning('Assembler file not found for subroutine: ' + str(subroutine) + '. Expected: ' + filePath, 'GNUx86AssemblerCallGraphBuilder')
+            return ([], filePath)
+        else:
+            if prefetched.get(filePath) is not None:
+                prefetched[filePath].result()
+            prefetched[filePath] = None
+            calls = self.__findCalledSubroutines(subroutine, filePath)
+            if executor is not None:
+                for calledSubroutine, _, _ in calls:
+                    if calledSubroutine not in knownCalls:
+                        self.__prefetch(self.__getSubroutinesFilePath(calledSubroutine, modulePaths), prefetched, executor)
+            return (calls, filePath)
+            
+    def __prefetch(self, filePath, prefetched, executor):
+        '''Lets the executor read the assembler file, unless this has been done before'''
+        if filePath is not None and filePath not in prefetched and os.path.isfile(filePath):
+            prefetched[filePath] = executor.submit(self.__callTable.getFunctions, filePath)
         
-    def __getSubroutinesFilePath(self, subroutine):
+    def __getSubroutinesFilePath(self, subroutine, modulePaths):
+        '''modulePaths: Dictionary with the module file paths found so far'''
         moduleName = subroutine.getModuleName()
         if moduleName is None:
             return None 
         
-        return self.getModuleFilePath(moduleName);
+        if moduleName not in modulePaths:
+            modulePaths[moduleName] = self.getModuleFilePath(moduleName)
+        return modulePaths[moduleName]
     
     def getModuleFilePath(self, moduleName):
         assertType(moduleName, 'moduleName', str)
 
         fileNameCandidates = self.__getModuleFileNameCandidates(moduleName)            
+        if not fileNameCandidates:
+            return None
+        fileNameCandidates += [fileName + suffix for suffix in self.COMPRESSION_SUFFIXES for fileName in fileNameCandidates]
+        if self.__fileIndex is not None:
+            return self.__fileIndex.findFirstFile(fileNameCandidates)
         for baseDir in self.__baseDirs:
             for root, _, files in os.walk(baseDir):
                 for name in files:
@@ -95,70 +173,179 @@ class GNUx86AssemblerCallGraphBuilder(CallGraphBuilder):
         candidates = []
         if moduleName in self.__specialModuleFiles:
             fileName = self.__specialModuleFiles[moduleName]
-            fileName = fileName[:fileName.rfind('.')] + GNUx86AssemblerCallGraphBuilder.FILE_SUFFIX
+            fileName = fileName[:fileName.rfind('.')] + self.FILE_SUFFIX
             candidates.append(fileName)
-        candidates.append(moduleName + '.s')                                              
-        candidates.append(moduleName + '_mod.s')                                                   
-        candidates.append(moduleName.replace('_mod', '') + '.s')                                                   
+        elif self.__moduleIndex is not None:
+            fileName = self.__moduleIndex.findModuleFileName(moduleName)
+            if fileName is not None:
+                candidates.append(fileName[:fileName.rfind('.')].lower() + self.FILE_SUFFIX)
+                return candidates
+        candidates.append(moduleName + self.FILE_SUFFIX)                                              
+        candidates.append(moduleName + '_mod' + self.FILE_SUFFIX)                                                   
+        candidates.append(moduleName.replace('_mod', '') + self.FILE_SUFFIX)                                                   
         return candidates    
     
+    def getBaseDirs(self):
+        return self.__baseDirs
+    
+    def getCallTable(self):
+        return self.__callTable
+    
+    def getFileIndex(self):
+        return self.__fileIndex
+    
     def __findCalledSubroutines(self, subroutine, filePath):
-        ompRegEx = re.compile(r'^.*[^a-z0-9_](?P<omp>[a-z0-9_]+\._omp_fn\.\d+).*$', re.IGNORECASE);
-        
-        openFile = open(filePath);
-        calls = []
-        inFunction = False 
         if isinstance(subroutine, InnerSubroutineName):
             hostForInnerSubroutines = subroutine.getHostName()
         else:
             hostForInnerSubroutines = subroutine
-        lines = openFile.readlines()
-        for i, line in enumerate(lines):
-            line = line.strip();
-             
-            if line == str(subroutine) + ':':
-                inFunction = True
-            elif line == '.cfi_endproc':
-                inFunction = False
-             
-            if inFunction:
-                if line.startswith('call\t'):
-                    callee = line.replace('call\t', '', 1)
-                    atPos = callee.find('@')
-                    if atPos >= 0:
-                        callee = callee[:atPos] 
-                    hashtagPos = callee.find('#')
-                    if hashtagPos >= 0:
-                        callee = callee[:(hashtagPos - 1)] 
-                    callee = callee.strip()
-                    
-                    if SubroutineFullName.validFullName(callee):
-                        calls.append((SubroutineFullName(callee),) + self.__findLineNumberAndDiscriminator(lines, i))
-                    elif InnerSubroutineName.validInnerSubroutineName(callee):
-                        calls.append((InnerSubroutineName(callee, hostForInnerSubroutines),) + self.__findLineNumberAndDiscriminator(lines, i))
-                    elif callee == 'GOMP_parallel':
-                        lineBefore = lines[i - 1].strip()
-                        ompRegExMatch = ompRegEx.match(lineBefore)
-                        if ompRegExMatch is not None:
-                            ompRegion = ompRegExMatch.group('omp')
-                            calls += self.__findCalledSubroutines(ompRegion, filePath)
-        openFile.close();            
-        return calls             
-
-    def __findLineNumberAndDiscriminator(self, lines, startLine):
-        lineNumber = -1;
-        discriminator = 0;
-        regEx = re.compile(r'^\s*\.loc\s*\d+\s*(?P<linenumber>\d+)\s*\d+\s*(((basic_block)|(prologue_end)|(epilogue_begin)|(is_stmt)|(isa))\s*\d*\s*)*(discriminator\s*(?P<discriminator>\d+))?.*$');
-        i = startLine
-        for i in range(startLine, 0, -1):
-            regExMatch = regEx.match(lines[i]);
-            if regExMatch is not None:
-                lineNumber = (int) (regExMatch.group('linenumber'))
-                if (regExMatch.group('discriminator') is not None):
-                    discriminator = (int) (regExMatch.group('discriminator'))
-                break
+        return GNUx86AssemblerCallGraphBuilder.resolveCalls(self.__callTable.getFunctions(filePath), str(subroutine), hostForInnerSubroutines)
+    
+    @staticmethod
+    def resolveCalls(functions, functionLabel, hostForInnerSubroutines):
+        '''Returns the calls of the function with the given label as list of tuples (subroutineName, lineNumber, discriminator).
+           functions is a table of AssemblerCallTable, calls from OpenMP regions are included.'''
+        calls = []
+        for callee, lineNumber, discriminator in functions.get(functionLabel, []):
+            if lineNumber is None:
+                calls += GNUx86AssemblerCallGraphBuilder.resolveCalls(functions, callee, hostForInnerSubroutines)
+            elif SubroutineFullName.validFullName(callee):
+                calls.append((SubroutineFullName(callee), lineNumber, discriminator))
+            else:
+                calls.append((InnerSubroutineName(callee, hostForInnerSubroutines), lineNumber, discriminator))
+        return calls
+    
+    def findAllFilePaths(self):
+        '''Returns the paths of all assembler files in the base directories'''
+        if self.__fileIndex is not None:
+            return [path for path in self.__fileIndex.getPaths() if path.endswith(self.FILE_SUFFIXES)]
+        paths = []
+        for baseDir in self.__baseDirs:
+            for root, _, files in os.walk(baseDir):
+                for name in files:
+                    if name.endswith(self.FILE_SUFFIXES):
+                        paths.append(os.path.join(root, name))
+        return paths
+    
+class GlobalAssemblerCallGraphBuilder(GNUx86AssemblerCallGraphBuilder):
+    '''Parses all assembler files in the base directories with a pool of processes and merges their calls into one call graph of the whole program.
+       The call graph of a subroutine is extracted from it. Subroutines are looked up by their labels, not by the names of the module files.'''
+    
+    def __init__(self, baseDirs, specialModuleFiles = {}, moduleIndex = None, callTable = None, processes = None, fileIndex = None):
+        assertType(processes, 'processes', int, True)
+        super(GlobalAssemblerCallGraphBuilder, self).__init__(baseDirs, specialModuleFiles, moduleIndex, callTable, fileIndex = fileIndex)
+        
+        self.__processes = processes
+        self.__globalCallGraph = None
+        self.__functionFiles = dict()
+        
+    def buildCallGraph(self, rootSubroutine, clear = False):
+        '''clear: Reread the assembler files changed since the global call graph was built'''
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
+        
+        globalCallGraph = self.getGlobalCallGraph(clear)
+        if rootSubroutine not in globalCallGraph:
+            printWarning('No Assembler function found for subroutine: ' + str(rootSubroutine), 'GlobalAssemblerCallGraphBuilder')
+            callGraph = CallGraph()
+            callGraph.addSubroutine(rootSubroutine)
+            return callGraph
+        
+        return globalCallGraph.extractSubgraph(rootSubroutine)
+    
+    def buildCallGraphWithSources(self, rootSubroutine, knownCalls = None):  # @UnusedVariable
+        '''Returns the call graph and a dictionary subroutine name => path of the assembler file its calls were read from.
+           knownCalls is ignored, all files are read anyway for the global call graph.'''
+        callGraph = self.buildCallGraph(rootSubroutine)
+        sources = dict()
+        for subroutine in callGraph:
+            if isinstance(subroutine, InnerSubroutineName):
+                sources[subroutine] = self.__functionFiles.get(str(subroutine.getHostName()))
+            else:
+                sources[subroutine] = self.__functionFiles.get(str(subroutine))
+        return (callGraph, sources)
+    
+    def getGlobalCallGraph(self, clear = False):
+        if self.__globalCallGraph is None or clear:
+            self.__globalCallGraph = self.__buildGlobalCallGraph()
+        return self.__globalCallGraph
+    
+    def __buildGlobalCallGraph(self):
+        tables = self.__readAllFiles()
+        functionFiles = dict()
+        for path in sorted(tables.keys()):
+            for label in tables[path]:
+                if label not in functionFiles and SubroutineFullName.validFullName(label):
+                    functionFiles[label] = path
+        self.__functionFiles = functionFiles
         
-        return (lineNumber, discriminator)
+        callGraph = CallGraph()
+        added = set()
+        for label, path in functionFiles.items():
+            subroutine = SubroutineFullName(label)
+            self.__addFunction(callGraph, added, subroutine, subroutine, tables[path])
+        return callGraph
+    
+    def __addFunction(self, callGraph, added, subroutine, hostForInnerSubroutines, functions):
+        added.add(subroutine)
+        if subroutine not in callGraph:
+            callGraph.addSubroutine(subroutine)
+        for callee, lineNumber, discriminator in GNUx86AssemblerCallGraphBuilder.resolveCalls(functions, str(subroutine), hostForInnerSubroutines):
+            if callee not in callGraph:
+                callGraph.addSubroutine(callee)
+            callGraph.addCall(subroutine, callee, lineNumber, discriminator)
+            if isinstance(callee, InnerSubroutineName) and callee not in added:
+                self.__addFunction(callGraph, added, callee, hostForInnerSubroutines, functions)
+    
+    def __readAllFiles(self):
+        callTable = self.getCallTable()
+        tasks = [(path, callTable.getCacheDir(), type(callTable)) for path in self.findAllFilePaths()]
+        tables = dict()
+        pool = multiprocessing.Pool(self.__processes)
+        try:
+            for path, functions in pool.imap_unordered(_readAssemblerFile, tasks, chunksize = 4):
+                tables[path] = functions
+        finally:
+            pool.close()
+            pool.join()
+        return tables
+
+def _readAssemblerFile(task):
+    path, cacheDir, callTableClass = task
+    try:
+        return (path, callTableClass(cacheDir).getFunctions(path))
+    except (IOError, UnicodeDecodeError, ValueError) as e:
+        printWarning('Cannot read ' + path + ': ' + str(e), 'GlobalAssemblerCallGraphBuilder')
+        return (path, dict())
+    
+class ObjectFileCallGraphBuilder(GNUx86AssemblerCallGraphBuilder):
+    '''Builds the call graph from the ELF object files (.o) compiled with gfortran -c -g -O0 instead of assembler files, see ObjectFileCallTable'''
+    
+    FILE_SUFFIX = '.o'
+    COMPRESSION_SUFFIXES = ()
+    FILE_SUFFIXES = ('.o', )
+    
+    def __init__(self, baseDirs, specialModuleFiles = {}, moduleIndex = None, callTable = None, threads = None, fileIndex = None):
+        if callTable is None:
+            callTable = ObjectFileCallTable()
+        super(ObjectFileCallGraphBuilder, self).__init__(baseDirs, specialModuleFiles, moduleIndex, callTable, threads, fileIndex)
+    
+class GlobalObjectFileCallGraphBuilder(GlobalAssemblerCallGraphBuilder, ObjectFileCallGraphBuilder):
+    '''Builds the call graph of the whole program from all object files in the base directories, see GlobalAssemblerCallGraphBuilder'''
+    
+class CallGraphInfoCallGraphBuilder(GNUx86AssemblerCallGraphBuilder):
+    '''Builds the call graph from the call graph files (.ci) compiled with gfortran -c -g -O0 -fcallgraph-info instead of assembler files, see CallGraphInfoTable'''
+    
+    FILE_SUFFIX = '.ci'
+    COMPRESSION_SUFFIXES = ()
+    FILE_SUFFIXES = ('.ci', )
+    
+    def __init__(self, baseDirs, specialModuleFiles = {}, moduleIndex = None, callTable = None, threads = None, fileIndex = None):
+        if callTable is None:
+            callTable = CallGraphInfoTable()
+        super(CallGraphInfoCallGraphBuilder, self).__init__(baseDirs, specialModuleFiles, moduleIndex, callTable, threads, fileIndex)
+    
+class GlobalCallGraphInfoCallGraphBuilder(GlobalAssemblerCallGraphBuilder, CallGraphInfoCallGraphBuilder):
+    '''Builds the call graph of the whole program from all call graph files in the base directories, see GlobalAssemblerCallGraphBuilder'''
     
 class FromAssemblerCallGraphBuilder(GNUx86AssemblerCallGraphBuilder):
     '''DEPRECATED: exists only for compatiblity with older version'''
@@ -0,0 +1,244 @@
+import os
+import re
+import bz2
+import gzip
+import lzma
+import json
+import hashlib
+from itertools import chain
+from assertions import assertType
+from source import SubroutineFullName, InnerSubroutineName
+from printout import printWarning
+from linestore import LineStore
+
+class AssemblerCallTable(object):
+    '''Table of the calls in the functions of assembler files. Every file is read only once, the table maps each function label
+       to a list of tuples (callee, lineNumber, discriminator). Calls of GOMP_parallel are listed as (ompRegion, None, None),
+       ompRegion being the label of the outlined OpenMP function. Only calls of valid subroutine names are listed.
+       Assembler files compressed with gzip, bzip2 or xz are decompressed while they are read.
+       The tables are kept in memory and, if a cache directory is given, stored there.
+       Stored tables are valid as long as size and modification time of the assembler file are unchanged,
+       or, if only the modification time has changed, as long as the content hash is unchanged.'''
+
+    SUB_DIR = 'assembler'
+    FILE_SUFFIX = '.calls'
+    FORMAT_VERSION = 1
+    COMPRESSED_FILE_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+    READ_CHUNK_SIZE = 1 << 22
+
+    ATTR_VERSION = 'version'
+    ATTR_PATH = 'path'
+    ATTR_SIZE = 'size'
+    ATTR_MTIME = 'mtime'
+    ATTR_HASH = 'hash'
+    ATTR_FUNCTIONS = 'functions'
+
+    __LOC_REG_EX = re.compile(r'^\s*\.loc\s*\d+\s*(?P<linenumber>\d+)\s*\d+\s*(((basic_block)|(prologue_end)|(epilogue_begin)|(is_stmt)|(isa))\s*\d*\s*)*(discriminator\s*(?P<discriminator>\d+))?.*$')
+    __OMP_REG_EX = re.compile(r'^.*[^a-z0-9_](?P<omp>[a-z0-9_]+\._omp_fn\.\d+).*$', re.IGNORECASE)
+    # Lines with a call (1), a .loc directive (2), the end of a function (3) or a label (4), leading and trailing blanks are not part of the groups.
+    # Labels containing blanks or colons are skipped, they can't be function names. The line break before the line is part of the match,
+    # so the search can skip quickly to the next line.
+    __SCAN_PATTERN = rb'[ \t\f\v]*(?:(call\t[^\n]*)|(\.loc[^\n]*)|(\.cfi_endproc)[ \t\r\f\v]*$|([^.\s:][^\s:]*):[ \t\r\f\v]*$)'
+    __SCAN_REG_EX = re.compile(rb'\n' + __SCAN_PATTERN, re.MULTILINE)
+    __SCAN_FIRST_LINE_REG_EX = re.compile(__SCAN_PATTERN, re.MULTILINE)
+
+    def __init__(self, cacheDir = None):
+        assertType(cacheDir, 'cacheDir', str, True)
+
+        self.__cacheDir = cacheDir
+        self.__tables = dict()
+
+    def getCacheDir(self):
+        return self.__cacheDir
+
+    def getCalls(self, filePath, functionLabel):
+        '''Returns the list of calls in the function with the given label, see class description'''
+        assertType(filePath, 'filePath', str)
+        assertType(functionLabel, 'functionLabel', str)
+
+        return self.getFunctions(filePath).get(functionLabel, [])
+
+    def getFunctions(self, filePath):
+        '''Returns the complete table of the file: function label => list of calls'''
+        assertType(filePath, 'filePath', str)
+
+        stat = os.stat(filePath)
+        entry = self.__tables.get(filePath)
+        if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            functions = self.__load(filePath, stat)
+            if functions is None:
+                functions = self.parseFile(filePath)
+                self.__save(filePath, stat, functions)
+            entry = (stat.st_size, stat.st_mtime_ns, functions)
+            self.__tables[filePath] = entry
+        return entry[2]
+
+    def clear(self):
+        '''Drops the tables held in memory'''
+        self.__tables = dict()
+
+    @staticmethod
+    def parseFile(filePath):
+        '''Scans the memory-mapped assembler file, or the decompressed chunks of a compressed one, and returns the dictionary function label => list of calls.
+           Only lines with labels, calls, .loc and .cfi_endproc directives are looked at, the .loc position is tracked while going forward.'''
+        opener = AssemblerCallTable.COMPRESSED_FILE_OPENERS.get(os.path.splitext(filePath)[1].lower())
+        if opener is not None:
+            with opener(filePath, 'rb') as openFile:
+                return AssemblerCallTable.__scan(AssemblerCallTable.__readChunks(openFile))
+        lineStore = LineStore(filePath)
+        try:
+            buf = lineStore.getBuffer()
+            return AssemblerCallTable.__scan([(buf, None, len(buf))])
+        finally:
+            lineStore.close()
+
+    @staticmethod
+    def __readChunks(openFile):
+        '''Yields tuples (buf, start, end): Lines from the line break at start (None for the first chunk) to end have to be scanned.
+           The last complete line of a chunk is kept at the beginning of the next one, so the line before each scanned line is available.'''
+        buf = b''
+        start = None
+        while True:
+            data = openFile.read(AssemblerCallTable.READ_CHUNK_SIZE)
+            buf += data
+            if data:
+                end = buf.rfind(b'\n')
+                if end <= (-1 if start is None else start):
+                    continue
+            else:
+                end = len(buf)
+            yield (buf, start, end)
+            if not data:
+                return
+            lineStart = buf.rfind(b'\n', 0, end) + 1
+            buf = buf[lineStart:]
+            start = end - lineStart
+
+    @staticmethod
+    def __scan(chunks):
+        functions = dict()
+        activeCalls = []
+        location = (-1, 0)
+        for buf, start, end in chunks:
+            pendingLocs = []
+            firstLine = None
+            if start is None:
+                firstLine = AssemblerCallTable.__SCAN_FIRST_LINE_REG_EX.match(buf, 0, end)
+                matches = AssemblerCallTable.__SCAN_REG_EX.finditer(buf, 0, end)
+            else:
+                matches = AssemblerCallTable.__SCAN_REG_EX.finditer(buf, start, end)
+            if firstLine is not None:
+                matches = chain((firstLine, ), matches)
+            for regExMatch in matches:
+                call, loc, endproc, label = regExMatch.groups()
+                if label is not None:
+                    calls = functions.setdefault(label.decode(), [])
+                    if not any(calls is active for active in activeCalls):
+                        activeCalls.append(calls)
+                elif endproc is not None:
+                    activeCalls = []
+                elif loc is not None:
+                    if regExMatch is not firstLine:
+                        pendingLocs.append(regExMatch)
+                elif activeCalls:
+                    if pendingLocs:
+                        location = AssemblerCallTable.__parseLocs(buf, pendingLocs, location)
+                        pendingLocs = []
+                    call = AssemblerCallTable.__parseCall(call.decode(), buf, regExMatch.start(1), location)
+                    if call is not None:
+                        for calls in activeCalls:
+                            calls.append(call)
+            if pendingLocs:
+                location = AssemblerCallTable.__parseLocs(buf, pendingLocs, location)
+        return functions
+
+    @staticmethod
+    def __parseLocs(buf, locMatches, location):
+        '''Returns line number and discriminator of the last valid .loc directive, .loc directives are only parsed when a call follows'''
+        for locMatch in reversed(locMatches):
+            regExMatch = AssemblerCallTable.__LOC_REG_EX.match(buf[locMatch.start() + 1:locMatch.end()].decode())
+            if regExMatch is not None:
+                discriminator = regExMatch.group('discriminator')
+                return (int(regExMatch.group('linenumber')), int(discriminator) if discriminator is not None else 0)
+        return location
+
+    @staticmethod
+    def __parseCall(line, buf, callStart, location):
+        callee = line.replace('call\t', '', 1)
+        atPos = callee.find('@')
+        if atPos >= 0:
+            callee = callee[:atPos]
+        hashtagPos = callee.find('#')
+        if hashtagPos >= 0:
+            callee = callee[:(hashtagPos - 1)]
+        callee = callee.strip()
+
+        if SubroutineFullName.validFullName(callee) or InnerSubroutineName.validInnerSubroutineName(callee):
+            return (callee, ) + location
+        elif callee == 'GOMP_parallel':
+            lineStart = buf.rfind(b'\n', 0, callStart) + 1
+            lineBefore = buf[buf.rfind(b'\n', 0, max(lineStart - 1, 0)) + 1:lineStart].decode().strip()
+            ompRegExMatch = AssemblerCallTable.__OMP_REG_EX.match(lineBefore)
+            if ompRegExMatch is not None:
+                return (ompRegExMatch.group('omp'), None, None)
+        return None
+
+    @staticmethod
+    def hashFile(filePath):
+        sha = hashlib.sha1()
+        with open(filePath, 'rb') as openFile:
+            for block in iter(lambda: openFile.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def __load(self, filePath, stat):
+        cacheFilePath = self.__getCacheFilePath(filePath)
+        if cacheFilePath is None or not os.path.isfile(cacheFilePath):
+            return None
+
+        try:
+            with open(cacheFilePath) as cacheFile:
+                ser = json.load(cacheFile)
+        except ValueError:
+            printWarning('Ignoring corrupt cache file: ' + cacheFilePath, 'AssemblerCallTable')
+            return None
+
+        if ser.get(AssemblerCallTable.ATTR_VERSION) != AssemblerCallTable.FORMAT_VERSION or ser.get(AssemblerCallTable.ATTR_PATH) != filePath \
+                or ser.get(AssemblerCallTable.ATTR_SIZE) != stat.st_size:
+            return None
+        functions = dict((label, [tuple(call) for call in calls]) for label, calls in ser[AssemblerCallTable.ATTR_FUNCTIONS].items())
+        if ser.get(AssemblerCallTable.ATTR_MTIME) != stat.st_mtime_ns:
+            contentHash = AssemblerCallTable.hashFile(filePath)
+            if ser.get(AssemblerCallTable.ATTR_HASH) != contentHash:
+                return None
+            self.__save(filePath, stat, ser[AssemblerCallTable.ATTR_FUNCTIONS], contentHash)
+        return functions
+
+    def __save(self, filePath, stat, functions, contentHash = None):
+        cacheFilePath = self.__getCacheFilePath(filePath)
+        if cacheFilePath is None:
+            return
+        if contentHash is None:
+            contentHash = AssemblerCallTable.hashFile(filePath)
+
+        ser = dict()
+        ser[AssemblerCallTable.ATTR_VERSION] = AssemblerCallTable.FORMAT_VERSION
+        ser[AssemblerCallTable.ATTR_PATH] = filePath
+        ser[AssemblerCallTable.ATTR_SIZE] = stat.st_size
+        ser[AssemblerCallTable.ATTR_MTIME] = stat.st_mtime_ns
+        ser[AssemblerCallTable.ATTR_HASH] = contentHash
+        ser[AssemblerCallTable.ATTR_FUNCTIONS] = functions
+
+        directory = os.path.dirname(cacheFilePath)
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        tmpFilePath = cacheFilePath + '.' + str(os.getpid())
+        with open(tmpFilePath, 'w') as outFile:
+            json.dump(ser, outFile)
+        os.replace(tmpFilePath, cacheFilePath)
+
+    def __getCacheFilePath(self, filePath):
+        if self.__cacheDir is None:
+            return None
+        key = hashlib.sha1(os.path.abspath(filePath).encode('utf-8')).hexdigest()
+        return os.path.join(self.__cacheDir, self.SUB_DIR, key + AssemblerCallTable.FILE_SUFFIX)
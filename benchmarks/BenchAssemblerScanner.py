@@ -0,0 +1,173 @@
+#!/usr/bin/python
+
+'''
+Measures the time needed to extract the calls of all functions from assembler files with
+ - the former implementation (readlines() and a backward search for the .loc directive of every call, once per function),
+ - a single pass over the lines of the file,
+ - AssemblerCallTable.parseFile (single regular expression scan of the memory-mapped file).
+All three must produce identical call tables.
+Without arguments the .s files of the test samples and a synthetic file are used.
+
+Usage: BenchAssemblerScanner.py [REPETITIONS [ASSEMBLER_FILE ...]]
+'''
+
+import os
+import re
+import sys
+import glob
+import time
+import random
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SubroutineFullName, InnerSubroutineName
+from assemblercalls import AssemblerCallTable
+
+SAMPLE_FILES = FCG_DIR + '/tests/samples/*/*.s'
+
+LOC_REG_EX = re.compile(r'^\s*\.loc\s*\d+\s*(?P<linenumber>\d+)\s*\d+\s*(((basic_block)|(prologue_end)|(epilogue_begin)|(is_stmt)|(isa))\s*\d*\s*)*(discriminator\s*(?P<discriminator>\d+))?.*$')
+OMP_REG_EX = re.compile(r'^.*[^a-z0-9_](?P<omp>[a-z0-9_]+\._omp_fn\.\d+).*$', re.IGNORECASE)
+
+def parseCallee(line):
+    callee = line.replace('call\t', '', 1)
+    atPos = callee.find('@')
+    if atPos >= 0:
+        callee = callee[:atPos]
+    hashtagPos = callee.find('#')
+    if hashtagPos >= 0:
+        callee = callee[:(hashtagPos - 1)]
+    return callee.strip()
+
+def referenceFindCalls(functionLabel, filePath):
+    openFile = open(filePath)
+    calls = []
+    inFunction = False
+    lines = openFile.readlines()
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line == functionLabel + ':':
+            inFunction = True
+        elif line == '.cfi_endproc':
+            inFunction = False
+        if inFunction and line.startswith('call\t'):
+            callee = parseCallee(line)
+            if SubroutineFullName.validFullName(callee) or InnerSubroutineName.validInnerSubroutineName(callee):
+                calls.append((callee, ) + referenceFindLineNumberAndDiscriminator(lines, i))
+            elif callee == 'GOMP_parallel':
+                ompRegExMatch = OMP_REG_EX.match(lines[i - 1].strip())
+                if ompRegExMatch is not None:
+                    calls.append((ompRegExMatch.group('omp'), None, None))
+    openFile.close()
+    return calls
+
+def referenceFindLineNumberAndDiscriminator(lines, startLine):
+    lineNumber = -1
+    discriminator = 0
+    regEx = re.compile(LOC_REG_EX.pattern)
+    for i in range(startLine, 0, -1):
+        regExMatch = regEx.match(lines[i])
+        if regExMatch is not None:
+            lineNumber = int(regExMatch.group('linenumber'))
+            if regExMatch.group('discriminator') is not None:
+                discriminator = int(regExMatch.group('discriminator'))
+            break
+    return (lineNumber, discriminator)
+
+def findLabels(filePath):
+    with open(filePath) as openFile:
+        return [line.strip()[:-1] for line in openFile if line.strip().endswith(':') and not line.strip().startswith('.')]
+
+def reference(filePath):
+    return dict((label, referenceFindCalls(label, filePath)) for label in findLabels(filePath))
+
+def lineByLine(filePath):
+    functions = dict()
+    activeCalls = []
+    location = (-1, 0)
+    lineBefore = ''
+    with open(filePath) as openFile:
+        for i, rawLine in enumerate(openFile):
+            line = rawLine.strip()
+            if line.endswith(':') and not line.startswith('.'):
+                calls = functions.setdefault(line[:-1], [])
+                if not any(calls is active for active in activeCalls):
+                    activeCalls.append(calls)
+            elif line == '.cfi_endproc':
+                activeCalls = []
+            elif i > 0 and '.loc' in line:
+                regExMatch = LOC_REG_EX.match(rawLine)
+                if regExMatch is not None:
+                    discriminator = regExMatch.group('discriminator')
+                    location = (int(regExMatch.group('linenumber')), int(discriminator) if discriminator is not None else 0)
+            if activeCalls and line.startswith('call\t'):
+                callee = parseCallee(line)
+                if SubroutineFullName.validFullName(callee) or InnerSubroutineName.validInnerSubroutineName(callee):
+                    for calls in activeCalls:
+                        calls.append((callee, ) + location)
+                elif callee == 'GOMP_parallel':
+                    ompRegExMatch = OMP_REG_EX.match(lineBefore)
+                    if ompRegExMatch is not None:
+                        for calls in activeCalls:
+                            calls.append((ompRegExMatch.group('omp'), None, None))
+            lineBefore = line
+    return functions
+
+def writeSyntheticFile(filePath, functions, callsPerFunction):
+    '''Writes an assembler file resembling -O0 output: long functions with a .loc directive before every call and some filler instructions'''
+    random.seed(functions)
+    with open(filePath, 'w') as assemblerFile:
+        for f in range(functions):
+            name = '__synthetic_MOD_f%d' % f
+            assemblerFile.write('\t.type\t%s, @function\n%s:\n.LFB%d:\n\t.loc 1 %d 5\n\t.cfi_startproc\n' % (name, name, f, f * 1000))
+            for c in range(callsPerFunction):
+                assemblerFile.write('\t.loc 1 %d 7 is_stmt 0 discriminator %d\n' % (f * 1000 + c, c % 3))
+                for _ in range(random.randint(3, 12)):
+                    assemblerFile.write('\tmovq\t-%d(%%rbp), %%rax\n' % random.randint(8, 512))
+                assemblerFile.write('\tcall\t__synthetic_MOD_f%d@PLT\n' % random.randrange(functions))
+            assemblerFile.write('\tret\n\t.cfi_endproc\n.LFE%d:\n\t.size\t%s, .-%s\n' % (f, name, name))
+
+def measure(function, filePath, repetitions):
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function(filePath)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+def bench(name, filePaths, repetitions):
+    for filePath in filePaths:
+        expected = reference(filePath)
+        if lineByLine(filePath) != expected or AssemblerCallTable.parseFile(filePath) != expected:
+            print('%s: call tables differ from reference implementation!' % filePath)
+            sys.exit(1)
+
+    times = [sum(measure(function, filePath, repetitions) for filePath in filePaths) for function in (reference, lineByLine, AssemblerCallTable.parseFile)]
+    size = sum(os.path.getsize(filePath) for filePath in filePaths)
+    print('%-24s %5d files %10d bytes %10.4fs (reference) %10.4fs (line by line) %10.4fs (current) %8.1fx %6.1fx' %
+          (name, len(filePaths), size, times[0], times[1], times[2], times[0] / times[2], times[1] / times[2]))
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    filePaths = sys.argv[2:]
+
+    if filePaths:
+        for filePath in filePaths:
+            bench(os.path.basename(filePath), [filePath], repetitions)
+    else:
+        bench('test samples', sorted(glob.glob(SAMPLE_FILES)), repetitions)
+        tmpDir = tempfile.mkdtemp()
+        try:
+            syntheticFile = os.path.join(tmpDir, 'synthetic.s')
+            writeSyntheticFile(syntheticFile, 100, 200)
+            bench('synthetic', [syntheticFile], 1)
+        finally:
+            os.remove(syntheticFile)
+            os.rmdir(tmpDir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+'''
+Measures CachedAssemblerCallGraphBuilder with many overlapping root subroutines: the time to build the call graphs of all roots,
+to load them again, and the size of the CallGraphStore compared to the JSON serializations of all call graphs, which were stored
+in one file per root before. Every loaded call graph must equal the one built from scratch.
+
+Usage: BenchCallGraphStore.py [MODULES [FUNCTIONS_PER_MODULE [ROOTS]]]
+'''
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SubroutineFullName
+from assembler import GNUx86AssemblerCallGraphBuilder
+from assemblercalls import AssemblerCallTable
+from treecache import CachedAssemblerCallGraphBuilder, CallGraphStore
+from BenchIncrementalTreeCache import writeModule
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start, result)
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    functions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    roots = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    tmpDir = tempfile.mkdtemp()
+    try:
+        assemblerDir = os.path.join(tmpDir, 'assembler')
+        cacheDir = os.path.join(tmpDir, 'cache')
+        os.makedirs(assemblerDir)
+        for module in range(modules):
+            writeModule(assemblerDir, module, modules, functions, module)
+        rootNames = [SubroutineFullName('__m%d_MOD_f%d' % (i % modules, i % functions)) for i in range(roots)]
+
+        def buildAll():
+            builder = CachedAssemblerCallGraphBuilder(cacheDir, GNUx86AssemblerCallGraphBuilder(assemblerDir, callTable = AssemblerCallTable(cacheDir)))
+            return [builder.buildCallGraph(root) for root in rootNames]
+
+        duration, callGraphs = timed(buildAll)
+        print('%d modules, %d functions each, %d roots with %d subroutines on average' % (modules, functions, roots, sum(len(c.getAllSubroutineNames()) for c in callGraphs) // roots))
+        print('%-28s %10.4fs' % ('build all', duration))
+        duration, loaded = timed(buildAll)
+        print('%-28s %10.4fs' % ('load all', duration))
+
+        builder = GNUx86AssemblerCallGraphBuilder(assemblerDir)
+        jsonSize = 0
+        for root, callGraph in zip(rootNames, loaded):
+            serialized = json.dumps(builder.buildCallGraph(root).serialize())
+            if json.dumps(callGraph.serialize()) != serialized:
+                print(str(root) + ': call graph differs from the one built from scratch!')
+                sys.exit(1)
+            jsonSize += len(serialized)
+        storePath = os.path.join(cacheDir, CallGraphStore.getFileName(AssemblerCallTable.SUB_DIR))
+        storeSize = sum(os.path.getsize(storePath + suffix) for suffix in ('', '-wal') if os.path.isfile(storePath + suffix))
+        print('%-28s %10.1f MB' % ('JSON call graphs', jsonSize / 1048576.0))
+        print('%-28s %10.1f MB' % ('CallGraphStore', storeSize / 1048576.0))
+    finally:
+        shutil.rmtree(tmpDir)
+
+if __name__ == "__main__":
+    main()
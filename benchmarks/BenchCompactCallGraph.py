@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+'''
+Compares CallGraph and CompactCallGraph for a large synthetic call graph: the time and memory needed to build them,
+the time for depth-first traversals from distinct subroutines, and the time for a JSON serialization round trip.
+Both must yield the same reachable subroutines and the same call graph after the round trip.
+
+Usage: BenchCompactCallGraph.py [SUBROUTINES [CALLS_PER_SUBROUTINE [TRAVERSALS]]]
+'''
+
+import os
+import sys
+import json
+import time
+import random
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SubroutineFullName
+from callgraph import CallGraph
+from compactcallgraph import CompactCallGraph
+
+def syntheticCalls(subroutines, calls):
+    rand = random.Random(0)
+    names = [SubroutineFullName('__m%d_MOD_f%d' % (i // 50, i)) for i in range(subroutines)]
+    callSites = [(caller, names[rand.randrange(subroutines)], 10 * line, rand.randrange(2)) for caller in names for line in range(calls)]
+    return (names, callSites)
+
+def buildCallGraph(names, callSites):
+    callGraph = CallGraph()
+    for name in names:
+        callGraph.addSubroutine(name)
+    for caller, callee, lineNumber, discriminator in callSites:
+        callGraph.addCall(caller, callee, lineNumber, discriminator)
+    return callGraph
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    duration = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (duration, size, result)
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start, result)
+
+def traverseCallGraph(callGraph, roots):
+    return [list(callGraph.extractSubgraph(root).getAllSubroutineNames()) for root in roots]
+
+def traverseCompactCallGraph(compact, roots):
+    return [compact.getReachableSubroutineNames(root) for root in roots]
+
+def roundTrip(graph):
+    return graph.deserialize(json.loads(json.dumps(graph.serialize())))
+
+def main():
+    subroutines = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    traversals = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    names, callSites = syntheticCalls(subroutines, calls)
+    print('%d subroutines, %d calls' % (subroutines, len(callSites)))
+
+    duration, size, callGraph = measure(buildCallGraph, names, callSites)
+    print('%-36s %10.4fs %10.1f MB' % ('build CallGraph', duration, size / 1048576.0))
+    duration, size, compact = measure(CompactCallGraph.fromCallGraph, callGraph)
+    print('%-36s %10.4fs %10.1f MB' % ('convert to CompactCallGraph', duration, size / 1048576.0))
+    print('%-36s %10.4fs' % ('convert back to CallGraph', timed(compact.toCallGraph)[0]))
+
+    roots = random.Random(1).sample(names, traversals)
+    duration, expected = timed(traverseCallGraph, callGraph, roots)
+    print('%-36s %10.4fs' % ('traverse CallGraph', duration))
+    duration, result = timed(traverseCompactCallGraph, compact, roots)
+    print('%-36s %10.4fs' % ('traverse CompactCallGraph', duration))
+    if result != expected:
+        print('Reachable subroutines differ!')
+        sys.exit(1)
+
+    serialized = json.dumps(callGraph.serialize())
+    print('%-36s %10.4fs %10.1f MB JSON' % ('serialize CallGraph', timed(roundTrip, callGraph)[0], len(serialized) / 1048576.0))
+    duration, compactCopy = timed(roundTrip, compact)
+    print('%-36s %10.4fs %10.1f MB JSON' % ('serialize CompactCallGraph', duration, len(json.dumps(compact.serialize())) / 1048576.0))
+    if json.dumps(compactCopy.toCallGraph().serialize()) != serialized:
+        print('Call graph differs after serialization!')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
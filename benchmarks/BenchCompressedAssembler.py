@@ -0,0 +1,65 @@
+#!/usr/bin/python
+
+'''
+Measures the throughput of AssemblerCallTable.parseFile for plain assembler files (memory-mapped)
+and for files compressed with gzip, bzip2 and xz (decompressed in chunks while scanning).
+Throughput is given in MB of uncompressed assembler code per second. All variants must produce identical call tables.
+Without arguments a synthetic file is used.
+
+Usage: BenchCompressedAssembler.py [REPETITIONS [ASSEMBLER_FILE ...]]
+'''
+
+import os
+import sys
+import bz2
+import gzip
+import lzma
+import time
+import shutil
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assemblercalls import AssemblerCallTable
+from BenchAssemblerScanner import writeSyntheticFile, measure
+
+COMPRESSIONS = (('gzip', '.gz', gzip), ('bzip2', '.bz2', bz2), ('xz', '.xz', lzma))
+
+def bench(filePath, tmpDir, repetitions):
+    size = os.path.getsize(filePath)
+    expected = AssemblerCallTable.parseFile(filePath)
+    duration = measure(AssemblerCallTable.parseFile, filePath, repetitions)
+    print('%-24s %-6s %12d bytes %10.4fs %8.1f MB/s' % (os.path.basename(filePath), 'plain', size, duration, size / duration / 1e6))
+
+    with open(filePath, 'rb') as plainFile:
+        content = plainFile.read()
+    for name, suffix, compression in COMPRESSIONS:
+        compressedFilePath = os.path.join(tmpDir, os.path.basename(filePath) + suffix)
+        with compression.open(compressedFilePath, 'wb') as compressedFile:
+            compressedFile.write(content)
+        if AssemblerCallTable.parseFile(compressedFilePath) != expected:
+            print('%s: call table differs from the one of the plain file!' % compressedFilePath)
+            sys.exit(1)
+        duration = measure(AssemblerCallTable.parseFile, compressedFilePath, repetitions)
+        print('%-24s %-6s %12d bytes %10.4fs %8.1f MB/s' % (os.path.basename(filePath), name, os.path.getsize(compressedFilePath), duration, size / duration / 1e6))
+        os.remove(compressedFilePath)
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    filePaths = sys.argv[2:]
+
+    tmpDir = tempfile.mkdtemp()
+    try:
+        if not filePaths:
+            syntheticFile = os.path.join(tmpDir, 'synthetic.s')
+            writeSyntheticFile(syntheticFile, 200, 200)
+            filePaths = [syntheticFile]
+        for filePath in filePaths:
+            bench(filePath, tmpDir, repetitions)
+    finally:
+        shutil.rmtree(tmpDir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+
+'''
+Compares the cost of looking up module files by walking the source directories (as SourceFiles does without index)
+with the cost of building, loading and querying a FileNameIndex.
+
+Usage: BenchFileIndex.py [DIRECTORIES [FILES_PER_DIRECTORY [MODULES]]]
+'''
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from fileindex import FileNameIndex
+
+def createTree(baseDir, directories, filesPerDirectory):
+    moduleNames = []
+    for d in range(directories):
+        directory = os.path.join(baseDir, 'dir' + str(d // 10), 'sub' + str(d))
+        os.makedirs(directory)
+        for f in range(filesPerDirectory):
+            moduleName = 'mo_module_' + str(d) + '_' + str(f)
+            moduleNames.append(moduleName)
+            open(os.path.join(directory, moduleName + '.f90'), 'w').close()
+    return moduleNames
+
+def candidates(moduleName):
+    return [moduleName + '.f90', moduleName + '.F90', moduleName + '_mod.f90', moduleName + '_mod.F90',
+            moduleName.replace('_mod', '') + '.f90', moduleName.replace('_mod', '') + '.F90']
+
+def walkFindFile(baseDirs, fileName):
+    fileName = fileName.lower()
+    for baseDir in baseDirs:
+        for root, _, files in os.walk(baseDir):
+            for name in files:
+                if name.lower() == fileName:
+                    return os.path.join(root, name)
+    return None
+
+def lookupAll(findFile, moduleNames):
+    found = 0
+    for moduleName in moduleNames:
+        for fileName in candidates(moduleName):
+            if findFile(fileName) is not None:
+                found += 1
+                break
+    return found
+
+def main():
+    directories = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    filesPerDirectory = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    modules = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    tmpDir = tempfile.mkdtemp()
+    try:
+        srcDir = os.path.join(tmpDir, 'src')
+        cacheDir = os.path.join(tmpDir, 'cache')
+        moduleNames = createTree(srcDir, directories, filesPerDirectory)
+        step = max(1, len(moduleNames) // modules)
+        lookedUp = moduleNames[::step][:modules]
+        # half of the lookups are misses with all six candidates tried
+        lookedUp += ['mo_missing_' + str(i) for i in range(len(lookedUp))]
+        print('Tree: ' + str(directories) + ' directories, ' + str(len(moduleNames)) + ' files; ' + str(len(lookedUp)) + ' module lookups')
+
+        start = time.perf_counter()
+        walkFound = lookupAll(lambda fileName: walkFindFile([srcDir], fileName), lookedUp)
+        walkTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = FileNameIndex(srcDir, cacheDir)
+        index.getPaths()
+        buildTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = FileNameIndex(srcDir, cacheDir)
+        index.getPaths()
+        loadTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexFound = lookupAll(index.findFile, lookedUp)
+        lookupTime = time.perf_counter() - start
+
+        assert walkFound == indexFound
+        print('os.walk lookups:          %10.4f s' % walkTime)
+        print('index build (cold):       %10.4f s' % buildTime)
+        print('index load + revalidate:  %10.4f s' % loadTime)
+        print('index lookups:            %10.4f s' % lookupTime)
+        print('speedup (warm):           %10.1f x' % (walkTime / (loadTime + lookupTime)))
+    finally:
+        shutil.rmtree(tmpDir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+
+'''
+Measures how long CachedAssemblerCallGraphBuilder needs for a call graph after one assembler file has been touched or changed,
+compared to building the call graph from scratch. The call graphs are built from synthetic assembler files of many modules,
+every updated call graph must equal the one built from scratch.
+
+Usage: BenchIncrementalTreeCache.py [MODULES [FUNCTIONS_PER_MODULE [REPETITIONS]]]
+'''
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SubroutineFullName
+from assembler import GNUx86AssemblerCallGraphBuilder
+from assemblercalls import AssemblerCallTable
+from treecache import CachedAssemblerCallGraphBuilder
+
+CALLS_PER_FUNCTION = 3
+
+def writeModule(assemblerDir, module, modules, functions, seed):
+    rand = random.Random(seed)
+    with open(os.path.join(assemblerDir, 'm%d.s' % module), 'w') as assemblerFile:
+        assemblerFile.write('\t.text\n')
+        for function in range(functions):
+            assemblerFile.write('\t.globl\t__m%d_MOD_f%d\n__m%d_MOD_f%d:\n\t.cfi_startproc\n' % (module, function, module, function))
+            for line in range(CALLS_PER_FUNCTION):
+                # Calls go to later modules only, so most call graphs contain a part of the program, not all of it
+                callee = rand.randrange(module, modules) if module < modules - 1 else module
+                assemblerFile.write('\t.loc 1 %d 0\n\tcall\t__m%d_MOD_f%d@PLT\n' % (10 * function + line, callee, rand.randrange(functions)))
+            assemblerFile.write('\tret\n\t.cfi_endproc\n')
+
+def serialize(callGraph):
+    return json.dumps(callGraph.serialize())
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start, result)
+
+def check(results, keys, assemblerDir, root):
+    expected = serialize(GNUx86AssemblerCallGraphBuilder(assemblerDir).buildCallGraph(root))
+    for key in keys:
+        if serialize(results[key][-1][1]) != expected:
+            print(key + ': call graph differs from the one built from scratch!')
+            sys.exit(1)
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    functions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    tmpDir = tempfile.mkdtemp()
+    try:
+        assemblerDir = os.path.join(tmpDir, 'assembler')
+        cacheDir = os.path.join(tmpDir, 'cache')
+        os.makedirs(assemblerDir)
+        for module in range(modules):
+            writeModule(assemblerDir, module, modules, functions, module)
+        root = SubroutineFullName('__m0_MOD_f0')
+
+        def newBuilder():
+            return CachedAssemblerCallGraphBuilder(cacheDir, GNUx86AssemblerCallGraphBuilder(assemblerDir, callTable = AssemblerCallTable(cacheDir)))
+
+        duration, callGraph = timed(newBuilder().buildCallGraph, root, True)
+        print('%d modules, %d functions each, %d subroutines in the call graph' % (modules, functions, len(callGraph.getAllSubroutineNames())))
+        print('%-28s %10.4fs' % ('initial build', duration))
+        print('%-28s %10.4fs' % ('unchanged', timed(newBuilder().buildCallGraph, root)[0]))
+
+        results = dict()
+        for repetition in range(repetitions):
+            module = 1 + repetition % (modules - 1)
+            changedFile = os.path.join(assemblerDir, 'm%d.s' % module)
+            os.utime(changedFile, ns = (time.time_ns(), time.time_ns()))
+            results.setdefault('touch one file', []).append(timed(newBuilder().buildCallGraph, root))
+            check(results, ['touch one file'], assemblerDir, root)
+
+            writeModule(assemblerDir, module, modules, functions, modules + repetition)
+            results.setdefault('change one file', []).append(timed(newBuilder().buildCallGraph, root))
+            results.setdefault('full rebuild', []).append(timed(newBuilder().buildCallGraph, root, True))
+            check(results, ['change one file', 'full rebuild'], assemblerDir, root)
+
+        for key, measurements in results.items():
+            print('%-28s %10.4fs' % (key, min(duration for duration, _ in measurements)))
+    finally:
+        shutil.rmtree(tmpDir)
+
+if __name__ == "__main__":
+    main()
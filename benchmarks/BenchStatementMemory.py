@@ -0,0 +1,58 @@
+#!/usr/bin/python
+
+'''
+Measures the memory needed for the normalized statements of a large synthetic source tree,
+stored as lists of (firstLineNumber, statement, lastLineNumber) tuples and in StatementStores.
+
+Usage: BenchStatementMemory.py [FILES [LINES_PER_FILE]]
+'''
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SourceFile
+from statementstore import StatementStore
+
+TEMPLATES = ['  ! comment line with some words %d',
+             '  INTEGER, PARAMETER :: n%d = 42 ! trailing comment',
+             '  REAL(wp), ALLOCATABLE, DIMENSION(:,:) :: field%d',
+             '  CALL sub%d(a, b( i , j ), &',
+             '           & c, "string ! not a comment", \'other\')',
+             '  x = y%d + z * ( a - b ) / 2.0_wp ; i = i + 1',
+             '  IF (a%d > b .AND. c < d) THEN',
+             '  END IF',
+             '  IMPLICIT NONE',
+             '']
+
+def syntheticLines(seed, count):
+    random.seed(seed)
+    return [(i, random.choice(TEMPLATES).replace('%d', str(i)) + '\n') for i in range(1, count + 1)]
+
+def measure(create, files, linesPerFile):
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = [create(syntheticLines(f, linesPerFile)) for f in range(files)]
+    duration = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    statements = sum(len(k) for k in kept)
+    return size, statements, duration
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    linesPerFile = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    for name, create in [('list of tuples', SourceFile.linesToStatements),
+                         ('StatementStore', lambda lines: StatementStore(SourceFile.iterStatements(lines)))]:
+        size, statements, duration = measure(create, files, linesPerFile)
+        print('%-16s %10d statements %10.1f MB %8.1f bytes/statement %8.2f s' % (name, statements, size / 1048576.0, float(size) / statements, duration))
+
+if __name__ == "__main__":
+    main()
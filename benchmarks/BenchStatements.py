@@ -0,0 +1,132 @@
+#!/usr/bin/python
+
+'''
+Measures the throughput of SourceFile.linesToStatements on tests/samples/linenumbers/dyn_comp.f90 and on larger synthetic files
+and compares it with the former implementation (character loops and several regular expression passes per statement).
+Both implementations must produce identical statements.
+
+Usage: BenchStatements.py [REPETITIONS [SYNTHETIC_LINES ...]]
+'''
+
+import os
+import re
+import sys
+import time
+import random
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SourceFile
+
+SAMPLE_FILE = FCG_DIR + '/tests/samples/linenumbers/dyn_comp.f90'
+
+def referenceLinesToStatements(lines):
+    if not lines:
+        return []
+
+    statements = [];
+    statement = '';
+    j = lines[0][0];
+    for i, line in lines:
+        line = referenceRemoveCommentFromLine(line).strip();
+        if line and not line.startswith('#'):
+            statement += ' ' + line.strip('&').strip().strip(';').strip()
+            if not line.endswith('&'):
+                statement = statement.lstrip();
+                statement = re.sub(r' *([%\(,\.\:=\+\-\*\/\>\<]) *', r'\1', statement)
+                statement = re.sub(r' *\)', r')', statement)
+                statement = re.sub(r'  +', ' ', statement);
+                statement = referenceRemoveStringsFromStatement(statement)
+                for substatement in statement.split(';'):
+                    statements.append((j, substatement.strip(), i));
+                statement = '';
+                j = i + 1;
+        else:
+            if statement == '':
+                j = j + 1;
+    return statements;
+
+def referenceRemoveCommentFromLine(line):
+    cleanLine = ''
+    quotation = ''
+    for char in line:
+        if not quotation:
+            if char == '!':
+                return cleanLine;
+            elif char == '"' or char == "'":
+                quotation = char
+        elif char == quotation:
+            quotation = ''
+        cleanLine += char
+
+    return cleanLine
+
+def referenceRemoveStringsFromStatement(statement):
+    cleanStatement = ''
+    inString = False
+    escape = False
+    delimiter = ''
+    for c in statement:
+        if not inString:
+            cleanStatement += c
+            if c == "'" or c == '"':
+                inString = True
+                escape = False
+                delimiter = c;
+        else:
+            if c == delimiter and not escape:
+                cleanStatement += c
+                inString = False
+            escape = not escape and c == '\\'
+
+    return cleanStatement
+
+SYNTHETIC_TEMPLATES = ['  ! comment line with some words %d',
+                       '  INTEGER, PARAMETER :: n%d = 42 ! trailing comment',
+                       '  REAL(wp), ALLOCATABLE, DIMENSION(:,:) :: field%d',
+                       '  CALL sub%d(a, b( i , j ), &',
+                       '           & c%%d , "string ! not a comment", \'other\')',
+                       '  x = y%d + z * ( a - b ) / 2.0_wp ; i = i + 1',
+                       '  IF (a%d > b .AND. c < d) THEN',
+                       '  WRITE (*,*) \'Value: \', value%d',
+                       '  END IF',
+                       '']
+
+def syntheticLines(count):
+    random.seed(count)
+    return [(i, random.choice(SYNTHETIC_TEMPLATES).replace('%d', str(i)).replace('%%', '%') + '\n') for i in range(1, count + 1)]
+
+def measure(function, lines, repetitions):
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function(lines)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+def bench(name, lines, repetitions):
+    expected = referenceLinesToStatements(lines)
+    actual = SourceFile.linesToStatements(lines)
+    if expected != actual:
+        print('%s: statements differ from reference implementation!' % name)
+        sys.exit(1)
+
+    reference = measure(referenceLinesToStatements, lines, repetitions)
+    current = measure(SourceFile.linesToStatements, lines, repetitions)
+    print('%-24s %8d lines %12.0f lines/s (reference) %12.0f lines/s (current) %6.1fx' % (name, len(lines), len(lines) / reference, len(lines) / current, reference / current))
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(arg) for arg in sys.argv[2:]] or [10000, 100000]
+
+    with open(SAMPLE_FILE) as sampleFile:
+        bench(os.path.basename(SAMPLE_FILE), list(enumerate(sampleFile, 1)), repetitions)
+    for size in sizes:
+        bench('synthetic', syntheticLines(size), repetitions)
+
+if __name__ == "__main__":
+    main()
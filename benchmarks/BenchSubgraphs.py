@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+'''
+Measures how long it takes to extract the subgraph of every subroutine of a call graph and to query it like the variable trackers do,
+compared to copying the reachable subroutines into a new CallGraph. The call graph is synthetic, every subgraph must equal the copy.
+Also measures the memory still allocated after all views are dropped, which must not grow with the number of extracted subgraphs.
+
+Usage: BenchSubgraphs.py [SUBROUTINES [CALLS_PER_SUBROUTINE]]
+'''
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+FCG_DIR = BENCH_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SubroutineFullName
+from callgraph import CallGraph
+
+def buildCallGraph(subroutines, calls):
+    rand = random.Random(0)
+    names = [SubroutineFullName('__m%d_MOD_f%d' % (i // 50, i)) for i in range(subroutines)]
+    callGraph = CallGraph()
+    for name in names:
+        callGraph.addSubroutine(name)
+    for i, name in enumerate(names[:-1]):
+        for line in range(calls):
+            callGraph.addCall(name, names[rand.randrange(i + 1, subroutines)], 10 * line, 0)
+    return callGraph
+
+def copySubgraph(callGraph, subrootName):
+    subgraph = CallGraph()
+    stack = [subrootName]
+    subgraph.addSubroutine(subrootName)
+    while stack:
+        caller = stack.pop()
+        for callee, lineNumber, discriminator in callGraph.getCallSites(caller):
+            if callee not in subgraph:
+                subgraph.addSubroutine(callee)
+                stack.append(callee)
+            subgraph.addCall(caller, callee, lineNumber, discriminator)
+    return subgraph
+
+def query(callGraph, extract):
+    for subroutine in callGraph.getAllSubroutineNames():
+        subgraph = extract(callGraph, subroutine)
+        for callee in subgraph.getCallees(subroutine):
+            extract(subgraph, callee).getCallees(callee)
+            callee in subgraph
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start, result)
+
+def main():
+    subroutines = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    callGraph = buildCallGraph(subroutines, calls)
+
+    for subroutine in callGraph.getAllSubroutineNames():
+        if callGraph.extractSubgraph(subroutine).serialize() != copySubgraph(callGraph, subroutine).serialize():
+            print(str(subroutine) + ': subgraph differs from the copy!')
+            sys.exit(1)
+
+    print('%d subroutines, %d calls each' % (subroutines, calls))
+    print('%-28s %10.4fs' % ('copy', timed(query, callGraph, copySubgraph)[0]))
+    callGraph = buildCallGraph(subroutines, calls)
+    print('%-28s %10.4fs' % ('view', timed(query, callGraph, CallGraph.extractSubgraph)[0]))
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    query(callGraph, CallGraph.extractSubgraph)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('%-28s %10.1f MB' % ('views, peak', (peak - before) / 1048576.0))
+    print('%-28s %10.1f MB' % ('views, retained', (after - before) / 1048576.0))
+
+if __name__ == "__main__":
+    main()
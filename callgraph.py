@@ -1,6 +1,7 @@
 from assertions import assertType
 from source import SubroutineFullName, SubroutineName, InnerSubroutineName
-import sys
+from bisect import bisect_left
+from operator import itemgetter
 
 class _CallGraphCall(object):
     
@@ -72,8 +73,13 @@ class _CallGraphCall(object):
     
     def getLineNumber(self):
         return self.__lineNumber
+    
+    def getDiscriminator(self):
+        return self.__discriminator
         
 class _CallGraphSubroutine(object):
+    '''The calls of a subroutine. The callees and the callees by simple name are indexed when calls are added,
+       the sorted callees and the callees by line number when they are needed for the first time after a call was added.'''
     
     ATTR_NAME = 'name'
     ATTR_HOST = 'host'
@@ -82,6 +88,11 @@ class _CallGraphSubroutine(object):
     def __init__(self, subroutineName):
         self.__name = subroutineName
         self.__calls = []
+        self.__callees = dict()
+        self.__calleesBySimpleName = dict()
+        self.__sortedCallees = None
+        self.__lineNumbers = None
+        self.__calleesByLine = None
         
     def serialize(self):
         ser = dict()
@@ -107,7 +118,7 @@ class _CallGraphSubroutine(object):
         
         cgs = _CallGraphSubroutine(subroutineName)
         for call in ser[_CallGraphSubroutine.ATTR_CALLS]:
-            cgs.__calls.append(_CallGraphCall.deserialize(call))
+            cgs.__appendCall(_CallGraphCall.deserialize(call))
             
         return cgs
     
@@ -119,21 +130,34 @@ class _CallGraphSubroutine(object):
         if isinstance(calleeName, InnerSubroutineName) and calleeName.getModuleName() is None:
             calleeName.setModuleName(self.getName().getModuleName())
         
-        self.__calls.append(_CallGraphCall(calleeName, lineNumber, discriminator))
+        self.__appendCall(_CallGraphCall(calleeName, lineNumber, discriminator))
+        
+    def __appendCall(self, call):
+        self.__calls.append(call)
+        calleeName = call.getCalleeName()
+        self.__callees.setdefault(calleeName, None)
+        self.__calleesBySimpleName.setdefault(calleeName.getSimpleName(), calleeName)
+        self.__sortedCallees = None
+        self.__lineNumbers = None
+        self.__calleesByLine = None
+        
+    def hasCallee(self, calleeName):
+        return calleeName in self.__callees
+        
+    def iterCallees(self):
+        '''Iterates over the callees without copying them, in the order of their first call'''
+        return iter(self.__callees)
         
     def getCallees(self):
-        callees = set()
-        for call in self.__calls:
-            callees.add(call.getCalleeName())
-        return callees
+        return set(self.__callees)
     
     def getSortedCallees(self):
-        callees = []
-        for call in sorted(self.__calls):
-            callee = call.getCalleeName()
-            if callee not in callees:
-                callees.append(call.getCalleeName())
-        return callees
+        if self.__sortedCallees is None:
+            callees = dict()
+            for call in sorted(self.__calls):
+                callees.setdefault(call.getCalleeName(), None)
+            self.__sortedCallees = list(callees)
+        return list(self.__sortedCallees)
         
     def getCalls(self):
         calls = set();
@@ -141,28 +165,48 @@ class _CallGraphSubroutine(object):
             calls.add((self.__name, call.getCalleeName()))
         return calls
     
+    def getCallSites(self):
+        return [(call.getCalleeName(), call.getLineNumber(), call.getDiscriminator()) for call in self.__calls]
+    
     def findCalleeBySimpleName(self, calleeSimpleName):
-        for call in self.__calls:
-            calleeName = call.getCalleeName()
-            if calleeName.getSimpleName() == calleeSimpleName:
-                return calleeName
-            
-        return None
+        return self.__calleesBySimpleName.get(calleeSimpleName)
     
     def findNextCalleesFromLine(self, lineNumber):
-        nextCallees = []
-        smallestLineNumberDelta = sys.maxsize
-        for call in self.__calls:
-            lineNumberDelta = abs(lineNumber - call.getLineNumber()) 
-            if lineNumberDelta < smallestLineNumberDelta:
-                nextCallees = [call.getCalleeName()]
-                smallestLineNumberDelta = lineNumberDelta
-            elif lineNumberDelta == smallestLineNumberDelta:
-                nextCallees.append(call.getCalleeName())
-        
-        return nextCallees
+        '''Returns the callees of the calls with the smallest distance to the given line, in the order of the calls'''
+        if self.__lineNumbers is None:
+            self.__indexLineNumbers()
+        if not self.__lineNumbers:
+            return []
+        
+        position = bisect_left(self.__lineNumbers, lineNumber)
+        if position == len(self.__lineNumbers):
+            nearest = [position - 1]
+        elif position == 0 or self.__lineNumbers[position] == lineNumber:
+            nearest = [position]
+        else:
+            deltaBefore = lineNumber - self.__lineNumbers[position - 1]
+            deltaAfter = self.__lineNumbers[position] - lineNumber
+            if deltaBefore < deltaAfter:
+                nearest = [position - 1]
+            elif deltaAfter < deltaBefore:
+                nearest = [position]
+            else:
+                nearest = [position - 1, position]
+        
+        if len(nearest) == 1:
+            return [calleeName for _, calleeName in self.__calleesByLine[nearest[0]]]
+        return [calleeName for _, calleeName in sorted(self.__calleesByLine[nearest[0]] + self.__calleesByLine[nearest[1]], key = itemgetter(0))]
+    
+    def __indexLineNumbers(self):
+        calleesByLine = dict()
+        for index, call in enumerate(self.__calls):
+            calleesByLine.setdefault(call.getLineNumber(), []).append((index, call.getCalleeName()))
+        self.__lineNumbers = sorted(calleesByLine)
+        self.__calleesByLine = [calleesByLine[lineNumber] for lineNumber in self.__lineNumbers]
 
 class CallGraph(object):
+    '''The callers of every subroutine and the simple names of the subroutines are indexed when they are needed for the first time,
+       and then kept up to date when subroutines and calls are added.'''
     
     ATTR_ROOT_SUBROUTINE = 'rootSubroutine'
     ATTR_SUBROUTINES = 'subroutines'
@@ -170,6 +214,9 @@ class CallGraph(object):
     def __init__(self):
         self.__rootSubroutine = None;
         self.__subroutines = dict();
+        self.__simpleNames = None
+        self.__callers = None
+        self.__modificationCount = 0
         
     def __contains__(self, subroutineName):
         if isinstance(subroutineName, SubroutineName):
@@ -178,9 +225,7 @@ class CallGraph(object):
             if SubroutineFullName.validFullName(subroutineName):
                 return SubroutineFullName(subroutineName) in self.__subroutines
             else:
-                for name in self.__subroutines:
-                    if name.getSimpleName() == subroutineName:
-                        return True
+                return subroutineName in self.__getSimpleNames()
         return False
     
     def __iter__(self):
@@ -203,8 +248,7 @@ class CallGraph(object):
         callgraph = CallGraph()
         callgraph.__rootSubroutine = SubroutineFullName(str(ser[CallGraph.ATTR_ROOT_SUBROUTINE]))
         for subroutine in ser[CallGraph.ATTR_SUBROUTINES].values():
-            subroutine = _CallGraphSubroutine.deserialize(subroutine)
-            callgraph.__subroutines[subroutine.getName()] = subroutine
+            callgraph.__putSubroutine(_CallGraphSubroutine.deserialize(subroutine))
             
         return callgraph
     
@@ -214,10 +258,36 @@ class CallGraph(object):
     def addSubroutine(self, subroutineName):
         assertType(subroutineName, 'subroutineName', SubroutineName)
 
-        self.__subroutines[subroutineName] = _CallGraphSubroutine(subroutineName);
+        self.__putSubroutine(_CallGraphSubroutine(subroutineName))
         if self.__rootSubroutine is None:
             self.__rootSubroutine = subroutineName;
             
+    def __putSubroutine(self, subroutine):
+        subroutineName = subroutine.getName()
+        self.__modificationCount += 1
+        if subroutineName in self.__subroutines:
+            self.__callers = None
+        elif self.__callers is not None:
+            for calleeName in subroutine.iterCallees():
+                self.__callers.setdefault(calleeName, dict())[subroutineName] = None
+        self.__subroutines[subroutineName] = subroutine
+        if self.__simpleNames is not None:
+            self.__simpleNames.add(subroutineName.getSimpleName())
+            
+    def __getSimpleNames(self):
+        if self.__simpleNames is None:
+            self.__simpleNames = set(subroutineName.getSimpleName() for subroutineName in self.__subroutines)
+        return self.__simpleNames
+    
+    def __getCallers(self):
+        '''Returns the dictionary callee name => ordered dictionary of caller names'''
+        if self.__callers is None:
+            self.__callers = dict()
+            for subroutineName, subroutine in self.__subroutines.items():
+                for calleeName in subroutine.iterCallees():
+                    self.__callers.setdefault(calleeName, dict())[subroutineName] = None
+        return self.__callers
+            
     def getAllSubroutineNames(self):
         return self.__subroutines.keys(); 
             
@@ -237,6 +307,9 @@ class CallGraph(object):
             raise ValueError("Caller subroutine not found in CallGraph: " + callerName);
         
         self.__subroutines[callerName].addCall(calleeName, lineNumber, discriminator)
+        if self.__callers is not None:
+            self.__callers.setdefault(calleeName, dict())[callerName] = None
+        self.__modificationCount += 1
         
         
     def getCallees(self, callerName):
@@ -245,6 +318,13 @@ class CallGraph(object):
             raise ValueError("Caller subroutine not found in CallGraph: " + str(callerName));
         return self.__subroutines[callerName].getCallees()
         
+    def getCallSites(self, callerName):
+        '''Returns the calls of the given subroutine as list of tuples (calleeName, lineNumber, discriminator) in the order they were added'''
+        assertType(callerName, 'callerName', SubroutineName)     
+        if not callerName in self:
+            raise ValueError("Caller subroutine not found in CallGraph: " + str(callerName));
+        return self.__subroutines[callerName].getCallSites()
+        
     def findCalleeBySimpleName(self, calleeSimpleName, callerFullName):
         assertType(calleeSimpleName, 'calleeSimpleName', str)   
         assertType(callerFullName, 'callerFullName', SubroutineName)     
@@ -283,27 +363,266 @@ class CallGraph(object):
         assertType(calleeName, 'calleeName', SubroutineName)      
         if not calleeName in self:
             raise ValueError("Callee subroutine not found in CallGraph: " + str(calleeName))
-        callers = set()
-        for subroutineName, subroutine in self.__subroutines.items():
-            if calleeName in subroutine.getCallees():
-                callers.add(subroutineName)
-                
-        return callers
+        return set(self.__getCallers().get(calleeName, ()))
  
     def extractSubgraph(self, subrootName):
+        '''Returns the call graph of all subroutines reachable from the given one as CallGraphView, without copying them'''
         assertType(subrootName, 'subrootName', SubroutineName)
         if not subrootName in self:
             raise ValueError("Subroutine not found in CallGraph: " + str(subrootName));
         
-        subgraph = CallGraph();
-        subgraph.__rootSubroutine = subrootName;
-        self.__fillSubgraphRecursive(subgraph, subrootName)
-            
-        return subgraph;
-    
-    def __fillSubgraphRecursive(self, subgraph, subroutineName):
-        subroutine = self.__subroutines[subroutineName]
-        subgraph.__subroutines[subroutineName] = subroutine
-        for callee in subroutine.getCallees():
-            if callee not in subgraph:
-                self.__fillSubgraphRecursive(subgraph, callee) 
+        return CallGraphView(self, subrootName)
+    
+    def getStronglyConnectedComponents(self):
+        '''Returns the strongly connected components as lists of subroutine names, in reverse topological order:
+           every component comes after the components of its callees. Callees which are not part of the call graph form components of their own.
+           Uses an iterative version of Tarjan's algorithm, which takes linear time.'''
+        indices = dict()
+        lowLinks = dict()
+        stack = []
+        onStack = set()
+        components = []
+        for start in self:
+            if start in indices:
+                continue
+            indices[start] = lowLinks[start] = len(indices)
+            stack.append(start)
+            onStack.add(start)
+            work = [(start, self._iterCallees(start))]
+            while work:
+                subroutineName, callees = work[-1]
+                for calleeName in callees:
+                    if calleeName not in indices:
+                        indices[calleeName] = lowLinks[calleeName] = len(indices)
+                        stack.append(calleeName)
+                        onStack.add(calleeName)
+                        work.append((calleeName, self._iterCallees(calleeName)))
+                        break
+                    elif calleeName in onStack and indices[calleeName] < lowLinks[subroutineName]:
+                        lowLinks[subroutineName] = indices[calleeName]
+                else:
+                    work.pop()
+                    if work and lowLinks[subroutineName] < lowLinks[work[-1][0]]:
+                        lowLinks[work[-1][0]] = lowLinks[subroutineName]
+                    if lowLinks[subroutineName] == indices[subroutineName]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            onStack.discard(member)
+                            component.append(member)
+                            if member == subroutineName:
+                                break
+                        component.reverse()
+                        components.append(component)
+        return components
+    
+    def getCondensation(self):
+        '''Returns the directed acyclic graph of the strongly connected components as tuple (components, componentIndices, componentCallees):
+           components is the list from getStronglyConnectedComponents, componentIndices the dictionary subroutine name => index of its component,
+           and componentCallees the list of the sets of indices of the components called by each component, not containing the component itself.
+           Callee components always have smaller indices than their callers.'''
+        components = self.getStronglyConnectedComponents()
+        componentIndices = dict()
+        for index, component in enumerate(components):
+            for subroutineName in component:
+                componentIndices[subroutineName] = index
+        componentCallees = []
+        for index, component in enumerate(components):
+            callees = set()
+            for subroutineName in component:
+                for calleeName in self._iterCallees(subroutineName):
+                    callees.add(componentIndices[calleeName])
+            callees.discard(index)
+            componentCallees.append(callees)
+        return (components, componentIndices, componentCallees)
+    
+    def getReverseTopologicalOrder(self):
+        '''Returns all subroutine names, the callees before their callers, except for recursive calls'''
+        return [subroutineName for component in self.getStronglyConnectedComponents() for subroutineName in component]
+    
+    def getCycles(self):
+        '''Returns the strongly connected components with recursive calls: those with more than one subroutine and those of subroutines calling themselves'''
+        cycles = []
+        for component in self.getStronglyConnectedComponents():
+            if len(component) > 1 or component[0] in set(self._iterCallees(component[0])):
+                cycles.append(component)
+        return cycles
+    
+    def getHeights(self):
+        '''Returns the dictionary subroutine name => height. The height is the length of the longest call chain below the subroutine in the condensation,
+           so subroutines of the same strongly connected component have the same height, and subroutines without callees outside of their component have height 0.
+           Bottom-up analyses can process all subroutines of a height together once the lower heights are done.'''
+        components, _, componentCallees = self.getCondensation()
+        componentHeights = []
+        for callees in componentCallees:
+            componentHeights.append(1 + max(componentHeights[callee] for callee in callees) if callees else 0)
+        heights = dict()
+        for component, height in zip(components, componentHeights):
+            for subroutineName in component:
+                heights[subroutineName] = height
+        return heights
+    
+    def getDepths(self):
+        '''Returns the dictionary subroutine name => depth for all subroutines reachable from the root. The depth is the smallest number of calls from the root.'''
+        if self.getRoot() is None:
+            return dict()
+        depths = {self.getRoot(): 0}
+        level = [self.getRoot()]
+        depth = 0
+        while level:
+            depth += 1
+            nextLevel = []
+            for subroutineName in level:
+                for calleeName in self._iterCallees(subroutineName):
+                    if calleeName not in depths:
+                        depths[calleeName] = depth
+                        nextLevel.append(calleeName)
+            level = nextLevel
+        return depths
+    
+    def _getSubroutine(self, subroutineName):
+        return self.__subroutines.get(subroutineName)
+    
+    def _iterCallees(self, subroutineName):
+        subroutine = self._getSubroutine(subroutineName)
+        if subroutine is None:
+            return iter(())
+        return subroutine.iterCallees()
+    
+    def _getModificationCount(self):
+        '''Returns the number of subroutines and calls added so far, which tells views when their memoized subroutines are outdated'''
+        return self.__modificationCount
+    
+    def _getReachable(self, subrootName):
+        '''Returns the ordered dictionary of the subroutines reachable from the given one, in the order of a depth-first traversal.
+           Callees which are not part of the call graph are left out.'''
+        reachable = {subrootName: None}
+        stack = [self.__subroutines[subrootName].iterCallees()]
+        while stack:
+            callee = next(stack[-1], None)
+            if callee is None:
+                stack.pop()
+            elif callee not in reachable and callee in self.__subroutines:
+                reachable[callee] = None
+                stack.append(self.__subroutines[callee].iterCallees())
+        return reachable
+    
+class CallGraphView(CallGraph):
+    '''Read-only call graph of the subroutines reachable from a root in another call graph. The subroutines are not copied,
+       the reachable ones are determined when they are needed and memoized by the view until the underlying call graph is changed.'''
+    
+    def __init__(self, callGraph, rootSubroutine):
+        assertType(callGraph, 'callGraph', CallGraph)
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineName)
+        super(CallGraphView, self).__init__()
+        
+        if isinstance(callGraph, CallGraphView):
+            callGraph = callGraph.__callGraph
+        self.__callGraph = callGraph
+        self.__rootSubroutine = rootSubroutine
+        self.__simpleNames = (None, None)
+        self.__reachableMemo = (None, None)
+    
+    def __reachable(self):
+        modificationCount = self.__callGraph._getModificationCount()
+        if self.__reachableMemo[0] != modificationCount:
+            self.__reachableMemo = (modificationCount, self.__callGraph._getReachable(self.__rootSubroutine))
+        return self.__reachableMemo[1]
+    
+    def _getSubroutine(self, subroutineName):
+        if subroutineName not in self.__reachable():
+            return None
+        return self.__callGraph._getSubroutine(subroutineName)
+    
+    def __contains__(self, subroutineName):
+        if isinstance(subroutineName, SubroutineName):
+            return subroutineName in self.__reachable()
+        elif isinstance(subroutineName, str): 
+            if SubroutineFullName.validFullName(subroutineName):
+                return SubroutineFullName(subroutineName) in self.__reachable()
+            else:
+                reachable = self.__reachable()
+                if self.__simpleNames[0] is not reachable:
+                    self.__simpleNames = (reachable, set(name.getSimpleName() for name in reachable))
+                return subroutineName in self.__simpleNames[1]
+        return False
+    
+    def __iter__(self):
+        return iter(self.__reachable())
+    
+    def __checkSubroutine(self, subroutineName, role):
+        if not subroutineName in self:
+            raise ValueError(role + " subroutine not found in CallGraph: " + str(subroutineName))
+    
+    def serialize(self):
+        ser = dict()
+        ser[CallGraph.ATTR_ROOT_SUBROUTINE] = str(self.__rootSubroutine)
+        ser[CallGraph.ATTR_SUBROUTINES] = dict()
+        for subroutineName in self.__reachable():
+            ser[CallGraph.ATTR_SUBROUTINES][str(subroutineName)] = self.__callGraph._getSubroutine(subroutineName).serialize()
+        
+        return ser
+    
+    def getRoot(self):
+        return self.__rootSubroutine
+    
+    def addSubroutine(self, subroutineName):
+        raise TypeError('CallGraphView is read-only')
+    
+    def addCall(self, callerName, calleeName, lineNumber, discriminator):
+        raise TypeError('CallGraphView is read-only')
+    
+    def getAllSubroutineNames(self):
+        return self.__reachable().keys()
+    
+    def getAllModuleNames(self):
+        modules = set()
+        for subroutineName in self.__reachable():
+            moduleName = subroutineName.getModuleName()
+            if moduleName is not None:
+                modules.add(moduleName)
+        return modules
+    
+    def getCallees(self, callerName):
+        assertType(callerName, 'callerName', SubroutineName)     
+        self.__checkSubroutine(callerName, 'Caller')
+        return self.__callGraph.getCallees(callerName)
+    
+    def getCallSites(self, callerName):
+        assertType(callerName, 'callerName', SubroutineName)     
+        self.__checkSubroutine(callerName, 'Caller')
+        return self.__callGraph.getCallSites(callerName)
+    
+    def findCalleeBySimpleName(self, calleeSimpleName, callerFullName):
+        assertType(calleeSimpleName, 'calleeSimpleName', str)   
+        assertType(callerFullName, 'callerFullName', SubroutineName)     
+        self.__checkSubroutine(callerFullName, 'Caller')
+        return self.__callGraph.findCalleeBySimpleName(calleeSimpleName, callerFullName)
+    
+    def findNextCalleesFromLine(self, callerName, lineNumber):
+        assertType(callerName, 'callerName', SubroutineName)        
+        if callerName not in self:
+            raise KeyError(callerName)
+        return self.__callGraph.findNextCalleesFromLine(callerName, lineNumber)
+    
+    def getSortedCallees(self, callerName):
+        assertType(callerName, 'callerName', SubroutineName)     
+        self.__checkSubroutine(callerName, 'Caller')
+        return self.__callGraph.getSortedCallees(callerName)
+    
+    def getAllCalls(self):
+        calls = set()
+        for subroutineName in self.__reachable():
+            calls.update(self.__callGraph._getSubroutine(subroutineName).getCalls())
+        return calls
+    
+    def getCallers(self, calleeName):
+        assertType(calleeName, 'calleeName', SubroutineName)      
+        self.__checkSubroutine(calleeName, 'Callee')
+        reachable = self.__reachable()
+        return set(callerName for callerName in self.__callGraph.getCallers(calleeName) if callerName in reachable)
+    
+    def extractSubgraph(self, subrootName):
+        assertType(subrootName, 'subrootName', SubroutineName)
+        self.__checkSubroutine(subrootName, 'Subroutine')
+        return CallGraphView(self.__callGraph, subrootName)
@@ -0,0 +1,100 @@
+import re
+from assemblercalls import AssemblerCallTable
+from source import SubroutineFullName, InnerSubroutineName
+
+class CallGraphInfoTable(AssemblerCallTable):
+    '''Table of the calls in the functions of call graph files (.ci), written in VCG format by gfortran -c -g -O0 -fcallgraph-info, see AssemblerCallTable.
+       A node of a call graph file is a function, an edge is a call site with the location file:line:column of the call.
+       The call sites are listed in code order, their lines are the ones of the assembler files, discriminators aren't available and are 0.
+       Functions that are only called, but not defined in the file, are not listed.
+
+       The call graph files don't tell which outlined OpenMP function (<host>._omp_fn.N) is started by which call of a GOMP function.
+       Since the regions of a function are nested like the directives in the source code, the assignment is reconstructed
+       from the lines of the directives and from the number of GOMP calls in each function and region.'''
+
+    SUB_DIR = 'callgraphinfo'
+
+    # Functions of the GOMP library which start an outlined OpenMP function
+    OMP_LAUNCHERS = ('GOMP_parallel', 'GOMP_parallel_sections', 'GOMP_task', 'GOMP_taskloop', 'GOMP_taskloop_ull', 'GOMP_teams_reg', 'GOMP_target_ext')
+    OMP_LAUNCHER_PREFIX = 'GOMP_parallel_loop_'
+
+    __ENTRY_REG_EX = re.compile(r'^(?:node: \{ title: "(?P<title>[^"]*)" label: "(?P<label>[^"]*)"(?P<external> shape : ellipse)?'
+                                r'|edge: \{ sourcename: "(?P<source>[^"]*)" targetname: "(?P<target>[^"]*)"(?: label: "(?P<location>[^"]*)")?)', re.MULTILINE)
+    __OMP_REG_EX = re.compile(r'^(?P<host>.+)\._omp_fn\.(?P<number>\d+)$')
+    __NODE_LINE_REG_EX = re.compile(r'\\n[^\\]*:(?P<linenumber>\d+):\d+')
+
+    @staticmethod
+    def parseFile(filePath):
+        '''Reads the call graph file and returns the dictionary function label => list of calls'''
+        with open(filePath) as openFile:
+            text = openFile.read()
+
+        functions = dict()
+        lineNumbers = dict()
+        calls = dict()
+        for entry in CallGraphInfoTable.__ENTRY_REG_EX.finditer(text):
+            title = entry.group('title')
+            if title is not None:
+                if entry.group('external') is None:
+                    name = CallGraphInfoTable.__functionName(title)
+                    functions[name] = []
+                    lineMatch = CallGraphInfoTable.__NODE_LINE_REG_EX.search(entry.group('label'))
+                    lineNumbers[name] = int(lineMatch.group('linenumber')) if lineMatch is not None else -1
+            else:
+                source = CallGraphInfoTable.__functionName(entry.group('source'))
+                calls.setdefault(source, []).append((CallGraphInfoTable.__functionName(entry.group('target')), entry.group('location')))
+
+        launches = dict()
+        for name, edges in calls.items():
+            if name not in functions:
+                continue
+            functionCalls = functions[name]
+            for callee, location in edges:
+                if SubroutineFullName.validFullName(callee) or InnerSubroutineName.validInnerSubroutineName(callee):
+                    functionCalls.append((callee, CallGraphInfoTable.__lineNumber(location), 0))
+                elif callee in CallGraphInfoTable.OMP_LAUNCHERS or callee.startswith(CallGraphInfoTable.OMP_LAUNCHER_PREFIX):
+                    launches.setdefault(name, []).append(len(functionCalls))
+                    functionCalls.append(None)
+
+        CallGraphInfoTable.__assignOmpRegions(functions, lineNumbers, launches)
+        for name, functionCalls in functions.items():
+            if None in functionCalls:
+                functions[name] = [call for call in functionCalls if call is not None]
+        return functions
+
+    @staticmethod
+    def __assignOmpRegions(functions, lineNumbers, launches):
+        '''Replaces the placeholders of the GOMP calls by (ompRegion, None, None).
+           The regions of a host function, ordered by the line of their directive, are the nodes of a tree in pre-order,
+           and the number of GOMP calls of each node is the number of its children.'''
+        regions = dict()
+        for name in functions:
+            ompMatch = CallGraphInfoTable.__OMP_REG_EX.match(name)
+            if ompMatch is not None:
+                regions.setdefault(ompMatch.group('host'), []).append((lineNumbers[name], int(ompMatch.group('number')), name))
+        for host, hostRegions in regions.items():
+            if host not in functions:
+                continue
+            stack = [(host, iter(launches.get(host, [])))]
+            for _, _, region in sorted(hostRegions):
+                while stack:
+                    parent, parentLaunches = stack[-1]
+                    launch = next(parentLaunches, None)
+                    if launch is not None:
+                        break
+                    stack.pop()
+                if not stack:
+                    break
+                functions[parent][launch] = (region, None, None)
+                stack.append((region, iter(launches.get(region, []))))
+
+    @staticmethod
+    def __functionName(title):
+        # Local functions, e.g. inner subroutines, are prefixed by the file name
+        return title.rpartition(':')[2]
+
+    @staticmethod
+    def __lineNumber(location):
+        if location is None:
+            return -1
+        return int(location.rsplit(':', 2)[1])
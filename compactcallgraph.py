@@ -0,0 +1,228 @@
+from array import array
+from assertions import assertType
+from source import SubroutineFullName, SubroutineName, InnerSubroutineName
+from callgraph import CallGraph
+
+class CompactCallGraph(object):
+    '''Read-only call graph with the subroutine names interned to integer IDs. The calls are stored in compressed sparse row format:
+       the calls of the subroutine with ID i are at the positions offsets[i] to offsets[i + 1] of the integer arrays
+       of callee IDs, line numbers and discriminators, in the order they were added to the CallGraph.
+       The subroutines of the call graph get the IDs 0 (the root) to subroutineCount - 1, callees that are not part
+       of the call graph get the following IDs and have no calls. The callers are indexed in the same format when they are needed.'''
+
+    ATTR_ROOT_SUBROUTINE = 'rootSubroutine'
+    ATTR_SUBROUTINE_COUNT = 'subroutineCount'
+    ATTR_NAMES = 'names'
+    ATTR_HOSTS = 'hosts'
+    ATTR_OFFSETS = 'offsets'
+    ATTR_CALLEES = 'callees'
+    ATTR_LINE_NUMBERS = 'lineNumbers'
+    ATTR_DISCRIMINATORS = 'discriminators'
+
+    def __init__(self, names, subroutineCount, offsets, callees, lineNumbers, discriminators):
+        assertType(names, 'names', list)
+        assertType(subroutineCount, 'subroutineCount', int)
+        assertType(offsets, 'offsets', array)
+        assertType(callees, 'callees', array)
+        assertType(lineNumbers, 'lineNumbers', array)
+        assertType(discriminators, 'discriminators', array)
+        if len(offsets) != subroutineCount + 1 or not len(callees) == len(lineNumbers) == len(discriminators) == offsets[-1]:
+            raise ValueError('Inconsistent CompactCallGraph arrays')
+
+        self.__names = names
+        self.__ids = {name: i for i, name in enumerate(names)}
+        self.__subroutineCount = subroutineCount
+        self.__offsets = offsets
+        self.__callees = callees
+        self.__lineNumbers = lineNumbers
+        self.__discriminators = discriminators
+        self.__callerOffsets = None
+        self.__callers = None
+
+    @staticmethod
+    def fromCallGraph(callGraph):
+        assertType(callGraph, 'callGraph', CallGraph)
+
+        root = callGraph.getRoot()
+        names = []
+        if root is not None and root in callGraph:
+            names.append(root)
+        names.extend(name for name in callGraph.getAllSubroutineNames() if name != root)
+        subroutineCount = len(names)
+        ids = {name: i for i, name in enumerate(names)}
+
+        offsets = array('q', [0])
+        callees = array('l')
+        lineNumbers = array('l')
+        discriminators = array('l')
+        for name in names[:subroutineCount]:
+            for calleeName, lineNumber, discriminator in callGraph.getCallSites(name):
+                calleeId = ids.get(calleeName)
+                if calleeId is None:
+                    calleeId = ids[calleeName] = len(names)
+                    names.append(calleeName)
+                callees.append(calleeId)
+                lineNumbers.append(lineNumber)
+                discriminators.append(discriminator)
+            offsets.append(len(callees))
+
+        return CompactCallGraph(names, subroutineCount, offsets, callees, lineNumbers, discriminators)
+
+    def toCallGraph(self):
+        callGraph = CallGraph()
+        names = self.__names
+        for name in names[:self.__subroutineCount]:
+            callGraph.addSubroutine(name)
+        offsets = self.__offsets
+        callees = self.__callees
+        lineNumbers = self.__lineNumbers
+        discriminators = self.__discriminators
+        for i in range(self.__subroutineCount):
+            callerName = names[i]
+            for position in range(offsets[i], offsets[i + 1]):
+                callGraph.addCall(callerName, names[callees[position]], lineNumbers[position], discriminators[position])
+        return callGraph
+
+    def serialize(self):
+        ser = dict()
+        names = self.__names
+        ser[CompactCallGraph.ATTR_ROOT_SUBROUTINE] = str(names[0]) if self.__subroutineCount else None
+        ser[CompactCallGraph.ATTR_SUBROUTINE_COUNT] = self.__subroutineCount
+        ser[CompactCallGraph.ATTR_NAMES] = [str(name) for name in names]
+        ser[CompactCallGraph.ATTR_HOSTS] = {str(i): str(name.getHostName()) for i, name in enumerate(names) if isinstance(name, InnerSubroutineName)}
+        ser[CompactCallGraph.ATTR_OFFSETS] = self.__offsets.tolist()
+        ser[CompactCallGraph.ATTR_CALLEES] = self.__callees.tolist()
+        ser[CompactCallGraph.ATTR_LINE_NUMBERS] = self.__lineNumbers.tolist()
+        ser[CompactCallGraph.ATTR_DISCRIMINATORS] = self.__discriminators.tolist()
+
+        return ser
+
+    @staticmethod
+    def deserialize(ser):
+        for attribute in (CompactCallGraph.ATTR_SUBROUTINE_COUNT, CompactCallGraph.ATTR_NAMES, CompactCallGraph.ATTR_HOSTS, CompactCallGraph.ATTR_OFFSETS,
+                          CompactCallGraph.ATTR_CALLEES, CompactCallGraph.ATTR_LINE_NUMBERS, CompactCallGraph.ATTR_DISCRIMINATORS):
+            if attribute not in ser:
+                raise ValueError('No valid CompactCallGraph serialization')
+
+        hosts = ser[CompactCallGraph.ATTR_HOSTS]
+        names = []
+        for i, name in enumerate(ser[CompactCallGraph.ATTR_NAMES]):
+            name = str(name)
+            if SubroutineFullName.validFullName(name):
+                names.append(SubroutineFullName(name))
+            else:
+                names.append(InnerSubroutineName(name, SubroutineFullName(str(hosts[str(i)]))))
+
+        return CompactCallGraph(names, ser[CompactCallGraph.ATTR_SUBROUTINE_COUNT], array('q', ser[CompactCallGraph.ATTR_OFFSETS]),
+                                array('l', ser[CompactCallGraph.ATTR_CALLEES]), array('l', ser[CompactCallGraph.ATTR_LINE_NUMBERS]),
+                                array('l', ser[CompactCallGraph.ATTR_DISCRIMINATORS]))
+
+    def __contains__(self, subroutineName):
+        subroutineId = self.__ids.get(subroutineName)
+        return subroutineId is not None and subroutineId < self.__subroutineCount
+
+    def __len__(self):
+        return self.__subroutineCount
+
+    def getRoot(self):
+        if self.__subroutineCount == 0:
+            return None
+        return self.__names[0]
+
+    def getAllSubroutineNames(self):
+        return self.__names[:self.__subroutineCount]
+
+    def getCallCount(self):
+        return len(self.__callees)
+
+    def getSubroutineId(self, subroutineName):
+        '''Returns the ID of the given subroutine or callee, or None if it's unknown'''
+        assertType(subroutineName, 'subroutineName', SubroutineName)
+        return self.__ids.get(subroutineName)
+
+    def getSubroutineName(self, subroutineId):
+        return self.__names[subroutineId]
+
+    def getCalleeIds(self, subroutineId):
+        '''Returns the IDs of the callees of all calls of the given subroutine as array, in the order of the calls'''
+        if subroutineId >= self.__subroutineCount:
+            return array('l')
+        return self.__callees[self.__offsets[subroutineId]:self.__offsets[subroutineId + 1]]
+
+    def getCallerIds(self, subroutineId):
+        '''Returns the distinct IDs of the callers of the given subroutine or callee as array, in ascending order'''
+        callerOffsets, callers = self.__getCallers()
+        return callers[callerOffsets[subroutineId]:callerOffsets[subroutineId + 1]]
+
+    def getCallees(self, callerName):
+        return set(self.__names[calleeId] for calleeId in self.getCalleeIds(self.__getId(callerName, 'Caller')))
+
+    def getCallSites(self, callerName):
+        '''Returns the calls of the given subroutine as list of tuples (calleeName, lineNumber, discriminator) in the order they were added'''
+        subroutineId = self.__getId(callerName, 'Caller')
+        names = self.__names
+        return [(names[self.__callees[position]], self.__lineNumbers[position], self.__discriminators[position])
+                for position in range(self.__offsets[subroutineId], self.__offsets[subroutineId + 1])]
+
+    def getCallers(self, calleeName):
+        return set(self.__names[callerId] for callerId in self.getCallerIds(self.__getId(calleeName, 'Callee')))
+
+    def getReachableIds(self, subrootId):
+        '''Returns the IDs of the subroutines reachable from the given one as array, in the order of a depth-first traversal
+           which visits the callees of a subroutine in the order of their first call, like CallGraph.extractSubgraph'''
+        offsets = self.__offsets
+        callees = self.__callees
+        subroutineCount = self.__subroutineCount
+        visited = bytearray(len(self.__names))
+        visited[subrootId] = 1
+        reachable = array('l', [subrootId])
+        stack = [(offsets[subrootId], offsets[subrootId + 1])] if subrootId < subroutineCount else []
+        while stack:
+            position, end = stack[-1]
+            while position < end and visited[callees[position]]:
+                position += 1
+            if position == end:
+                stack.pop()
+                continue
+            stack[-1] = (position + 1, end)
+            calleeId = callees[position]
+            visited[calleeId] = 1
+            reachable.append(calleeId)
+            if calleeId < subroutineCount:
+                stack.append((offsets[calleeId], offsets[calleeId + 1]))
+        return reachable
+
+    def getReachableSubroutineNames(self, subrootName):
+        return [self.__names[subroutineId] for subroutineId in self.getReachableIds(self.__getId(subrootName, 'Subroutine'))]
+
+    def getMemorySize(self):
+        '''Returns the approximate number of bytes used by the arrays. The name objects are not counted.'''
+        columns = [self.__offsets, self.__callees, self.__lineNumbers, self.__discriminators]
+        if self.__callers is not None:
+            columns.extend((self.__callerOffsets, self.__callers))
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def __getId(self, subroutineName, role):
+        assertType(subroutineName, 'subroutineName', SubroutineName)
+        if subroutineName not in self:
+            raise ValueError(role + " subroutine not found in CallGraph: " + str(subroutineName))
+        return self.__ids[subroutineName]
+
+    def __getCallers(self):
+        '''Builds the transposed CSR arrays of the distinct callers of every ID'''
+        if self.__callers is None:
+            offsets = self.__offsets
+            callees = self.__callees
+            pairs = set()
+            for callerId in range(self.__subroutineCount):
+                for position in range(offsets[callerId], offsets[callerId + 1]):
+                    pairs.add((callees[position], callerId))
+            counts = [0] * (len(self.__names) + 1)
+            for calleeId, _ in pairs:
+                counts[calleeId + 1] += 1
+            callerOffsets = array('q', counts)
+            for i in range(1, len(callerOffsets)):
+                callerOffsets[i] += callerOffsets[i - 1]
+            self.__callerOffsets = callerOffsets
+            self.__callers = array('l', (callerId for _, callerId in sorted(pairs)))
+        return (self.__callerOffsets, self.__callers)
@@ -3,16 +3,29 @@ import os
 # Config file for FortranCallGraph
 # Can be placed in FortranCallGraph's root directory or in a subdirectory called config or at any place and picked with -cf
 
-# Directory where serialized call trees are stored for quicker analysis
-# OPTIONAL: If omitted call trees won't be cached
+# Directory where serialized call trees and file indexes are stored for quicker analysis
+# OPTIONAL: If omitted call trees and indexes won't be cached
 CACHE_DIR = os.path.dirname(os.path.realpath(__file__)) + '/cache'
 
+# Maximum memory in megabytes for parsed source files. If exceeded, the least recently used files are dropped and parsed again when needed.
+# Counted are the statements, line offsets, modules, subroutines and their variables, estimated per object. 
+# The types collected from all modules are kept regardless of the limit.
+# OPTIONAL, default: no limit
+CACHE_MEMORY_LIMIT = None
+
 # Locations of the assembler files 
 # Directories are searched in the order of this list
 # Subdirectories are included automatically 
 # REQUIRED
 ASSEMBLER_DIRS = [] 
 
+# Kind of the files in ASSEMBLER_DIRS the call graph is built from:
+# 'assembler': assembler files (.s), compiled with -S -g -O0
+# 'objects': object files (.o), compiled with -c -g -O0
+# 'callgraphinfo': call graph files (.ci), compiled with -c -g -O0 -fcallgraph-info
+# OPTIONAL, default: 'assembler'
+CALL_GRAPH_FILES = 'assembler'
+
 # Locations of the original source files
 # same as above
 # REQUIRED
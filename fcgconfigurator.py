@@ -6,9 +6,12 @@ CFG_SOURCE_DIRS = 'SOURCE_DIRS'
 CFG_SOURCE_DIRS_LEGACY = 'SOURCE_DIR'
 CFG_ASSEMBLER_DIRS = 'ASSEMBLER_DIRS'
 CFG_ASSEMBLER_DIRS_LEGACY = 'ASSEMBLER_DIR'
+CFG_CALL_GRAPH_FILES = 'CALL_GRAPH_FILES'
+CFG_CALL_GRAPH_FILES_VALUES = ('assembler', 'objects', 'callgraphinfo')
 CFG_SPECIAL_MODULE_FILES = 'SPECIAL_MODULE_FILES'
 CFG_SOURCE_FILES_PREPROCESSED = 'SOURCE_FILES_PREPROCESSED'
 CFG_CACHE_DIR = 'CACHE_DIR'
+CFG_CACHE_MEMORY_LIMIT = 'CACHE_MEMORY_LIMIT'
 CFG_EXCLUDE_MODULES = 'EXCLUDE_MODULES'
 CFG_IGNORE_GLOBALS_FROM_MODULES = 'IGNORE_GLOBALS_FROM_MODULES'
 CFG_IGNORE_DERIVED_TYPES = 'IGNORE_DERIVED_TYPES'
@@ -57,6 +60,12 @@ def loadFortranCallGraphConfiguration(configFile, incomplete = False, baseConfig
     elif isinstance(config[CFG_ASSEMBLER_DIRS], str):
         config[CFG_ASSEMBLER_DIRS] = [config[CFG_ASSEMBLER_DIRS]]
         
+    if CFG_CALL_GRAPH_FILES not in config or not config[CFG_CALL_GRAPH_FILES]:
+        config[CFG_CALL_GRAPH_FILES] = CFG_CALL_GRAPH_FILES_VALUES[0]
+    elif config[CFG_CALL_GRAPH_FILES] not in CFG_CALL_GRAPH_FILES_VALUES:
+        printError('Invalid config variable: ' + CFG_CALL_GRAPH_FILES + ' must be one of ' + ', '.join(CFG_CALL_GRAPH_FILES_VALUES), location='FortranCallGraph')
+        configError = True
+
     if CFG_SPECIAL_MODULE_FILES not in config or not config[CFG_SPECIAL_MODULE_FILES]:
         config[CFG_SPECIAL_MODULE_FILES] = {}
         
@@ -66,6 +75,12 @@ def loadFortranCallGraphConfiguration(configFile, incomplete = False, baseConfig
     if CFG_CACHE_DIR not in config or not config[CFG_CACHE_DIR]:
         config[CFG_CACHE_DIR] = None
 
+    if CFG_CACHE_MEMORY_LIMIT not in config or not config[CFG_CACHE_MEMORY_LIMIT]:
+        config[CFG_CACHE_MEMORY_LIMIT] = None
+    elif not isinstance(config[CFG_CACHE_MEMORY_LIMIT], (int, float)) or config[CFG_CACHE_MEMORY_LIMIT] < 0:
+        printError('Invalid config variable: ' + CFG_CACHE_MEMORY_LIMIT + ' must be a positive number of megabytes', location='FortranCallGraph')
+        configError = True
+
     if CFG_EXCLUDE_MODULES not in config or not config[CFG_EXCLUDE_MODULES]:
         config[CFG_EXCLUDE_MODULES] = []
 
@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+from assertions import assertType, assertTypeAll
+from printout import printWarning
+
+class FileNameIndex(object):
+    '''Maps lower case file names to the paths of the files within a list of base directories.
+       The directories are scanned only once, the index can be stored in a cache directory and is revalidated using the mtimes of the directories.'''
+
+    FILE_SUFFIX = '.index'
+
+    ATTR_BASE_DIRS = 'baseDirs'
+    ATTR_DIRECTORIES = 'directories'
+    ATTR_PATHS = 'paths'
+
+    def __init__(self, baseDirs, cacheDir = None, name = 'files'):
+        if isinstance(baseDirs, str):
+            baseDirs = [baseDirs]
+        assertTypeAll(baseDirs, 'baseDirs', str)
+        assertType(cacheDir, 'cacheDir', str, True)
+        assertType(name, 'name', str)
+
+        self.__baseDirs = list(baseDirs)
+        self.__cacheDir = cacheDir
+        self.__name = name
+        self.__directories = None
+        self.__paths = None
+        self.__files = None
+        self.__positions = None
+
+    def findFile(self, fileName):
+        '''Returns the path of the first file with the given name (case insensitive), in the order of os.walk, or None'''
+        assertType(fileName, 'fileName', str)
+
+        return self.__getFiles().get(fileName.lower())
+
+    def findFirstFile(self, fileNames):
+        '''Returns the path of the first file, in the order of os.walk, whose name is one of the given names (case insensitive), or None'''
+        assertTypeAll(fileNames, 'fileNames', str)
+
+        files = self.__getFiles()
+        found = None
+        for fileName in fileNames:
+            fileName = fileName.lower()
+            if fileName in files and (found is None or self.__positions[fileName] < self.__positions[found]):
+                found = fileName
+        if found is None:
+            return None
+        return files[found]
+
+    def getPaths(self):
+        '''Returns the paths of all files in the order of os.walk'''
+        self.__getFiles()
+        return self.__paths
+
+    def getBaseDirs(self):
+        return self.__baseDirs
+
+    def refresh(self):
+        '''Scans the directories again and updates the cache file'''
+        self.__scan()
+        self.__save()
+
+    def __getFiles(self):
+        if self.__files is None:
+            if not self.__load():
+                self.refresh()
+        return self.__files
+
+    def __scan(self):
+        directories = dict()
+        paths = []
+        for baseDir in self.__baseDirs:
+            for root, _, files in os.walk(baseDir):
+                directories[root] = os.stat(root).st_mtime_ns
+                for name in files:
+                    paths.append(os.path.join(root, name))
+        self.__setPaths(directories, paths)
+
+    def __setPaths(self, directories, paths):
+        files = dict()
+        positions = dict()
+        for position, path in enumerate(paths):
+            fileName = os.path.basename(path).lower()
+            if fileName not in files:
+                files[fileName] = path
+                positions[fileName] = position
+        self.__directories = directories
+        self.__paths = paths
+        self.__files = files
+        self.__positions = positions
+
+    def __getCacheFilePath(self):
+        if not self.__cacheDir:
+            return None
+        key = hashlib.md5('\n'.join(self.__baseDirs).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.__cacheDir, self.__name + '-' + key + FileNameIndex.FILE_SUFFIX)
+
+    def __load(self):
+        cacheFilePath = self.__getCacheFilePath()
+        if cacheFilePath is None or not os.path.isfile(cacheFilePath):
+            return False
+
+        try:
+            with open(cacheFilePath) as cacheFile:
+                ser = json.load(cacheFile)
+        except ValueError:
+            printWarning('Ignoring corrupt index file: ' + cacheFilePath, 'FileNameIndex')
+            return False
+
+        if ser.get(FileNameIndex.ATTR_BASE_DIRS) != self.__baseDirs:
+            return False
+        directories = ser.get(FileNameIndex.ATTR_DIRECTORIES, {})
+        for directory, mtime in directories.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+
+        self.__setPaths(directories, ser.get(FileNameIndex.ATTR_PATHS, []))
+        return True
+
+    def __save(self):
+        cacheFilePath = self.__getCacheFilePath()
+        if cacheFilePath is None:
+            return
+
+        if not os.path.exists(self.__cacheDir):
+            os.makedirs(self.__cacheDir)
+
+        ser = dict()
+        ser[FileNameIndex.ATTR_BASE_DIRS] = self.__baseDirs
+        ser[FileNameIndex.ATTR_DIRECTORIES] = self.__directories
+        ser[FileNameIndex.ATTR_PATHS] = self.__paths
+        tmpFilePath = cacheFilePath + '.' + str(os.getpid())
+        with open(tmpFilePath, 'w') as cacheFile:
+            json.dump(ser, cacheFile)
+        os.replace(tmpFilePath, cacheFilePath)
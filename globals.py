@@ -156,6 +156,19 @@ class GlobalVariableTracker(CallGraphAnalyzer):
             
         return variableReferences
     
+    @staticmethod
+    def __matchStatements(caller, regExes):
+        '''Returns the list of the matches of the regular expressions for every statement of the caller, and a dictionary line number => original line number
+           of the statements with at least one match. The line numbers are translated in one batch.'''
+        matches = []
+        lineNumbers = []
+        for lineNumber, statement, _ in caller.getStatements():
+            statementMatches = [regEx.match(statement) for regEx in regExes]
+            matches.append(statementMatches)
+            if any(statementMatches):
+                lineNumbers.append(lineNumber)
+        return (matches, dict(zip(lineNumbers, caller.getSourceFile().getLineMap().toOriginalLineNumbers(lineNumbers))))
+    
     def __trackOutVariables(self, calleeName, assignments):
         variableReferences = set()
         if assignments:
@@ -176,14 +189,13 @@ class GlobalVariableTracker(CallGraphAnalyzer):
         
         variableReferences = set()
         if caller is not None and callee is not None:
-            for lineNumber, statement, _ in caller.getStatements():
+            assignmentRegExes = [re.compile(r'^(?P<alias>[a-z0-9_]+)(\(.*\))?\s*\=\>?\s*.*%' + calleeNameAlternative + '\s*\((?P<arguments>.*)\).*$', re.IGNORECASE) for calleeNameAlternative in calleeNameAlternatives]
+            matches, assemblerLineNumbers = GlobalVariableTracker.__matchStatements(caller, assignmentRegExes)
+            for (lineNumber, _, _), statementMatches in zip(caller.getStatements(), matches):
                 tracker = VariableTracker(self.__sourceFiles, self.__settings, self.__interfaces, self.__types, self.__callGraphBuilder)
-                for calleeNameAlternative in calleeNameAlternatives:
-                    assignmentRegEx = re.compile(r'^(?P<alias>[a-z0-9_]+)(\(.*\))?\s*\=\>?\s*.*%' + calleeNameAlternative + '\s*\((?P<arguments>.*)\).*$', re.IGNORECASE);
-                    assignmentRegExMatch = assignmentRegEx.match(statement)
+                for assignmentRegExMatch in statementMatches:
                     if assignmentRegExMatch is not None:
-                        assemblerLineNumber = lineNumber - caller.getSourceFile().getPreprocessorOffset(lineNumber)
-                        if calleeName in self.__callGraph.findNextCalleesFromLine(callerName, assemblerLineNumber):
+                        if calleeName in self.__callGraph.findNextCalleesFromLine(callerName, assemblerLineNumbers[lineNumber]):
                             alias = assignmentRegExMatch.group('alias')
                             variableReferences.update(tracker.trackAssignment(alias, originalReference, callGraph, lineNumber))
                 variableReferences.update(self.__trackOutVariables(callerName, tracker.getOutAssignments()))
@@ -205,16 +217,15 @@ class GlobalVariableTracker(CallGraphAnalyzer):
 
         variableReferences = set()
         if caller is not None and callee is not None:
-            for lineNumber, statement, _ in caller.getStatements():
+            procedureRegExes = [re.compile(r'^.*(?P<prefix>[^a-z0-9_]+)' + calleeNameAlternative + '\s*\((?P<arguments>.*)\).*$', re.IGNORECASE) for calleeNameAlternative in calleeNameAlternatives]
+            matches, assemblerLineNumbers = GlobalVariableTracker.__matchStatements(caller, procedureRegExes)
+            for (lineNumber, _, _), statementMatches in zip(caller.getStatements(), matches):
                 tracker = VariableTracker(self.__sourceFiles, self.__settings, self.__interfaces, self.__types, self.__callGraphBuilder)
-                for calleeNameAlternative in calleeNameAlternatives:
-                    procedureRegEx = re.compile(r'^.*(?P<prefix>[^a-z0-9_]+)' + calleeNameAlternative + '\s*\((?P<arguments>.*)\).*$', re.IGNORECASE);
-                    procedureRegExMatch = procedureRegEx.match(statement)
+                for calleeNameAlternative, procedureRegExMatch in zip(calleeNameAlternatives, statementMatches):
                     if procedureRegExMatch is not None:
                         isCall = True
                         if calleeNameAlternative != calleeName.getSimpleName():
-                            assemblerLineNumber = lineNumber - caller.getSourceFile().getPreprocessorOffset(lineNumber)
-                            isCall = calleeName in self.__callGraph.findNextCalleesFromLine(callerName, assemblerLineNumber)
+                            isCall = calleeName in self.__callGraph.findNextCalleesFromLine(callerName, assemblerLineNumbers[lineNumber])
                         if isCall:
                             arguments = procedureRegExMatch.group('arguments')
                             arguments = SourceFile.removeUnimportantParentheses(arguments)
@@ -0,0 +1,118 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from assertions import assertType
+
+class PreprocessorLineMap(object):
+    '''Translates line numbers of a preprocessed file into the line numbers of the original files and back.
+       The original coordinates are the ones found in the .loc directives of the assembler files.
+       The map is built once from the line directives ("# 42 "file.F90"") of the preprocessed file,
+       every translation is a binary search over the directive positions.'''
+
+    DIRECTIVE_REG_EX = re.compile(r'^\#\s+(?P<line>\d+)\s(\s*"(?P<file>[^"]*)")?')
+
+    def __init__(self, directives = ()):
+        '''directives: iterable of tuples (lineNumber, originalLineNumber, fileName) in ascending order of the lineNumber,
+           meaning that line lineNumber + 1 of the preprocessed file is line originalLineNumber of file fileName.
+           fileName may be None, if the directive does not name a file.'''
+        self.__directiveLineNumbers = array('i', [0])
+        self.__originalLineNumbers = array('i', [1])
+        self.__fileNames = [None]
+        fileName = None
+        for lineNumber, originalLineNumber, directiveFileName in directives:
+            if directiveFileName is not None:
+                fileName = directiveFileName
+            self.__directiveLineNumbers.append(lineNumber)
+            self.__originalLineNumbers.append(originalLineNumber)
+            self.__fileNames.append(fileName)
+        self.__fileSegments = None
+
+    @staticmethod
+    def fromLines(lines):
+        '''Builds the map from (lineNumber, line) tuples of a preprocessed file'''
+        regEx = PreprocessorLineMap.DIRECTIVE_REG_EX
+        directives = []
+        for i, line in lines:
+            if line.startswith('#'):
+                regExMatch = regEx.match(line)
+                if regExMatch is not None:
+                    directives.append((i, int(regExMatch.group('line')), regExMatch.group('file')))
+        return PreprocessorLineMap(directives)
+
+    def __len__(self):
+        '''Number of line directives'''
+        return len(self.__directiveLineNumbers) - 1
+
+    def getOffset(self, lineNumber):
+        '''Returns the difference lineNumber - originalLineNumber'''
+        k = self.__findSegment(lineNumber)
+        return self.__directiveLineNumbers[k] + 1 - self.__originalLineNumbers[k]
+
+    def toOriginalLineNumber(self, lineNumber):
+        return lineNumber - self.getOffset(lineNumber)
+
+    def getFileName(self, lineNumber):
+        '''Returns the name of the original file of the given line as written in the last line directive before it, or None'''
+        return self.__fileNames[self.__findSegment(lineNumber)]
+
+    def toOriginalLineNumbers(self, lineNumbers):
+        '''Translates a batch of line numbers. Returns a list in the order of the given line numbers.'''
+        directiveLineNumbers = self.__directiveLineNumbers
+        originalLineNumbers = self.__originalLineNumbers
+        lineNumbers = list(lineNumbers)
+        translated = [0] * len(lineNumbers)
+        k = 0
+        last = len(directiveLineNumbers) - 1
+        for index in sorted(range(len(lineNumbers)), key = lineNumbers.__getitem__):
+            lineNumber = lineNumbers[index]
+            while k < last and directiveLineNumbers[k + 1] < lineNumber:
+                k += 1
+            translated[index] = lineNumber - directiveLineNumbers[k] - 1 + originalLineNumbers[k]
+        return translated
+
+    def toPreprocessedLineNumber(self, originalLineNumber, fileName = None):
+        '''Returns the line of the preprocessed file which stems from the given original line, or None if there is no such line.
+           If fileName is None, lines from the file named in the first line directive are searched.
+           If the original line occurs several times, e.g. because the file was included twice, only one of them is returned.'''
+        assertType(originalLineNumber, 'originalLineNumber', int)
+        assertType(fileName, 'fileName', str, True)
+
+        if fileName is None:
+            fileName = self.getMainFileName()
+        segments = self.__getFileSegments().get(fileName)
+        if not segments:
+            return None
+
+        starts, indices = segments
+        for s in range(bisect_right(starts, originalLineNumber) - 1, -1, -1):
+            k = indices[s]
+            lineNumber = self.__directiveLineNumbers[k] + 1 + originalLineNumber - self.__originalLineNumbers[k]
+            if k + 1 >= len(self.__directiveLineNumbers) or lineNumber < self.__directiveLineNumbers[k + 1]:
+                return lineNumber
+        return None
+
+    def toPreprocessedLineNumbers(self, originalLineNumbers, fileName = None):
+        '''Translates a batch of original line numbers, see toPreprocessedLineNumber'''
+        return [self.toPreprocessedLineNumber(originalLineNumber, fileName) for originalLineNumber in originalLineNumbers]
+
+    def getMainFileName(self):
+        '''Returns the file name of the first line directive, i.e. the name of the file given to the preprocessor'''
+        if len(self.__fileNames) > 1:
+            return self.__fileNames[1]
+        return None
+
+    def __findSegment(self, lineNumber):
+        return max(bisect_left(self.__directiveLineNumbers, lineNumber) - 1, 0)
+
+    def __getFileSegments(self):
+        '''Returns a dictionary file name => (starts, indices), where the starts are the ascending original line numbers of
+           the segments of the file and indices the positions of the corresponding directives'''
+        if self.__fileSegments is None:
+            grouped = dict()
+            for k, fileName in enumerate(self.__fileNames):
+                grouped.setdefault(fileName, []).append((self.__originalLineNumbers[k], k))
+            self.__fileSegments = dict()
+            for fileName, segments in grouped.items():
+                segments.sort()
+                self.__fileSegments[fileName] = ([start for start, _ in segments], [k for _, k in segments])
+        return self.__fileSegments
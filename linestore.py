@@ -0,0 +1,165 @@
+import mmap
+import locale
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from assertions import assertType
+
+class LineStore(object):
+    '''Read-only, memory-mapped content of a text file together with a compact array of line start offsets.
+       Lines are decoded only when they are accessed. At most MAX_OPEN_FILES files are kept mapped at once,
+       the least recently used mappings are closed and transparently reopened when needed.'''
+
+    MAX_OPEN_FILES = 256
+    CHUNK_LINES = 1024
+
+    __openStores = OrderedDict()
+
+    def __init__(self, path, encoding = None):
+        assertType(path, 'path', str)
+        assertType(encoding, 'encoding', str, True)
+
+        self.__path = path
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        self.__encoding = encoding
+        self.__buffer = None
+        self.__offsets = None
+
+    def getPath(self):
+        return self.__path
+
+    def getBuffer(self):
+        '''Returns the raw content as mmap or bytes object'''
+        if self.__buffer is None:
+            self.__open()
+        else:
+            LineStore.__openStores.move_to_end(self)
+        return self.__buffer
+
+    def getLineCount(self):
+        return len(self.__getOffsets()) - 1
+
+    def getOffset(self, lineNumber):
+        '''Returns the position of the first byte of the given line. For lineCount + 1 the size of the file is returned.'''
+        return self.__getOffsets()[lineNumber - 1]
+
+    def findLineNumber(self, offset):
+        '''Returns the number of the line containing the byte at the given position'''
+        return bisect_right(self.__getOffsets(), offset)
+
+    def getLine(self, lineNumber):
+        '''Returns the line with the given number (starting at 1) including the line break, like a file object would do'''
+        offsets = self.__getOffsets()
+        return self.__decode(self.getBuffer()[offsets[lineNumber - 1]:offsets[lineNumber]])
+
+    def getLines(self, firstLineNumber = 1, lastLineNumber = None):
+        '''Returns a LineView of (lineNumber, line) tuples'''
+        if lastLineNumber is None:
+            lastLineNumber = self.getLineCount()
+        return LineView(self, range(firstLineNumber, lastLineNumber + 1))
+
+    def iterLines(self, firstLineNumber, lastLineNumber):
+        '''Yields the lines between the given numbers (inclusive). The content is read in chunks of CHUNK_LINES lines.'''
+        offsets = self.__getOffsets()
+        for first in range(firstLineNumber, lastLineNumber + 1, LineStore.CHUNK_LINES):
+            last = min(first + LineStore.CHUNK_LINES - 1, lastLineNumber)
+            chunk = self.getBuffer()[offsets[first - 1]:offsets[last]]
+            for line in chunk.splitlines(True):
+                yield self.__decode(line)
+
+    def getMemorySize(self):
+        '''Returns the number of bytes used by the line offsets. The mapped content is not counted.'''
+        if self.__offsets is None:
+            return 0
+        return self.__offsets.buffer_info()[1] * self.__offsets.itemsize
+
+    def close(self):
+        if self.__buffer is not None:
+            if isinstance(self.__buffer, mmap.mmap):
+                self.__buffer.close()
+            self.__buffer = None
+            LineStore.__openStores.pop(self, None)
+
+    def __decode(self, line):
+        if line.endswith(b'\r\n'):
+            line = line[:-2] + b'\n'
+        elif line.endswith(b'\r'):
+            line = line[:-1] + b'\n'
+        return line.decode(self.__encoding, 'replace')
+
+    def __getOffsets(self):
+        if self.__offsets is None:
+            buf = self.getBuffer()
+            if isinstance(buf, mmap.mmap) and buf.find(b'\r') < 0:
+                buf.seek(0)
+                lengths = map(len, iter(buf.readline, b''))
+            else:
+                lengths = map(len, bytes(buf).splitlines(True))
+            self.__offsets = array('q', accumulate(lengths, initial = 0))
+        return self.__offsets
+
+    def __open(self):
+        while len(LineStore.__openStores) >= LineStore.MAX_OPEN_FILES:
+            LineStore.__openStores.popitem(last = False)[0].close()
+
+        with open(self.__path, 'rb') as openFile:
+            try:
+                try:
+                    self.__buffer = mmap.mmap(openFile.fileno(), 0, access = mmap.ACCESS_READ, trackfd = False)
+                except TypeError:
+                    self.__buffer = mmap.mmap(openFile.fileno(), 0, access = mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty file or no mmap support
+                self.__buffer = openFile.read()
+        if isinstance(self.__buffer, mmap.mmap):
+            LineStore.__openStores[self] = True
+
+
+class LineView(object):
+    '''Read-only sequence of (lineNumber, line) tuples over a range of lines of a LineStore. Slices are views as well.'''
+
+    def __init__(self, store, lineNumbers):
+        assertType(store, 'store', LineStore)
+        assertType(lineNumbers, 'lineNumbers', range)
+
+        self.__store = store
+        self.__lineNumbers = lineNumbers
+
+    def __len__(self):
+        return len(self.__lineNumbers)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return LineView(self.__store, self.__lineNumbers[key])
+        lineNumber = self.__lineNumbers[key]
+        return (lineNumber, self.__store.getLine(lineNumber))
+
+    def __iter__(self):
+        lineNumbers = self.__lineNumbers
+        if lineNumbers.step == 1:
+            return zip(lineNumbers, self.__store.iterLines(lineNumbers.start, lineNumbers.stop - 1))
+        return ((lineNumber, self.__store.getLine(lineNumber)) for lineNumber in lineNumbers)
+
+    def __reversed__(self):
+        return iter(self[::-1])
+
+    def __eq__(self, other):
+        if isinstance(other, LineView) and self.__store is other.__store and self.__lineNumbers == other.__lineNumbers:
+            return True
+        try:
+            return len(self) == len(other) and list(self) == list(other)
+        except TypeError:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def getStore(self):
+        return self.__store
+
+    def getLineNumbers(self):
+        return self.__lineNumbers
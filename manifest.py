@@ -0,0 +1,127 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from assertions import assertType
+
+class FileManifest(object):
+    '''Fingerprints of the files a cached artifact depends on: dictionary path => (size, mtime_ns, inode, hash), None for files which were missing.
+       The files are checked with os.stat, in parallel threads when there are many of them. The content hash of a file is only computed when
+       its size, modification time or inode differ, so files which were touched, copied or rewritten with the same content are still unchanged.
+       Their fingerprints are updated then and can be stored again, so the next check only needs os.stat.'''
+
+    PARALLEL_MIN_FILES = 32
+    THREADS = 8
+
+    def __init__(self, fingerprints = None):
+        assertType(fingerprints, 'fingerprints', dict, True)
+
+        if fingerprints is None:
+            fingerprints = dict()
+        self.__fingerprints = dict(fingerprints)
+        self.__changed = dict()
+        self.__updated = dict()
+
+    def serialize(self):
+        return [[path] + (list(fingerprint) if fingerprint is not None else []) for path, fingerprint in sorted(self.__fingerprints.items())]
+
+    @staticmethod
+    def deserialize(ser):
+        if not isinstance(ser, list):
+            raise ValueError('No valid FileManifest serialization')
+        fingerprints = dict()
+        for entry in ser:
+            if not isinstance(entry, list) or len(entry) not in (1, 5):
+                raise ValueError('No valid FileManifest serialization')
+            fingerprints[entry[0]] = tuple(entry[1:]) if len(entry) == 5 else None
+        return FileManifest(fingerprints)
+
+    def getFingerprints(self):
+        return self.__fingerprints
+
+    def takeUpdatedFingerprints(self):
+        '''Returns the dictionary path => new fingerprint of the files whose stat has changed, but not their content, since the last call'''
+        updated = self.__updated
+        self.__updated = dict()
+        return updated
+
+    def addFile(self, path, fingerprint):
+        '''Adds a file with a stored fingerprint, unless it's already in the manifest'''
+        if path not in self.__fingerprints:
+            self.__fingerprints[path] = fingerprint
+
+    def isChanged(self, path):
+        '''Returns True if the file isn't in the manifest, or differs from its fingerprint'''
+        if path not in self.__changed:
+            self.__check({path: FileManifest.__stat(path)})
+        return self.__changed[path]
+
+    def findChangedFiles(self):
+        '''Returns the set of the paths of the files which differ from their fingerprints. All unchecked files are checked in one batch.'''
+        unchecked = [path for path in self.__fingerprints if path not in self.__changed]
+        self.__check(FileManifest.statFiles(unchecked))
+        return set(path for path, changed in self.__changed.items() if changed)
+
+    def fingerprintFiles(self, paths):
+        '''Returns the dictionary path => current fingerprint for the given files. Unchanged files keep their fingerprints from the manifest, others are hashed.'''
+        unchecked = [path for path in paths if path not in self.__changed]
+        self.__check(FileManifest.statFiles(unchecked))
+        fingerprints = dict()
+        for path in paths:
+            if self.__changed[path]:
+                fingerprints[path] = FileManifest.fingerprint(path)
+            else:
+                fingerprints[path] = self.__fingerprints[path]
+        return fingerprints
+
+    def __check(self, stats):
+        for path, stat in stats.items():
+            fingerprint = self.__fingerprints.get(path, False)
+            if fingerprint is False:
+                changed = True
+            elif stat is None or fingerprint is None:
+                changed = stat is not None or fingerprint is not None
+            elif fingerprint[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+                changed = False
+            else:
+                contentHash = None
+                if fingerprint[3] is not None and stat.st_size == fingerprint[0]:
+                    try:
+                        contentHash = FileManifest.hashFile(path)
+                    except OSError:
+                        pass
+                changed = contentHash is None or contentHash != fingerprint[3]
+                if not changed:
+                    self.__fingerprints[path] = self.__updated[path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino, contentHash)
+            self.__changed[path] = changed
+
+    @staticmethod
+    def fingerprint(path, withHash = True):
+        '''Returns (size, mtime_ns, inode, hash) of the file, with None as hash if withHash is False, or None if the file doesn't exist'''
+        try:
+            stat = os.stat(path)
+            return (stat.st_size, stat.st_mtime_ns, stat.st_ino, FileManifest.hashFile(path) if withHash else None)
+        except OSError:
+            return None
+
+    @staticmethod
+    def statFiles(paths):
+        '''Returns the dictionary path => os.stat_result, None for missing files. Many files are stat'ed by parallel threads.'''
+        if len(paths) < FileManifest.PARALLEL_MIN_FILES:
+            return dict((path, FileManifest.__stat(path)) for path in paths)
+        with ThreadPoolExecutor(FileManifest.THREADS) as executor:
+            return dict(zip(paths, executor.map(FileManifest.__stat, paths)))
+
+    @staticmethod
+    def hashFile(path):
+        sha = hashlib.sha1()
+        with open(path, 'rb') as openFile:
+            for block in iter(lambda: openFile.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    @staticmethod
+    def __stat(path):
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
@@ -0,0 +1,175 @@
+import os
+import re
+import json
+import hashlib
+from assertions import assertType
+from fileindex import FileNameIndex
+from printout import printWarning
+
+class ModuleFileIndex(object):
+    '''Maps module and program names to the source files defining them.
+       Every source file is scanned only once, the result is stored in the cache directory and only changed files are scanned again.'''
+
+    FILE_SUFFIX = '.modules'
+    SOURCE_FILE_SUFFIXES = ('.f90',)
+
+    ATTR_VERSION = 'version'
+    ATTR_FILES = 'files'
+    VERSION = 2
+
+    # The same patterns as SourceFile.MODULE_REG_EX and SourceFile.END_MODULE_REG_EX, matched on statements
+    MODULE_REG_EX = re.compile(r'\s*((MODULE)|(PROGRAM))\s+(?P<name>[a-z0-9_]{1,63})', re.IGNORECASE)
+    END_MODULE_REG_EX = re.compile(r'\s*END\s*((MODULE)|(PROGRAM))', re.IGNORECASE)
+    # Everything before the first exclamation mark outside of a character constant
+    COMMENT_REG_EX = re.compile(r'''(?:[^!'"]+|'[^']*'?|"[^"]*"?)*''')
+
+    def __init__(self, fileIndex, cacheDir = None, name = 'modules'):
+        assertType(fileIndex, 'fileIndex', FileNameIndex)
+        assertType(cacheDir, 'cacheDir', str, True)
+        assertType(name, 'name', str)
+
+        self.__fileIndex = fileIndex
+        self.__cacheDir = cacheDir
+        self.__name = name
+        self.__files = None
+        self.__modules = None
+
+    def findModuleFile(self, moduleName):
+        '''Returns the path of the source file defining the given module or None'''
+        assertType(moduleName, 'moduleName', str)
+
+        return self.__getModules().get(moduleName.lower())
+
+    def findModuleFileName(self, moduleName):
+        '''Returns the name (without directory) of the source file defining the given module or None'''
+        assertType(moduleName, 'moduleName', str)
+
+        path = self.findModuleFile(moduleName)
+        if path is None:
+            return None
+        return os.path.basename(path)
+
+    def getModuleNames(self):
+        return self.__getModules().keys()
+
+    def getFileIndex(self):
+        return self.__fileIndex
+
+    def refresh(self):
+        '''Scans all changed or new source files and updates the cache file'''
+        oldFiles = self.__files
+        if oldFiles is None:
+            oldFiles = self.__load()
+
+        files = dict()
+        changed = False
+        for path in self.__fileIndex.getPaths():
+            if not path.lower().endswith(ModuleFileIndex.SOURCE_FILE_SUFFIXES):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = oldFiles.get(path)
+            if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                entry = [stat.st_size, stat.st_mtime_ns, ModuleFileIndex.scanModuleNames(path)]
+                changed = True
+            files[path] = entry
+        changed = changed or files.keys() != oldFiles.keys()
+
+        modules = dict()
+        for path in self.__fileIndex.getPaths():
+            if path in files:
+                for moduleName in files[path][2]:
+                    modules.setdefault(moduleName, path)
+
+        self.__files = files
+        self.__modules = modules
+        if changed:
+            self.__save()
+
+    @staticmethod
+    def scanModuleNames(path):
+        '''Returns the lower case names of all modules and programs defined in the given file'''
+        assertType(path, 'path', str)
+
+        with open(path, errors='replace') as sourceFile:
+            content = sourceFile.read()
+        names = []
+        lowerContent = content.lower()
+        if 'module' not in lowerContent and 'program' not in lowerContent:
+            return names
+        inModule = False
+        for statement in ModuleFileIndex.__splitStatements(content):
+            if not inModule:
+                regExMatch = ModuleFileIndex.MODULE_REG_EX.match(statement)
+                if regExMatch is not None:
+                    inModule = True
+                    name = regExMatch.group('name').lower()
+                    if name not in names:
+                        names.append(name)
+            elif ModuleFileIndex.END_MODULE_REG_EX.match(statement) is not None:
+                inModule = False
+        return names
+
+    @staticmethod
+    def __splitStatements(content):
+        '''Yields the statements of the free form source code, without comments, with continued lines joined and lines split at semicolons'''
+        statement = ''
+        for line in content.splitlines():
+            code = ModuleFileIndex.COMMENT_REG_EX.match(line).group(0).strip()
+            if statement and code.startswith('&'):
+                code = code[1:]
+            if code.endswith('&'):
+                statement += code[:-1]
+                continue
+            statement += code
+            for part in statement.split(';'):
+                if part:
+                    yield part
+            statement = ''
+        if statement:
+            yield statement
+
+    def __getModules(self):
+        if self.__modules is None:
+            self.refresh()
+        return self.__modules
+
+    def __getCacheFilePath(self):
+        if not self.__cacheDir:
+            return None
+        key = hashlib.md5('\n'.join(self.__fileIndex.getBaseDirs()).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.__cacheDir, self.__name + '-' + key + ModuleFileIndex.FILE_SUFFIX)
+
+    def __load(self):
+        cacheFilePath = self.__getCacheFilePath()
+        if cacheFilePath is None or not os.path.isfile(cacheFilePath):
+            return dict()
+
+        try:
+            with open(cacheFilePath) as cacheFile:
+                ser = json.load(cacheFile)
+        except ValueError:
+            printWarning('Ignoring corrupt index file: ' + cacheFilePath, 'ModuleFileIndex')
+            return dict()
+
+        if ser.get(ModuleFileIndex.ATTR_VERSION) != ModuleFileIndex.VERSION:
+            return dict()
+        return ser.get(ModuleFileIndex.ATTR_FILES, dict())
+
+    def __save(self):
+        cacheFilePath = self.__getCacheFilePath()
+        if cacheFilePath is None:
+            return
+
+        if not os.path.exists(self.__cacheDir):
+            os.makedirs(self.__cacheDir)
+
+        ser = dict()
+        ser[ModuleFileIndex.ATTR_VERSION] = ModuleFileIndex.VERSION
+        ser[ModuleFileIndex.ATTR_FILES] = self.__files
+        tmpFilePath = cacheFilePath + '.' + str(os.getpid())
+        with open(tmpFilePath, 'w') as cacheFile:
+            json.dump(ser, cacheFile)
+        os.replace(tmpFilePath, cacheFilePath)
@@ -0,0 +1,286 @@
+import re
+import zlib
+import struct
+from bisect import bisect_right
+from assemblercalls import AssemblerCallTable
+from source import SubroutineFullName, InnerSubroutineName
+
+class ObjectFileCallTable(AssemblerCallTable):
+    '''Table of the calls in the functions of ELF object files (x86-64, as produced by gfortran -c -g), see AssemblerCallTable.
+       The calls are recovered from the relocations of the code sections, the line numbers and discriminators from the .debug_line section.
+       The tables are identical to the ones of the assembler files the object files were assembled from, with these exceptions:
+       Only function symbols are listed, not the labels of variables. Calls of local functions, e.g. inner subroutines, don't need a relocation,
+       they are found as call instructions whose target is the start of a function.'''
+
+    SUB_DIR = 'objects'
+
+    @staticmethod
+    def parseFile(filePath):
+        '''Reads the ELF object file and returns the dictionary function label => list of calls'''
+        with open(filePath, 'rb') as openFile:
+            return ELFObjectFile(openFile.read()).getFunctions()
+
+
+class ELFObjectFile(object):
+    '''Minimal reader of relocatable ELF64 little-endian object files'''
+
+    SHT_SYMTAB = 2
+    SHT_RELA = 4
+    SHF_COMPRESSED = 0x800
+    STT_FUNC = 2
+    STT_SECTION = 3
+    STT_FILE = 4
+    SHN_UNDEF = 0
+    R_X86_64_64 = 1
+    R_X86_64_PC32 = 2
+    R_X86_64_PLT32 = 4
+    CALL_OPCODE = b'\xe8'
+
+    __OMP_REG_EX = re.compile(r'^.*[^a-z0-9_](?P<omp>[a-z0-9_]+\._omp_fn\.\d+).*$', re.IGNORECASE)
+
+    def __init__(self, data):
+        if data[:4] != b'\x7fELF' or data[4] != 2 or data[5] != 1:
+            raise ValueError('Not an ELF64 little-endian object file')
+        self.__data = data
+        self.__sections = self.__readSectionHeaders()
+        self.__symbols = self.__readSymbols()
+
+    def getFunctions(self):
+        '''Returns the dictionary function label => list of tuples (callee, lineNumber, discriminator), like AssemblerCallTable.parseFile'''
+        lineTable = self.__readLineTable()
+        relocations = self.__readCodeRelocations()
+        functions = dict()
+        starts = dict()
+        ranges = dict()
+        for name, symbolType, sectionIndex, value, size in self.__symbols:
+            if symbolType == ELFObjectFile.STT_FUNC and sectionIndex != ELFObjectFile.SHN_UNDEF:
+                starts.setdefault((sectionIndex, value), name)
+                if (sectionIndex, value, size) not in ranges:
+                    ranges[(sectionIndex, value, size)] = []
+                functions[name] = ranges[(sectionIndex, value, size)]
+        sectionData = dict()
+        for (sectionIndex, start, size), calls in ranges.items():
+            if sectionIndex not in sectionData:
+                sectionData[sectionIndex] = self.__getSectionData(sectionIndex)
+            code = sectionData[sectionIndex]
+            sectionRelocations = relocations.get(sectionIndex, dict())
+            addresses, locations = lineTable.get(sectionIndex, ([], []))
+            for offset, callee in self.__findCalls(code, start, start + size, sectionIndex, sectionRelocations, starts):
+                if SubroutineFullName.validFullName(callee) or InnerSubroutineName.validInnerSubroutineName(callee):
+                    row = bisect_right(addresses, offset) - 1
+                    calls.append((callee, ) + (locations[row] if row >= 0 else (-1, 0)))
+                elif callee == 'GOMP_parallel':
+                    ompRegion = self.__findOpenMPRegion(code, offset, sectionIndex, sectionRelocations, starts, addresses)
+                    if ompRegion is not None:
+                        calls.append((ompRegion, None, None))
+        return functions
+
+    def __findCalls(self, code, start, end, sectionIndex, sectionRelocations, starts):
+        '''Yields tuples (offset, callee) of the call instructions between start and end'''
+        position = code.find(ELFObjectFile.CALL_OPCODE, start, end)
+        while position >= 0 and position + 5 <= end:
+            relocation = sectionRelocations.get(position + 1)
+            if relocation is not None:
+                callee = self.__getRelocationTarget(relocation, sectionIndex, starts)
+                if callee is not None:
+                    yield (position, callee)
+                    position += 4
+            elif not self.__overlapsRelocation(sectionRelocations, position):
+                target = position + 5 + struct.unpack_from('<i', code, position + 1)[0]
+                callee = starts.get((sectionIndex, target))
+                if callee is not None:
+                    yield (position, callee)
+                    position += 4
+            position = code.find(ELFObjectFile.CALL_OPCODE, position + 1, end)
+
+    def __overlapsRelocation(self, sectionRelocations, position):
+        return any(offset in sectionRelocations for offset in range(position - 3, position + 5))
+
+    def __getRelocationTarget(self, relocation, sectionIndex, starts):
+        '''Returns the name of the called symbol, or None if the relocation doesn't belong to a call'''
+        relocationType, symbolIndex, addend = relocation
+        if relocationType not in (ELFObjectFile.R_X86_64_PLT32, ELFObjectFile.R_X86_64_PC32):
+            return None
+        name, symbolType, symbolSection, value, _ = self.__symbols[symbolIndex]
+        if symbolType == ELFObjectFile.STT_SECTION:
+            return starts.get((symbolSection, value + addend + 4))
+        return name
+
+    def __findOpenMPRegion(self, code, offset, sectionIndex, sectionRelocations, starts, addresses):
+        '''Returns the outlined function of an OpenMP region, if the instruction right before the call of GOMP_parallel loads its address.
+           Like in the assembler file there must be no line number entry between both instructions.'''
+        leaStart = offset - 7
+        if leaStart < 0 or code[leaStart] not in (0x48, 0x4C) or code[leaStart + 1] != 0x8D or code[leaStart + 2] & 0xC7 != 0x05:
+            return None
+        if addresses and addresses[max(bisect_right(addresses, offset) - 1, 0)] == offset:
+            return None
+        relocation = sectionRelocations.get(leaStart + 3)
+        if relocation is not None:
+            name, symbolType, symbolSection, value, _ = self.__symbols[relocation[1]]
+            if symbolType == ELFObjectFile.STT_SECTION:
+                name = starts.get((symbolSection, value + relocation[2] + 4))
+        else:
+            name = starts.get((sectionIndex, offset + struct.unpack_from('<i', code, leaStart + 3)[0]))
+        if name is None:
+            return None
+        regExMatch = ELFObjectFile.__OMP_REG_EX.match('leaq\t' + name + '(%rip), %rax')
+        if regExMatch is None:
+            return None
+        return regExMatch.group('omp')
+
+    def __readSectionHeaders(self):
+        '''Returns a list of tuples (name, type, flags, offset, size, link, info) for all sections'''
+        data = self.__data
+        sectionHeaderOffset, = struct.unpack_from('<Q', data, 0x28)
+        headerSize, headerCount, namesIndex = struct.unpack_from('<HHH', data, 0x3A)
+        headers = [struct.unpack_from('<IIQQQQII', data, sectionHeaderOffset + i * headerSize) for i in range(headerCount)]
+        namesOffset = headers[namesIndex][4] if headers else 0
+        return [(self.__readString(namesOffset + nameOffset), sectionType, flags, offset, size, link, info)
+                for nameOffset, sectionType, flags, _, offset, size, link, info in headers]
+
+    def __readString(self, offset):
+        return self.__data[offset:self.__data.index(b'\0', offset)].decode('utf-8', 'replace')
+
+    def __getSectionData(self, sectionIndex):
+        _, _, flags, offset, size, _, _ = self.__sections[sectionIndex]
+        data = self.__data[offset:offset + size]
+        if flags & ELFObjectFile.SHF_COMPRESSED:
+            data = zlib.decompress(data[24:])
+        return data
+
+    def __findSection(self, name):
+        for index, section in enumerate(self.__sections):
+            if section[0] == name:
+                return index
+        return None
+
+    def __readSymbols(self):
+        '''Returns a list of tuples (name, type, sectionIndex, value, size) in the order of the symbol table'''
+        for name, sectionType, _, offset, size, link, _ in self.__sections:
+            if sectionType == ELFObjectFile.SHT_SYMTAB:
+                namesOffset = self.__sections[link][3]
+                symbols = []
+                for nameOffset, info, _, sectionIndex, value, symbolSize in struct.iter_unpack('<IBBHQQ', self.__data[offset:offset + size]):
+                    symbols.append((self.__readString(namesOffset + nameOffset), info & 0xF, sectionIndex, value, symbolSize))
+                return symbols
+        return []
+
+    def __readRelocations(self, sectionIndex):
+        '''Returns a dictionary offset => (type, symbolIndex, addend) of the relocations of the given section'''
+        relocations = dict()
+        for _, sectionType, _, offset, size, _, info in self.__sections:
+            if sectionType == ELFObjectFile.SHT_RELA and info == sectionIndex:
+                for relocationOffset, relocationInfo, addend in struct.iter_unpack('<QQq', self.__data[offset:offset + size]):
+                    relocations[relocationOffset] = (relocationInfo & 0xFFFFFFFF, relocationInfo >> 32, addend)
+        return relocations
+
+    def __readCodeRelocations(self):
+        '''Returns a dictionary sectionIndex => relocations for every section with relocations'''
+        return dict((info, self.__readRelocations(info)) for _, sectionType, _, _, _, _, info in self.__sections if sectionType == ELFObjectFile.SHT_RELA)
+
+    def __readLineTable(self):
+        '''Returns a dictionary sectionIndex => (addresses, locations), where locations are the (lineNumber, discriminator) tuples of the
+           rows of the line number program in ascending order of their addresses'''
+        sectionIndex = self.__findSection('.debug_line')
+        if sectionIndex is None:
+            return dict()
+        data = self.__getSectionData(sectionIndex)
+        relocations = self.__readRelocations(sectionIndex)
+        rows = dict()
+        unitOffset = 0
+        while unitOffset + 4 <= len(data):
+            unitLength, = struct.unpack_from('<I', data, unitOffset)
+            offsetSize = 4
+            position = unitOffset + 4
+            if unitLength == 0xFFFFFFFF:
+                unitLength, = struct.unpack_from('<Q', data, position)
+                offsetSize = 8
+                position += 8
+            unitEnd = position + unitLength
+            self.__readLineProgram(data, position, unitEnd, offsetSize, relocations, rows)
+            unitOffset = unitEnd
+        lineTable = dict()
+        for section, sectionRows in rows.items():
+            sectionRows.sort(key = lambda row: row[0])
+            lineTable[section] = ([row[0] for row in sectionRows], [row[1] for row in sectionRows])
+        return lineTable
+
+    def __readLineProgram(self, data, position, unitEnd, offsetSize, relocations, rows):
+        version, = struct.unpack_from('<H', data, position)
+        position += 2
+        if version >= 5:
+            position += 2
+        headerLength = int.from_bytes(data[position:position + offsetSize], 'little')
+        position += offsetSize
+        programStart = position + headerLength
+        minimumInstructionLength = data[position]
+        position += 2 if version >= 4 else 1
+        lineBase, lineRange, opcodeBase = struct.unpack_from('<xbBB', data, position)
+        standardOpcodeLengths = data[position + 4:position + 3 + opcodeBase]
+
+        position = programStart
+        section, address, line, discriminator = None, 0, 1, 0
+        sequenceRows = []
+        while position < unitEnd:
+            opcode = data[position]
+            position += 1
+            if opcode >= opcodeBase:
+                adjusted = opcode - opcodeBase
+                address += (adjusted // lineRange) * minimumInstructionLength
+                line += lineBase + adjusted % lineRange
+                sequenceRows.append((address, (line, discriminator)))
+                discriminator = 0
+            elif opcode == 0:
+                length, position = ELFObjectFile.__readULEB128(data, position)
+                extendedEnd = position + length
+                extendedOpcode = data[position]
+                if extendedOpcode == 1:
+                    rows.setdefault(section, []).extend(sequenceRows)
+                    section, address, line, discriminator = None, 0, 1, 0
+                    sequenceRows = []
+                elif extendedOpcode == 2:
+                    address = int.from_bytes(data[position + 1:extendedEnd], 'little')
+                    relocation = relocations.get(position + 1)
+                    if relocation is not None and relocation[0] == ELFObjectFile.R_X86_64_64:
+                        _, _, section, value, _ = self.__symbols[relocation[1]]
+                        address = value + relocation[2]
+                elif extendedOpcode == 4:
+                    discriminator, _ = ELFObjectFile.__readULEB128(data, position + 1)
+                position = extendedEnd
+            elif opcode == 1:
+                sequenceRows.append((address, (line, discriminator)))
+                discriminator = 0
+            elif opcode == 2:
+                advance, position = ELFObjectFile.__readULEB128(data, position)
+                address += advance * minimumInstructionLength
+            elif opcode == 3:
+                advance, position = ELFObjectFile.__readSLEB128(data, position)
+                line += advance
+            elif opcode == 8:
+                address += ((255 - opcodeBase) // lineRange) * minimumInstructionLength
+            elif opcode == 9:
+                advance, = struct.unpack_from('<H', data, position)
+                address += advance
+                position += 2
+            else:
+                for _ in range(standardOpcodeLengths[opcode - 1]):
+                    _, position = ELFObjectFile.__readULEB128(data, position)
+
+    @staticmethod
+    def __readULEB128(data, position):
+        result = 0
+        shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                return (result, position)
+
+    @staticmethod
+    def __readSLEB128(data, position):
+        result, end = ELFObjectFile.__readULEB128(data, position)
+        if data[end - 1] & 0x40:
+            result -= 1 << (7 * (end - position))
+        return (result, end)
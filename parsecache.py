@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+from assertions import assertType
+from printout import printWarning, printLine
+
+class SourceFileCache(object):
+    '''Stores the parse results of source files (normalized statements, module and subroutine boundaries) in the cache directory.
+       Entries are keyed by the hash of the file content, so they survive touching, moving or copying of files.
+       Counts hits and misses and the time saved by them, the statistics of every run can be appended to a statistics file.
+       The statistics file is locked while a run is appended, so concurrent runs sharing the cache directory keep all records.'''
+
+    SUB_DIR = 'sources'
+    FILE_SUFFIX = '.parsed'
+    STATISTICS_FILE = 'statistics.json'
+    LOCK_SUFFIX = '.lock'
+    FORMAT_VERSION = 3
+    MAX_STATISTICS_RUNS = 100
+
+    ATTR_VERSION = 'version'
+    ATTR_HASH = 'hash'
+    ATTR_PREPROCESSED = 'preprocessed'
+    ATTR_PARSE_TIME = 'parseTime'
+    ATTR_STATEMENTS = 'statements'
+    ATTR_MODULES = 'modules'
+
+    ATTR_RUN_START = 'start'
+    ATTR_HITS = 'hits'
+    ATTR_MISSES = 'misses'
+    ATTR_TIME_SAVED = 'timeSaved'
+
+    def __init__(self, cacheDir):
+        assertType(cacheDir, 'cacheDir', str)
+
+        self.__cacheDir = cacheDir
+        self.__runStart = time.time()
+        self.__hits = 0
+        self.__misses = 0
+        self.__parseTime = 0.0
+        self.__timeSaved = 0.0
+
+    def getCacheDir(self):
+        return self.__cacheDir
+
+    @staticmethod
+    def hashContent(content):
+        '''Returns the hash of the given bytes-like object, which is used as key for the cache entries'''
+        return hashlib.sha1(content).hexdigest()
+
+    def load(self, contentHash, preprocessed):
+        '''Returns a tuple (statements, modules) or None, if there is no valid entry for the content hash.
+           modules is a list of tuples (name, index, firstLineNumber, declarationLineNumber, lastLineNumber, subroutines),
+           subroutines is a list of tuples (name, isFunction, firstLineNumber, declarationLineNumber, lastLineNumber).'''
+        assertType(contentHash, 'contentHash', str)
+        assertType(preprocessed, 'preprocessed', bool)
+
+        start = time.perf_counter()
+        ser = self.__loadEntry(contentHash, preprocessed)
+        if ser is None:
+            self.__misses += 1
+            return None
+
+        statements = [tuple(statement) for statement in ser[SourceFileCache.ATTR_STATEMENTS]]
+        modules = []
+        for name, index, firstLine, declarationLine, lastLine, subroutines in ser[SourceFileCache.ATTR_MODULES]:
+            modules.append((name, index, firstLine, declarationLine, lastLine, [tuple(subroutine) for subroutine in subroutines]))
+
+        self.__hits += 1
+        self.__timeSaved += ser.get(SourceFileCache.ATTR_PARSE_TIME, 0.0) - (time.perf_counter() - start)
+        return (statements, modules)
+
+    def save(self, contentHash, preprocessed, statements, modules, parseTime = 0.0):
+        '''Stores the parse results of a file. See load for the format. parseTime is the time in seconds needed for parsing.'''
+        assertType(contentHash, 'contentHash', str)
+        assertType(preprocessed, 'preprocessed', bool)
+        assertType(statements, 'statements', list)
+        assertType(modules, 'modules', list)
+        assertType(parseTime, 'parseTime', float)
+
+        self.__parseTime += parseTime
+
+        ser = dict()
+        ser[SourceFileCache.ATTR_VERSION] = SourceFileCache.FORMAT_VERSION
+        ser[SourceFileCache.ATTR_HASH] = contentHash
+        ser[SourceFileCache.ATTR_PREPROCESSED] = preprocessed
+        ser[SourceFileCache.ATTR_PARSE_TIME] = parseTime
+        ser[SourceFileCache.ATTR_STATEMENTS] = statements
+        ser[SourceFileCache.ATTR_MODULES] = modules
+        self.__dump(ser, self.__getCacheFilePath(contentHash, preprocessed))
+
+    def getHitCount(self):
+        return self.__hits
+
+    def getMissCount(self):
+        return self.__misses
+
+    def getParseTime(self):
+        '''Time in seconds spent for parsing files not found in the cache'''
+        return self.__parseTime
+
+    def getTimeSaved(self):
+        '''Parse time of the files found in the cache minus the time needed for loading them, in seconds'''
+        return self.__timeSaved
+
+    def addStatistics(self, hits, misses, parseTime, timeSaved):
+        '''Adds the counts of another cache object, e.g. from a worker process'''
+        assertType(hits, 'hits', int)
+        assertType(misses, 'misses', int)
+        assertType(parseTime, 'parseTime', float)
+        assertType(timeSaved, 'timeSaved', float)
+
+        self.__hits += hits
+        self.__misses += misses
+        self.__parseTime += parseTime
+        self.__timeSaved += timeSaved
+
+    def saveStatistics(self):
+        '''Appends the statistics of this run to the statistics file. Runs without any cache lookup are not recorded.'''
+        if self.__hits + self.__misses == 0:
+            return
+
+        run = dict()
+        run[SourceFileCache.ATTR_RUN_START] = self.__runStart
+        run[SourceFileCache.ATTR_HITS] = self.__hits
+        run[SourceFileCache.ATTR_MISSES] = self.__misses
+        run[SourceFileCache.ATTR_PARSE_TIME] = self.__parseTime
+        run[SourceFileCache.ATTR_TIME_SAVED] = self.__timeSaved
+        statisticsFilePath = self.__getStatisticsFilePath()
+        os.makedirs(os.path.dirname(statisticsFilePath), exist_ok=True)
+        with open(statisticsFilePath + SourceFileCache.LOCK_SUFFIX, 'a') as lockFile:
+            fcntl.flock(lockFile, fcntl.LOCK_EX)
+            runs = self.loadStatistics()
+            runs.append(run)
+            self.__dump(runs[-SourceFileCache.MAX_STATISTICS_RUNS:], statisticsFilePath)
+
+    def loadStatistics(self):
+        '''Returns the list of recorded runs, each a dictionary with the keys start, hits, misses, parseTime and timeSaved'''
+        statisticsFilePath = self.__getStatisticsFilePath()
+        if not os.path.isfile(statisticsFilePath):
+            return []
+
+        try:
+            with open(statisticsFilePath) as statisticsFile:
+                return json.load(statisticsFile)
+        except ValueError:
+            printWarning('Ignoring corrupt statistics file: ' + statisticsFilePath, 'SourceFileCache')
+            return []
+
+    def printReport(self):
+        '''Prints hit rate and time saved of the recorded runs'''
+        runs = self.loadStatistics()
+        if not runs:
+            printLine('No statistics recorded in ' + self.__getStatisticsFilePath())
+            return
+
+        printLine('%-19s %8s %8s %8s %12s %12s' % ('Run', 'Files', 'Hits', 'Hit rate', 'Parse time', 'Time saved'))
+        total = dict.fromkeys((SourceFileCache.ATTR_HITS, SourceFileCache.ATTR_MISSES, SourceFileCache.ATTR_PARSE_TIME, SourceFileCache.ATTR_TIME_SAVED), 0)
+        for run in runs:
+            start = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run[SourceFileCache.ATTR_RUN_START]))
+            printLine(SourceFileCache.__formatRun(start, run))
+            for key in total:
+                total[key] += run[key]
+        printLine(SourceFileCache.__formatRun('Total (' + str(len(runs)) + ' runs)', total))
+
+    @staticmethod
+    def __formatRun(label, run):
+        hits = run[SourceFileCache.ATTR_HITS]
+        files = hits + run[SourceFileCache.ATTR_MISSES]
+        hitRate = 100.0 * hits / files if files else 0.0
+        return '%-19s %8d %8d %7.1f%% %11.3fs %11.3fs' % (label, files, hits, hitRate, run[SourceFileCache.ATTR_PARSE_TIME], run[SourceFileCache.ATTR_TIME_SAVED])
+
+    def __loadEntry(self, contentHash, preprocessed):
+        cacheFilePath = self.__getCacheFilePath(contentHash, preprocessed)
+        if not os.path.isfile(cacheFilePath):
+            return None
+
+        try:
+            with open(cacheFilePath) as cacheFile:
+                ser = json.load(cacheFile)
+        except ValueError:
+            printWarning('Ignoring corrupt cache file: ' + cacheFilePath, 'SourceFileCache')
+            return None
+
+        if ser.get(SourceFileCache.ATTR_VERSION) != SourceFileCache.FORMAT_VERSION or ser.get(SourceFileCache.ATTR_HASH) != contentHash \
+                or ser.get(SourceFileCache.ATTR_PREPROCESSED) != preprocessed:
+            return None
+
+        return ser
+
+    def __dump(self, ser, filePath):
+        directory = os.path.dirname(filePath)
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        tmpFilePath = filePath + '.' + str(os.getpid())
+        with open(tmpFilePath, 'w') as outFile:
+            json.dump(ser, outFile)
+        os.replace(tmpFilePath, filePath)
+
+    def __getCacheFilePath(self, contentHash, preprocessed):
+        key = contentHash + ('-p' if preprocessed else '')
+        return os.path.join(self.__cacheDir, SourceFileCache.SUB_DIR, key + SourceFileCache.FILE_SUFFIX)
+
+    def __getStatisticsFilePath(self):
+        return os.path.join(self.__cacheDir, SourceFileCache.SUB_DIR, SourceFileCache.STATISTICS_FILE)
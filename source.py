@@ -2,6 +2,17 @@
 
 import os.path;
 import re
+import time
+import multiprocessing
+from itertools import chain, takewhile
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from fileindex import FileNameIndex
+from moduleindex import ModuleFileIndex
+from parsecache import SourceFileCache
+from linestore import LineStore
+from statementstore import StatementStore, StatementView
+from linemap import PreprocessorLineMap
 from assertions import assertType, assertTypeAll
 from operator import attrgetter
 from printout import printWarning
@@ -1133,16 +1144,38 @@ class InnerSubroutineName(SubroutineName):
 
         
 class SubroutineContainer(object):
+    
+    SUBROUTINE_REG_EX = re.compile(r'\s*(((ELEMENTAL)|(PURE)|(RECURSIVE))\s+)*SUBROUTINE\s+(?P<name>[a-z0-9_]{1,63})', re.IGNORECASE);
+    FUNCTION_REG_EX = re.compile(r'\s*(((ELEMENTAL)|(PURE)|(RECURSIVE)|(INTEGER)|(LOGICAL)|(DOUBLE(\s+PRECISION)?)|(REAL)|(CHARACTER(\*\d*)?)|(TYPE)|(CLASS))\s*(\(.*\))?\s+)*FUNCTION\s+(?P<name>[a-z0-9_]{1,63})\s*\([a-z0-9_,]*\)\s*(RESULT\s*\((?P<result>[a-z0-9_]{1,63})\))?', re.IGNORECASE);
+    END_REG_EX = re.compile(r'\s*END\s*((SUBROUTINE)|(FUNCTION))', re.IGNORECASE);
+    
+    # Approximate numbers of bytes used by a module or subroutine object, by a variable and by a use or public element, see getMemorySize
+    OBJECT_MEMORY_SIZE = 700
+    VARIABLE_MEMORY_SIZE = 400
+    ELEMENT_MEMORY_SIZE = 100
 
-    def __init__(self, lines):
+    def __init__(self, firstLineNumber, lastLineNumber, statements = None, subroutineRanges = None, declarationLineNumber = None):
         if self.__class__ == SubroutineContainer:
             raise NotImplementedError()
         
-        assertTypeAll(lines, 'lines', tuple)
+        assertType(firstLineNumber, 'firstLineNumber', int)
+        assertType(lastLineNumber, 'lastLineNumber', int)
+        assertType(statements, 'statements', [list, StatementView], True)
+        assertType(subroutineRanges, 'subroutineRanges', list, True)
+        assertType(declarationLineNumber, 'declarationLineNumber', int, True)
         
-        self.__lines = lines
-        self.__statements = None
+        if declarationLineNumber is None:
+            if statements:
+                declarationLineNumber = statements[0][0]
+            else:
+                declarationLineNumber = firstLineNumber
+        
+        self.__firstLineNumber = firstLineNumber
+        self.__lastLineNumber = lastLineNumber
+        self.__declarationLineNumber = declarationLineNumber
+        self.__statements = statements
         self.__subroutines = None 
+        self.__subroutineRanges = subroutineRanges
         self.__lastUseStatementIndex = None
         self.__containsStatementIndex = None
         
@@ -1164,8 +1197,12 @@ class SubroutineContainer(object):
     def getContainer(self):
         raise NotImplementedError()
     
+    def getSourceFile(self):
+        raise NotImplementedError()
+    
     def getLines(self):
-        return self.__lines;
+        '''Returns a LineView of (lineNumber, line) tuples, the lines are read from the source file on demand'''
+        return self.getSourceFile().getLines()[self.__firstLineNumber - 1:self.__lastLineNumber]
     
     def getLine(self, lineNumber):
         assertType(lineNumber, 'lineNumber', int)
@@ -1175,19 +1212,27 @@ class SubroutineContainer(object):
         if lineNumber < first or lineNumber > last:
             raise ValueError('lineNumber out of range [' + str(first) + ', ' + str(last) + ']: ' + str(lineNumber))
         
-        return self.getLines()[lineNumber - first][1]
+        return self.getSourceFile().getLine(lineNumber)
     
     def getFirstLineNumber(self):
-        return self.getLines()[0][0];
+        return self.__firstLineNumber;
     
     def getLastLineNumber(self):
-        return self.getLines()[-1][0];
+        return self.__lastLineNumber;
     
     def getStatements(self):
+        '''The statements are normalized when they are needed for the first time'''
         if self.__statements is None:
-            self.__statements = SourceFile.linesToStatements(self.getLines())
+            self.__statements = self._readStatements()
         return self.__statements
     
+    def hasStatements(self):
+        '''True, if the statements are already normalized'''
+        return self.__statements is not None
+    
+    def _readStatements(self):
+        return self.getSourceFile().readStatements(self.getDeclarationLineNumber(), self.getLastLineNumber())
+    
     def hasSubroutine(self, name):
         assertType(name, 'name', [SubroutineName, str])
         return self.getSubroutine(name) is not None
@@ -1197,26 +1242,43 @@ class SubroutineContainer(object):
             return dict()
         
         if self.__subroutines is None:
-            self.__subroutines = self.__findSubroutines()
+            if self.__subroutineRanges is not None:
+                self.__subroutines = self.__createSubroutines(self.__subroutineRanges)
+            else:
+                self.__subroutines = self.__findSubroutines()
         
         return self.__subroutines    
     
+    def getMemorySize(self):
+        '''Returns the approximate number of bytes used by this object and the subroutines created so far, with their cached variables.
+           The statements are counted by the SourceFile.'''
+        size = SubroutineContainer.OBJECT_MEMORY_SIZE
+        if self.__subroutines is not None:
+            for subroutine in self.__subroutines.values():
+                size += subroutine.getMemorySize()
+        return size
+    
+    def getSubroutineRanges(self):
+        '''Returns a list of tuples (name, isFunction, firstLineNumber, declarationLineNumber, lastLineNumber)'''
+        return [(name, subroutine.isFunction(), subroutine.getFirstLineNumber(), subroutine.getDeclarationLineNumber(), subroutine.getLastLineNumber()) 
+                for name, subroutine in self.getSubroutines().items()]
+    
     def getSubroutine(self, name):
         raise NotImplementedError()
     
     def __findSubroutines(self):
-        subroutineRegEx = re.compile(r'\s*(((ELEMENTAL)|(PURE)|(RECURSIVE))\s+)*SUBROUTINE\s+(?P<name>[a-z0-9_]{1,63})', re.IGNORECASE);
-        functionRegEx = re.compile(r'\s*(((ELEMENTAL)|(PURE)|(RECURSIVE)|(INTEGER)|(LOGICAL)|(DOUBLE(\s+PRECISION)?)|(REAL)|(CHARACTER(\*\d*)?)|(TYPE)|(CLASS))\s*(\(.*\))?\s+)*FUNCTION\s+(?P<name>[a-z0-9_]{1,63})\s*\([a-z0-9_,]*\)\s*(RESULT\s*\((?P<result>[a-z0-9_]{1,63})\))?', re.IGNORECASE);
-        endRegEx = re.compile(r'\s*END\s*((SUBROUTINE)|(FUNCTION))', re.IGNORECASE);
+        subroutineRegEx = SubroutineContainer.SUBROUTINE_REG_EX
+        functionRegEx = SubroutineContainer.FUNCTION_REG_EX
+        endRegEx = SubroutineContainer.END_REG_EX
         
         lines = self.getLines()
-        offset = lines[0][0] - 1
+        offset = self.getFirstLineNumber() - 1
         subroutines = dict();
                 
         subroutineStack = 0;
         name = None;
-        subroutineLines = None;
         firstLine = -1
+        firstStatement = -1
         statements = self.getStatementsAfterContains()
         function = False
         
@@ -1233,6 +1295,7 @@ class SubroutineContainer(object):
                 subroutineStack += 1;
                 if subroutineStack == 1:
                     name = regExMatch.group('name');
+                    firstStatement = i
                     if i > 0:
                         lastStatementBeforeLine = statements[i - 1][0]
                     else:
@@ -1249,16 +1312,29 @@ class SubroutineContainer(object):
                 subroutineStack -= 1
                 if subroutineStack == 0:
                     fullName = self._createSubroutineName(name)
-                    subroutineLines = lines[(firstLine - offset - 1):(sn - offset)]
-                    subroutines[name.lower()] = Subroutine(fullName, function, subroutineLines, self)
+                    subroutineStatements = statements[firstStatement:i + 1]
+                    subroutines[name.lower()] = Subroutine(fullName, function, firstLine, sn, self, subroutineStatements, subroutineStatements[0][0])
 
         return subroutines;
     
+    def __createSubroutines(self, subroutineRanges):
+        statements = None
+        if self.hasStatements():
+            statements = self.getStatements()
+        subroutines = dict()
+        for name, function, firstLine, declarationLine, lastLine in subroutineRanges:
+            subroutineStatements = None
+            if statements is not None:
+                subroutineStatements = SourceFile.sliceStatements(statements, firstLine, lastLine)
+            subroutines[name] = Subroutine(self._createSubroutineName(name), function, firstLine, lastLine, self, subroutineStatements, declarationLine)
+        
+        return subroutines
+    
     def _createSubroutineName(self, name):
         raise NotImplementedError()
     
     def getDeclarationLineNumber(self):
-        return self.getStatements()[0][0];
+        return self.__declarationLineNumber;
     
     def getDeclaration(self):
         return self.getStatements()[0][1];
@@ -1334,7 +1410,7 @@ class Subroutine(SubroutineContainer):
     INTERFACE_REG_EX = re.compile(r'^(ABSTRACT\s+)?INTERFACE(\s+([a-z0-9_]+))?$', re.IGNORECASE)
     END_INTERFACE_REG_EX = re.compile(r'^END\s*INTERFACE(\s+[a-z0-9_]+)?$', re.IGNORECASE)
     
-    def __init__(self, name, isFunction, lines, container):
+    def __init__(self, name, isFunction, firstLineNumber, lastLineNumber, container, statements = None, declarationLineNumber = None):
         assertType(name, 'name', SubroutineName)
         assertType(isFunction, 'isFunction', bool)
         if isinstance(name, InnerSubroutineName):
@@ -1342,7 +1418,7 @@ class Subroutine(SubroutineContainer):
         else:
             assertType(container, 'container', Module)
         
-        super(Subroutine, self).__init__(lines)
+        super(Subroutine, self).__init__(firstLineNumber, lastLineNumber, statements, declarationLineNumber = declarationLineNumber)
         
         self.__name = name
         self.__function = isFunction
@@ -1391,6 +1467,11 @@ class Subroutine(SubroutineContainer):
     
     def getSourceFile(self):
         return self.getModule().getSourceFile()
+    
+    def _readStatements(self):
+        if self.getContainer().hasStatements():
+            return SourceFile.sliceStatements(self.getContainer().getStatements(), self.getFirstLineNumber(), self.getLastLineNumber())
+        return super(Subroutine, self)._readStatements()
   
     def getSubroutine(self, name):
         assertType(name, 'name', [InnerSubroutineName, str])
@@ -1560,6 +1641,14 @@ class Subroutine(SubroutineContainer):
             self.__findResultVar()
             
         return self.__variables
+    
+    def getMemorySize(self):
+        size = super(Subroutine, self).getMemorySize()
+        if self.__variables is not None:
+            size += len(self.__variables) * SubroutineContainer.VARIABLE_MEMORY_SIZE
+        if self.__resultVar is not None:
+            size += SubroutineContainer.VARIABLE_MEMORY_SIZE
+        return size
         
     def __findVariables(self):
         #TODO Support PARAMETER(...) syntax
@@ -1587,10 +1676,10 @@ class Subroutine(SubroutineContainer):
         return InnerSubroutineName(name, self.getName())
     
 class Module(SubroutineContainer):
-    def __init__(self, name, lines, sourceFile, index):
+    def __init__(self, name, firstLineNumber, lastLineNumber, sourceFile, index, statements = None, subroutineRanges = None, declarationLineNumber = None):
         assertType(sourceFile, 'sourceFile', SourceFile)
         
-        super(Module, self).__init__(lines)
+        super(Module, self).__init__(firstLineNumber, lastLineNumber, statements, subroutineRanges, declarationLineNumber)
         
         self.__name = name.lower()
         self.__sourceFile = sourceFile
@@ -1688,6 +1777,16 @@ class Module(SubroutineContainer):
         if self.__variables is None:
             self.__variables = self.__findVariables()
         return self.__variables
+    
+    def getMemorySize(self):
+        size = super(Module, self).getMemorySize()
+        if self.__variables is not None:
+            size += len(self.__variables) * SubroutineContainer.VARIABLE_MEMORY_SIZE
+        if self.__publicElements is not None:
+            size += len(self.__publicElements) * SubroutineContainer.ELEMENT_MEMORY_SIZE
+        if self.__uses is not None:
+            size += len(self.__uses) * SubroutineContainer.ELEMENT_MEMORY_SIZE
+        return size
      
     def __findVariables(self):
         #TODO Support PARAMETER(...) syntax
@@ -1782,18 +1881,47 @@ class Module(SubroutineContainer):
         return SubroutineFullName.fromParts(self.getName(), name)
 
 class SourceFile(object):
-    def __init__(self, path, preprocessed = False, isTestDummy = False):
+    
+    MODULE_REG_EX = re.compile(r'\s*((MODULE)|(PROGRAM))\s+(?P<name>[a-z0-9_]{1,63})', re.IGNORECASE);
+    END_MODULE_REG_EX = re.compile(r'\s*END\s*((MODULE)|(PROGRAM))', re.IGNORECASE);
+    
+    # Everything before the first exclamation mark outside of a character constant
+    __COMMENT_REG_EX = re.compile(r'''(?:[^!'"]+|'[^']*'?|"[^"]*"?)*''')
+    # Tokens changed by the statement normalization: character constants (1-4, the content is dropped), operators with blanks (5, 6),
+    # blanks before closing parentheses and multiple blanks (7)
+    __NORMALIZE_REG_EX = re.compile(r'''(')(?:[^'\\]+|\\.)*(?:(')|\\?)|(")(?:[^"\\]+|\\.)*(?:(")|\\?)| +([%(,.:=+\-*/><]) *|([%(,.:=+\-*/><]) +| +(?=\))|( ) +''', re.DOTALL)
+    
+    def __init__(self, path, preprocessed = False, isTestDummy = False, parseCache = None):
+        assertType(parseCache, 'parseCache', SourceFileCache, True)
         if not isTestDummy and not os.path.isfile(path) and os.access(path, os.R_OK):
             raise IOError("Not a readable file: " + path);
         
         self.__path = path
         self.__base = os.path.basename(path)
         self.__preprocessed = preprocessed
-        self.__preprocessorLineDirectives = None
-        if not isTestDummy:
-            self.__modules = self.__extractModules()
-        else:
+        self.__lineMap = None
+        self.__statements = None
+        self.__lineStore = None
+        self.__readStatementsSize = 0
+        self.__cached = False
+        if isTestDummy:
             self.__modules = dict()
+        else:
+            cached = None
+            if parseCache is not None:
+                contentHash = SourceFileCache.hashContent(self.getLineStore().getBuffer())
+                cached = parseCache.load(contentHash, preprocessed)
+            if cached is not None:
+                statements, modules = cached
+                self.__statements = StatementStore(statements).getView()
+                self.__modules = self.__createModules(modules)
+                self.__cached = True
+            else:
+                start = time.perf_counter()
+                moduleRanges = ProgramUnitScanner(self).scan()
+                self.__modules = self.__createModules(moduleRanges)
+                if parseCache is not None:
+                    parseCache.save(contentHash, preprocessed, list(self.getStatements()), moduleRanges, time.perf_counter() - start)
         
     def __str__(self):
         return self.__path;
@@ -1834,19 +1962,63 @@ class SourceFile(object):
     def getFileNameWithoutPrefix(self):
         return os.path.splitext(self.__base)[0]
     
+    def getLineStore(self):
+        if self.__lineStore is None:
+            self.__lineStore = LineStore(self.__path)
+        return self.__lineStore
+    
     def getLines(self):
-        lines = [];
-        openFile = open(self.__path);
-        i = 1;
-        for line in openFile:
-            lines.append((i, line));
-            i = i + 1;
-        openFile.close();
+        '''Returns a LineView of (lineNumber, line) tuples'''
+        return self.getLineStore().getLines()
+    
+    def getLine(self, lineNumber):
+        assertType(lineNumber, 'lineNumber', int)
         
-        return lines;
+        return self.getLineStore().getLine(lineNumber)
+    
+    def getLineCount(self):
+        return self.getLineStore().getLineCount()
     
     def getStatements(self):
-        return SourceFile.linesToStatements(self.getLines())
+        '''Returns a StatementView of all statements of the file'''
+        if self.__statements is None:
+            self.__statements = StatementStore(SourceFile.iterStatements(self.getLines())).getView()
+        return self.__statements
+    
+    def readStatements(self, firstLineNumber, lastLineNumber):
+        '''Returns the statements starting between the given line numbers. firstLineNumber has to be the first line of a statement
+           or a comment or blank line following a complete statement. Only these statements are normalized, 
+           unless the statements of the whole file are already known.'''
+        assertType(firstLineNumber, 'firstLineNumber', int)
+        assertType(lastLineNumber, 'lastLineNumber', int)
+        
+        if self.__statements is not None:
+            return self.__statements.sliceByLineNumbers(firstLineNumber, lastLineNumber)
+        
+        statements = SourceFile.iterStatements(self.getLines()[firstLineNumber - 1:])
+        store = StatementStore(takewhile(lambda statement: statement[0] <= lastLineNumber, statements))
+        self.__readStatementsSize += store.getMemorySize()
+        return store.getView()
+    
+    def getMemorySize(self):
+        '''Returns the approximate number of bytes used by the statements and line offsets read so far
+           and by the modules and subroutines with their cached variables, see SubroutineContainer.getMemorySize'''
+        size = self.__readStatementsSize
+        for module in self.__modules.values():
+            size += module.getMemorySize()
+        if self.__statements is not None:
+            size += self.__statements.getStore().getMemorySize()
+        if self.__lineStore is not None:
+            size += self.__lineStore.getMemorySize()
+        return size
+    
+    def close(self):
+        '''Releases the memory mapping of the file. It is reopened when the content is needed again.'''
+        if self.__lineStore is not None:
+            self.__lineStore.close()
+    
+    def isFromCache(self):
+        return self.__cached
     
     def getModules(self):
         return self.__modules
@@ -1872,95 +2044,86 @@ class SourceFile(object):
         
         return None
     
-    def __extractModules(self):
-        moduleRegEx = re.compile(r'\s*((MODULE)|(PROGRAM))\s+(?P<name>[a-z0-9_]{1,63})', re.IGNORECASE);
-        endRegEx = re.compile(r'\s*END\s*((MODULE)|(PROGRAM))', re.IGNORECASE);
-        
-        lines = self.getLines()
-        statements = SourceFile.linesToStatements(lines)
+    def __createModules(self, moduleRanges):
         modules = dict()
-                
-        inModule = False
-        name = None
-        firstLine = -1
-        index = 0
-        for i, (sn, line, _) in enumerate(statements):
-            if not inModule:
-                regExMatch = moduleRegEx.match(line);
-                if regExMatch is not None:
-                    inModule = True;
-                    name = regExMatch.group('name');
-                    firstLine = sn
-                    
-                    if sn > 1: 
-                        if i > 0:
-                            lastStatementBeforeLine = statements[i - 1][0]
-                        else:
-                            lastStatementBeforeLine = 0
-                        for ln, line in reversed(lines[lastStatementBeforeLine:sn - 1]):
-                            line = line.strip()
-                            if len(line) == 0:
-                                if firstLine < sn:
-                                    break;
-                            else:
-                                firstLine = ln;
-            else:
-                if endRegEx.match(line) is not None:
-                    inModule = False;
-                    moduleLines = lines[firstLine - 1:sn]
-                    modules[name.lower()] = Module(name, moduleLines, self, index)
-                    index = index + 1
-
-        return modules;
+        for name, index, firstLine, declarationLine, lastLine, subroutineRanges in moduleRanges:
+            moduleStatements = None
+            if self.__statements is not None:
+                moduleStatements = self.readStatements(firstLine, lastLine)
+            modules[name] = Module(name, firstLine, lastLine, self, index, moduleStatements, subroutineRanges, declarationLine)
+        
+        return modules
+    
+    @staticmethod
+    def sliceStatements(statements, firstLineNumber, lastLineNumber, lineNumbers = None):
+        '''Returns the statements starting between the given line numbers. lineNumbers are the first line numbers of the statements.'''
+        if isinstance(statements, StatementView):
+            return statements.sliceByLineNumbers(firstLineNumber, lastLineNumber)
+        if lineNumbers is None:
+            lineNumbers = [sn for sn, _, _ in statements]
+        return statements[bisect_left(lineNumbers, firstLineNumber):bisect_right(lineNumbers, lastLineNumber)]
 
     def getPreprocessorOffset(self, lineNumber):
-        if self.__preprocessed:
-            if self.__preprocessorLineDirectives is None:
-                self.__preprocessorLineDirectives = self.__findPreprocessorLineDirectives()
-        
-            for i, line in self.__preprocessorLineDirectives:
-                if i < lineNumber:
-                    return i + 1 - line
-        
-        return 0
+        return self.getLineMap().getOffset(lineNumber)
     
-    def __findPreprocessorLineDirectives(self):
-        """Reversed order!!!"""        
-        regEx = re.compile('^\#\s+(?P<line>\d+)\s.*')
-            
-        directives = []
-        if self.__preprocessed:
-            for i, line in self.getLines()[::-1]:
-                regExMatch = regEx.match(line)
-                if regExMatch is not None:
-                    directives.append((i, int(regExMatch.group('line'))))
-        return directives
+    def getLineMap(self):
+        '''Returns the PreprocessorLineMap of the file. For files not preprocessed the map is empty, so all line numbers translate to themselves.'''
+        if self.__lineMap is None:
+            if self.__preprocessed:
+                self.__lineMap = PreprocessorLineMap.fromLines(self.getLines())
+            else:
+                self.__lineMap = PreprocessorLineMap()
+        return self.__lineMap
     
     @staticmethod
     def linesToStatements(lines):
-        if not lines:
-            return []
-        
-        statements = [];
-        statement = '';
-        j = lines[0][0];
-        for i, line in lines:
-            line = SourceFile.__removeCommentFromLine(line).strip();
-            if line and not line.startswith('#'):
-                statement += ' ' + line.strip('&').strip().strip(';').strip()
-                if not line.endswith('&'):
-                    statement = statement.lstrip();
-                    statement = SourceFile.__removeUnnecessaryBlanksFromStatement(statement)
-                    statement = SourceFile.__removeMultipleBlanksFromStatement(statement)
-                    statement = SourceFile.__removeStringsFromStatement(statement)
+        '''Returns a list of tuples (firstLineNumber, statement, lastLineNumber).
+           Comments, continuations and string contents are removed, blanks are normalized and lines are split at semicolons.'''
+        return list(SourceFile.iterStatements(lines))
+    
+    @staticmethod
+    def iterStatements(lines):
+        '''Like linesToStatements, but yields the statements one by one while reading the lines'''
+        lines = iter(lines)
+        firstLine = next(lines, None)
+        if firstLine is None:
+            return
+        
+        commentRegEx = SourceFile.__COMMENT_REG_EX
+        normalizeRegEx = SourceFile.__NORMALIZE_REG_EX
+        parts = [];
+        j = firstLine[0];
+        for i, line in chain((firstLine, ), lines):
+            if '!' in line:
+                line = commentRegEx.match(line).group()
+            line = line.strip()
+            if line and line[0] != '#':
+                parts.append(line.strip('&').strip().strip(';').strip())
+                if line[-1] != '&':
+                    statement = normalizeRegEx.sub(SourceFile.__normalizeToken, ' '.join(parts).lstrip())
                     for substatement in statement.split(';'):
-                        statements.append((j, substatement.strip(), i));
-                    statement = '';
+                        yield (j, substatement.strip(), i)
+                    parts = [];
                     j = i + 1;
-            else: 
-                if statement == '':
-                    j = j + 1;
-        return statements;
+            elif not parts:
+                j = j + 1;
+    
+    @staticmethod
+    def removeComment(line):
+        '''Returns the line without a trailing comment'''
+        if '!' in line:
+            return SourceFile.__COMMENT_REG_EX.match(line).group()
+        return line
+    
+    @staticmethod
+    def __normalizeToken(match):
+        index = match.lastindex
+        if index is None:
+            return ''
+        token = match.group(index)
+        if index == 2 or index == 4:
+            return token + token
+        return token
     
     @staticmethod
     def removeUnimportantParentheses(statement, regEx = None):
@@ -2007,61 +2170,188 @@ class SourceFile(object):
             
         return elements
     
-    @staticmethod
-    def __removeCommentFromLine(line):
-        'TODO Testen!!!'
-        cleanLine = ''
-        quotation = ''
-        for index, char in enumerate(line):
-            if not quotation:
-                if char == '!':
-                    return cleanLine;
-                elif char == '"' or char == "'":
-                    quotation = char 
-            elif char == quotation and index != '\\':
-                quotation = ''
-            cleanLine += char
-        
-        return cleanLine
-    
     @staticmethod
     def validIdentifier(identifierWannabe):
         return isinstance(identifierWannabe, str) and IDENTIFIER_REG_EX.match(identifierWannabe) is not None
+
+class ProgramUnitScanner(object):
+    '''Finds the line ranges of the modules and programs of a source file and of their subroutines and functions.
+       Only the statements containing one of the keywords relevant for these boundaries are normalized, 
+       the ranges are the same as those found on the complete list of statements.'''
     
-    @staticmethod
-    def __removeUnnecessaryBlanksFromStatement(statement):
-        statement = re.sub(r' *([%\(,\.\:=\+\-\*\/\>\<]) *', r'\1', statement)
-        statement = re.sub(r' *\)', r')', statement)
-        return statement
+    # Searched in the lower case content, which is much faster than a case insensitive search
+    KEYWORD_REG_EX = re.compile(rb'module|program|subroutine|function|contains|type|class')
     
-    @staticmethod
-    def __removeMultipleBlanksFromStatement(statement):
-        return re.sub(r'  +', ' ', statement);
+    def __init__(self, sourceFile):
+        assertType(sourceFile, 'sourceFile', SourceFile)
+        
+        self.__lineStore = sourceFile.getLineStore()
+        self.__code = dict()
+        
+    def scan(self):
+        '''Returns a list of tuples (name, index, firstLineNumber, declarationLineNumber, lastLineNumber, subroutineRanges).
+           subroutineRanges are the ranges of the module's subroutines like returned by SubroutineContainer.getSubroutineRanges.'''
+        moduleRegEx = SourceFile.MODULE_REG_EX
+        endRegEx = SourceFile.END_MODULE_REG_EX
+        
+        statements = self.__findKeywordStatements()
+        modules = dict()
+        inModule = False
+        name = None
+        firstLine = -1
+        firstStatement = -1
+        index = 0
+        for i, (sn, statement, _, previousLine) in enumerate(statements):
+            if not inModule:
+                regExMatch = moduleRegEx.match(statement)
+                if regExMatch is not None:
+                    inModule = True
+                    name = regExMatch.group('name').lower()
+                    firstLine = sn
+                    firstStatement = i
+                    if sn > 1:
+                        firstLine = self.__findFirstLine(previousLine, sn)
+            elif endRegEx.match(statement) is not None:
+                inModule = False
+                moduleStatements = statements[firstStatement:i + 1]
+                modules[name] = (name, index, firstLine, moduleStatements[0][0], sn, self.__findSubroutines(moduleStatements))
+                index = index + 1
+        
+        return list(modules.values())
+    
+    def __findSubroutines(self, statements):
+        subroutineRegEx = SubroutineContainer.SUBROUTINE_REG_EX
+        functionRegEx = SubroutineContainer.FUNCTION_REG_EX
+        endRegEx = SubroutineContainer.END_REG_EX
+        
+        containsIndex = self.__findContainsIndex(statements)
+        if containsIndex < 0:
+            return []
+        
+        subroutines = dict()
+        subroutineStack = 0
+        name = None
+        firstLine = -1
+        declarationLine = -1
+        function = False
+        for sn, statement, _, previousLine in statements[containsIndex + 1:]:
+            regExMatch = subroutineRegEx.match(statement)
+            if regExMatch is not None:
+                function = False
+            else:
+                regExMatch = functionRegEx.match(statement)
+                if regExMatch is not None:
+                    function = True
+                    
+            if regExMatch is not None:
+                subroutineStack += 1
+                if subroutineStack == 1:
+                    name = regExMatch.group('name').lower()
+                    declarationLine = sn
+                    firstLine = self.__findFirstLine(previousLine, sn)
+            elif endRegEx.match(statement) is not None:
+                subroutineStack -= 1
+                if subroutineStack == 0:
+                    subroutines[name] = (name, function, firstLine, declarationLine, sn)
+        
+        return list(subroutines.values())
     
-    @staticmethod
-    def __removeStringsFromStatement(statement):
-        cleanStatement = ''
-        inString = False
-        escape = False
-        delimiter = ''
-        for c in statement:
-            if not inString:
-                cleanStatement += c
-                if c == "'" or c == '"':
-                    inString = True
-                    escape = False
-                    delimiter = c;
+    def __findContainsIndex(self, statements):
+        typeRegEx = Type.DECLARATION_REGEX
+        endTypeRegEx = Type.END_REGEX
+        inType = False
+        for i, (_, statement, _, _) in enumerate(statements):
+            if i == 0:
+                continue
+            if typeRegEx.match(statement) is not None:
+                inType = True
+            elif endTypeRegEx.match(statement) is not None:
+                inType = False
+            elif not inType and statement.upper() == 'CONTAINS':
+                return i
+        
+        return -1
+    
+    def __findFirstLine(self, lastStatementBeforeLine, sn):
+        '''Includes the leading comment lines'''
+        firstLine = sn
+        for ln, line in reversed(self.__lineStore.getLines(lastStatementBeforeLine + 1, sn - 1)):
+            line = line.strip()
+            if len(line) == 0:
+                if firstLine < sn:
+                    break;
             else:
-                if c == delimiter and not escape:
-                    cleanStatement += c
-                    inString = False
-                escape = not escape and c == '\\'
-              
-        return cleanStatement
+                firstLine = ln;
+        return firstLine
+    
+    def __findKeywordStatements(self):
+        '''Returns a list of tuples (firstLineNumber, statement, lastLineNumber, firstLineNumberOfPreviousStatement) 
+           of the statements containing one of the keywords'''
+        lineStore = self.__lineStore
+        lineCount = lineStore.getLineCount()
+        keywordRegEx = ProgramUnitScanner.KEYWORD_REG_EX
+        content = lineStore.getBuffer()[:].lower()
+        
+        statements = []
+        regExMatch = keywordRegEx.search(content)
+        while regExMatch is not None:
+            lineNumber = lineStore.findLineNumber(regExMatch.start())
+            if self.__getCode(lineNumber):
+                firstLine = self.__findStatementStart(lineNumber)
+                previousLine = self.__findPreviousStatementStart(firstLine)
+                lines = []
+                for i in range(firstLine, lineCount + 1):
+                    lines.append((i, lineStore.getLine(i)))
+                    code = self.__getCode(i)
+                    if code and code[-1] != '&':
+                        break
+                for k, (sn, statement, i) in enumerate(SourceFile.linesToStatements(lines)):
+                    statements.append((sn, statement, i, previousLine if k == 0 else sn))
+                lineNumber = lines[-1][0]
+            if lineNumber >= lineCount:
+                break
+            regExMatch = keywordRegEx.search(content, lineStore.getOffset(lineNumber + 1))
+        
+        return statements
+    
+    def __findStatementStart(self, lineNumber):
+        '''lineNumber has to be a code line'''
+        start = lineNumber
+        for i in range(lineNumber - 1, 0, -1):
+            code = self.__getCode(i)
+            if code:
+                if code[-1] != '&':
+                    break
+                start = i
+        return start
+    
+    def __findPreviousStatementStart(self, lineNumber):
+        for i in range(lineNumber - 1, 0, -1):
+            if self.__getCode(i):
+                return self.__findStatementStart(i)
+        return 0
+    
+    def __getCode(self, lineNumber):
+        '''Returns the stripped line without comment or an empty string for comment, blank and preprocessor lines'''
+        code = self.__code.get(lineNumber)
+        if code is None:
+            code = SourceFile.removeComment(self.__lineStore.getLine(lineNumber)).strip()
+            if code.startswith('#'):
+                code = ''
+            self.__code[lineNumber] = code
+        return code
 
 class SourceFiles(object):
-    def __init__(self, baseDirs, specialModuleFiles = {}, preprocessed = False):
+    '''Finds and parses source files. Parsed files are kept in memory. If a memoryLimit (in bytes) is given,
+       the least recently used files are dropped as soon as the parse results of all files exceed the limit.
+       Dropped files are parsed again, or loaded from the parse cache, when they are needed the next time.'''
+    
+    def __init__(self, baseDirs, specialModuleFiles = {}, preprocessed = False, fileIndex = None, moduleIndex = None, parseCache = None, memoryLimit = None):
         assertType(specialModuleFiles, 'specialModuleFiles', dict)
+        assertType(fileIndex, 'fileIndex', FileNameIndex, True)
+        assertType(moduleIndex, 'moduleIndex', ModuleFileIndex, True)
+        assertType(parseCache, 'parseCache', SourceFileCache, True)
+        assertType(memoryLimit, 'memoryLimit', int, True)
         
         if isinstance(baseDirs, str):
             baseDirs = [baseDirs]
@@ -2071,7 +2361,14 @@ class SourceFiles(object):
                 raise IOError("Not a directory: " + baseDir);
         
         self.__baseDirs = baseDirs
-        self.__filesByPath = dict()
+        self.__fileIndex = fileIndex
+        self.__moduleIndex = moduleIndex
+        self.__parseCache = parseCache
+        self.__memoryLimit = memoryLimit
+        self.__filesByPath = OrderedDict()
+        self.__memorySizes = dict()
+        self.__memorySize = 0
+        self.__evictions = 0
         self.__filesByModules = dict()
         self.__preprocessed = preprocessed
         self.setSpecialModuleFiles(specialModuleFiles)
@@ -2122,13 +2419,20 @@ class SourceFiles(object):
         assertType(moduleName, 'moduleName', str)
         
         if moduleName not in self.__filesByModules:
-            for fileName in self.__getModuleFileNameCandidates(moduleName):
-                sourceFile = self.findSourceFile(fileName)
-                if sourceFile is not None:
-                    break
-            self.__filesByModules[moduleName] = sourceFile
-            
-        return self.__filesByModules[moduleName]
+            path = None
+            if self.__moduleIndex is not None and moduleName.lower() not in self.__specialModuleFiles:
+                path = self.__moduleIndex.findModuleFile(moduleName)
+            if path is None:
+                for fileName in self.__getModuleFileNameCandidates(moduleName):
+                    path = self.__findFile(fileName)
+                    if path is not None:
+                        break
+            self.__filesByModules[moduleName] = path
+        
+        path = self.__filesByModules[moduleName]
+        if path is None:
+            return None
+        return self.__getSourceFile(path)
     
     def existsSourceFile(self, fileName):
         assertType(fileName, 'fileName', str)
@@ -2139,15 +2443,46 @@ class SourceFiles(object):
     def findSourceFile(self, fileName):
         path = self.__findFile(fileName)
         if path is None:
-            sourceFile = None
-        elif path in self.__filesByPath:
+            return None
+        
+        return self.__getSourceFile(path)
+    
+    def __getSourceFile(self, path):
+        if path in self.__filesByPath:
             sourceFile = self.__filesByPath[path]
+            if self.__memoryLimit is not None:
+                self.__filesByPath.move_to_end(path)
         else:
-            sourceFile = SourceFile(path, self.__preprocessed) 
+            sourceFile = SourceFile(path, self.__preprocessed, parseCache = self.__parseCache) 
             self.__filesByPath[path] = sourceFile
         
+        if self.__memoryLimit is not None:
+            self.__updateMemorySize(path, sourceFile)
         return sourceFile
     
+    def __updateMemorySize(self, path, sourceFile):
+        '''Files grow after they have been returned, when statements and variables are read lazily. 
+           Therefore the size of a file is updated on every access.'''
+        size = sourceFile.getMemorySize()
+        self.__memorySize += size - self.__memorySizes.get(path, 0)
+        self.__memorySizes[path] = size
+        while self.__memorySize > self.__memoryLimit and len(self.__filesByPath) > 1:
+            evictedPath, evictedFile = self.__filesByPath.popitem(last = False)
+            self.__memorySize -= self.__memorySizes.pop(evictedPath, 0)
+            evictedFile.close()
+            self.__evictions += 1
+    
+    def getMemoryLimit(self):
+        return self.__memoryLimit
+    
+    def getMemorySize(self):
+        '''Approximate number of bytes used by the parsed files in memory, only counted if there is a memory limit'''
+        return self.__memorySize
+    
+    def getEvictionCount(self):
+        '''Number of parsed files dropped because of the memory limit'''
+        return self.__evictions
+    
     def getRelativePath(self, sourceFile):
         assertType(sourceFile, 'sourceFile', SourceFile)
         
@@ -2170,6 +2505,9 @@ class SourceFiles(object):
         return candidates
         
     def __findFile(self, fileName):
+        if self.__fileIndex is not None:
+            return self.__fileIndex.findFile(fileName)
+        
         fileName = fileName.lower()
         for baseDir in self.__baseDirs:
             for root, _, files in os.walk(baseDir):
@@ -2179,5 +2517,52 @@ class SourceFiles(object):
         return None
     
     def clearCache(self):
-        self.__filesByPath = dict()
+        self.__filesByPath = OrderedDict()
+        self.__memorySizes = dict()
+        self.__memorySize = 0
         self.__filesByModules = dict()
+        
+    def getAllSourceFilePaths(self):
+        if self.__fileIndex is not None:
+            paths = self.__fileIndex.getPaths()
+        else:
+            paths = []
+            for baseDir in self.__baseDirs:
+                for root, _, files in os.walk(baseDir):
+                    for name in files:
+                        paths.append(os.path.join(root, name))
+        return [path for path in paths if path.lower().endswith(ModuleFileIndex.SOURCE_FILE_SUFFIXES)]
+        
+    def parseAll(self, processes = None):
+        '''Parses all source files in parallel and stores the results in the parse cache. Returns the number of newly parsed files and the number of files found in the cache.
+           The statistics of the worker processes are added to the parse cache.'''
+        assertType(processes, 'processes', int, True)
+        if self.__parseCache is None:
+            raise ValueError('SourceFiles.parseAll needs a parse cache')
+        
+        tasks = [(path, self.__preprocessed, self.__parseCache.getCacheDir()) for path in self.getAllSourceFilePaths()]
+        parsed = 0
+        cached = 0
+        pool = multiprocessing.Pool(processes)
+        try:
+            for fromCache, parseTime, timeSaved in pool.imap_unordered(_parseSourceFile, tasks, chunksize = 4):
+                if fromCache:
+                    cached += 1
+                else:
+                    parsed += 1
+                self.__parseCache.addStatistics(int(fromCache), int(not fromCache), parseTime, timeSaved)
+        finally:
+            pool.close()
+            pool.join()
+        
+        return (parsed, cached)
+
+def _parseSourceFile(task):
+    path, preprocessed, cacheDir = task
+    parseCache = SourceFileCache(cacheDir)
+    try:
+        fromCache = SourceFile(path, preprocessed, parseCache = parseCache).isFromCache()
+    except (IOError, UnicodeDecodeError) as e:
+        printWarning('Cannot parse ' + path + ': ' + str(e), 'SourceFiles')
+        fromCache = False
+    return (fromCache, parseCache.getParseTime(), parseCache.getTimeSaved())
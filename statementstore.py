@@ -0,0 +1,125 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from assertions import assertType
+
+class StatementStore(object):
+    '''Columnar storage of normalized statements. The first and last line numbers are kept in integer arrays,
+       the statement texts are concatenated into one shared string. Statements are handed out as (firstLineNumber, statement, lastLineNumber) tuples.'''
+
+    def __init__(self, statements = ()):
+        firstLineNumbers = array('i')
+        lastLineNumbers = array('i')
+        offsets = array('q', [0])
+        texts = []
+        offset = 0
+        for firstLineNumber, text, lastLineNumber in statements:
+            firstLineNumbers.append(firstLineNumber)
+            lastLineNumbers.append(lastLineNumber)
+            offset += len(text)
+            offsets.append(offset)
+            texts.append(text)
+
+        self.__firstLineNumbers = firstLineNumbers
+        self.__lastLineNumbers = lastLineNumbers
+        self.__offsets = offsets
+        self.__text = ''.join(texts)
+
+    def __len__(self):
+        return len(self.__firstLineNumbers)
+
+    def getStatement(self, index):
+        offsets = self.__offsets
+        return (self.__firstLineNumbers[index], self.__text[offsets[index]:offsets[index + 1]], self.__lastLineNumbers[index])
+
+    def getFirstLineNumbers(self):
+        return self.__firstLineNumbers
+
+    def getView(self):
+        '''Returns a StatementView of all statements'''
+        return StatementView(self, 0, len(self))
+
+    def iterStatements(self, start, stop):
+        '''Yields the statements with indices from start to stop (exclusive)'''
+        firstLineNumbers = self.__firstLineNumbers
+        lastLineNumbers = self.__lastLineNumbers
+        offsets = self.__offsets
+        text = self.__text
+        begin = offsets[start]
+        for i in range(start, stop):
+            end = offsets[i + 1]
+            yield (firstLineNumbers[i], text[begin:end], lastLineNumbers[i])
+            begin = end
+
+    def getMemorySize(self):
+        '''Returns the approximate number of bytes used by the columns'''
+        return sum(column.buffer_info()[1] * column.itemsize for column in (self.__firstLineNumbers, self.__lastLineNumbers, self.__offsets)) + len(self.__text)
+
+
+class StatementView(object):
+    '''Read-only sequence of (firstLineNumber, statement, lastLineNumber) tuples over a range of a StatementStore.
+       Slices are views as well, so they don't copy any statements.'''
+
+    def __init__(self, store, start, stop):
+        assertType(store, 'store', StatementStore)
+        assertType(start, 'start', int)
+        assertType(stop, 'stop', int)
+
+        self.__store = store
+        self.__start = start
+        self.__stop = stop
+
+    def __len__(self):
+        return self.__stop - self.__start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return StatementView(self.__store, self.__start + start, self.__start + max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError('statement index out of range')
+        return self.__store.getStatement(self.__start + key)
+
+    def __iter__(self):
+        return self.__store.iterStatements(self.__start, self.__stop)
+
+    def __reversed__(self):
+        for i in range(self.__stop - 1, self.__start - 1, -1):
+            yield self.__store.getStatement(i)
+
+    def __eq__(self, other):
+        if isinstance(other, StatementView) and self.__store is other.__store and self.__start == other.__start and self.__stop == other.__stop:
+            return True
+        if not isinstance(other, (StatementView, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def getStore(self):
+        return self.__store
+
+    def getFirstLineNumber(self, index):
+        '''Like self[index][0], but without creating the statement tuple'''
+        if index < 0:
+            index += len(self)
+        return self.__store.getFirstLineNumbers()[self.__start + index]
+
+    def sliceByLineNumbers(self, firstLineNumber, lastLineNumber):
+        '''Returns a view of the statements starting between the given line numbers'''
+        lineNumbers = self.__store.getFirstLineNumbers()
+        start = bisect_left(lineNumbers, firstLineNumber, self.__start, self.__stop)
+        stop = bisect_right(lineNumbers, lastLineNumber, start, self.__stop)
+        return StatementView(self.__store, start, stop)
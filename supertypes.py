@@ -10,6 +10,12 @@ class CallGraphBuilder(object):
         assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)      
         raise NotImplementedError()
     
+    def buildCallGraphWithSources(self, rootSubroutine, knownCalls = None):  # @UnusedVariable
+        '''Returns the call graph and a dictionary subroutine name => path of the file its calls were read from.
+           knownCalls: dictionary subroutine name => (list of calls, file path), used instead of reading these files.
+           Builders which don't know the files return None instead of the dictionary and ignore knownCalls.'''
+        return (self.buildCallGraph(rootSubroutine), None)
+    
     def getModuleFilePath(self, moduleName):    
         assertType(moduleName, 'moduleName', str)
         raise NotImplementedError()
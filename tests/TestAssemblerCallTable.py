@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import gzip
+import bz2
+import lzma
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assemblercalls import AssemblerCallTable
+
+ASSEMBLER = '''	.text
+	.type	__test_MOD_outer, @function
+__test_MOD_outer:
+	.loc 1 10 5
+	.cfi_startproc
+	.loc 1 12 7
+	call	__other_MOD_callee@PLT
+	.loc 1 13 7 is_stmt 0 discriminator 2
+	call	inner.1
+	call	_gfortran_st_write@PLT
+	leaq	__test_MOD_outer._omp_fn.0(%rip), %rdi
+	call	GOMP_parallel@PLT
+	ret
+	.cfi_endproc
+	.type	inner.1, @function
+inner.1:
+	.cfi_startproc
+	.loc 1 20 9
+	call	__other_MOD_callee # comment
+	.cfi_endproc
+__test_MOD_outer._omp_fn.0:
+	.cfi_startproc
+	.loc 1 15 11
+	call	__other_MOD_parallel
+	.cfi_endproc
+'''
+
+'''
+Tests for the table of calls in assembler files
+'''
+class AssemblerCallTableTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.filePath = os.path.join(self.tmpDir, 'test.s')
+        with open(self.filePath, 'w') as assemblerFile:
+            assemblerFile.write(ASSEMBLER)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def testParseFile(self):
+        functions = AssemblerCallTable.parseFile(self.filePath)
+        self.assertEqual({'__test_MOD_outer', 'inner.1', '__test_MOD_outer._omp_fn.0'}, set(functions.keys()))
+        self.assertEqual([('__other_MOD_callee', 12, 0), ('inner.1', 13, 2), ('__test_MOD_outer._omp_fn.0', None, None)], functions['__test_MOD_outer'])
+        self.assertEqual([('__other_MOD_callee', 20, 0)], functions['inner.1'])
+        self.assertEqual([('__other_MOD_parallel', 15, 0)], functions['__test_MOD_outer._omp_fn.0'])
+
+    def testScanner(self):
+        with open(self.filePath, 'w') as assemblerFile:
+            assemblerFile.write('__test_MOD_first:\n\t.loc 1 5 3\n\t.loc 1\n\tcall\t__other_MOD_a\n\t.cfi_endproc\n\tcall\t__other_MOD_b\n  __test_MOD_second: \r\n\tcall\t__other_MOD_c')
+        functions = AssemblerCallTable.parseFile(self.filePath)
+        self.assertEqual([('__other_MOD_a', 5, 0)], functions['__test_MOD_first'])
+        self.assertEqual([('__other_MOD_c', 5, 0)], functions['__test_MOD_second'])
+
+        with open(self.filePath, 'w') as assemblerFile:
+            pass
+        self.assertEqual({}, AssemblerCallTable.parseFile(self.filePath))
+
+    def testCompressed(self):
+        expected = AssemblerCallTable.parseFile(self.filePath)
+        chunkSize = AssemblerCallTable.READ_CHUNK_SIZE
+        try:
+            for suffix, compression in (('.gz', gzip), ('.bz2', bz2), ('.xz', lzma)):
+                compressedFilePath = self.filePath + suffix
+                with compression.open(compressedFilePath, 'wt') as compressedFile:
+                    compressedFile.write(ASSEMBLER)
+                for readChunkSize in (1, 10, 100, chunkSize):
+                    AssemblerCallTable.READ_CHUNK_SIZE = readChunkSize
+                    self.assertEqual(expected, AssemblerCallTable.parseFile(compressedFilePath), suffix)
+                self.assertEqual(expected, AssemblerCallTable(self.cacheDir).getFunctions(compressedFilePath))
+        finally:
+            AssemblerCallTable.READ_CHUNK_SIZE = chunkSize
+
+    def testGetCalls(self):
+        callTable = AssemblerCallTable()
+        self.assertEqual(3, len(callTable.getCalls(self.filePath, '__test_MOD_outer')))
+        self.assertEqual([], callTable.getCalls(self.filePath, '__test_MOD_unknown'))
+        self.assertIs(callTable.getFunctions(self.filePath), callTable.getFunctions(self.filePath))
+
+    def testCache(self):
+        expected = AssemblerCallTable(self.cacheDir).getFunctions(self.filePath)
+        self.assertEqual(1, len(os.listdir(os.path.join(self.cacheDir, AssemblerCallTable.SUB_DIR))))
+
+        os.remove(self.filePath)
+        with open(self.filePath, 'w') as assemblerFile:
+            assemblerFile.write(ASSEMBLER)
+        os.utime(self.filePath, (0, 0))
+        self.assertEqual(expected, AssemblerCallTable(self.cacheDir).getFunctions(self.filePath))
+
+        with open(self.filePath, 'w') as assemblerFile:
+            assemblerFile.write(ASSEMBLER.replace('__other_MOD_parallel', '__other_MOD_parallal'))
+        os.utime(self.filePath, (1, 1))
+        functions = AssemblerCallTable(self.cacheDir).getFunctions(self.filePath)
+        self.assertEqual([('__other_MOD_parallal', 15, 0)], functions['__test_MOD_outer._omp_fn.0'])
+
+    def testModifiedFile(self):
+        callTable = AssemblerCallTable(self.cacheDir)
+        callTable.getFunctions(self.filePath)
+        with open(self.filePath, 'a') as assemblerFile:
+            assemblerFile.write('__test_MOD_appended:\n\tcall\t__other_MOD_callee\n')
+        self.assertEqual([('__other_MOD_callee', 15, 0)], callTable.getCalls(self.filePath, '__test_MOD_appended'))
+
+if __name__ == "__main__":
+    unittest.main()
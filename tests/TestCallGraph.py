@@ -0,0 +1,176 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import io
+import contextlib
+import tracemalloc
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from callgraph import CallGraph, CallGraphView
+from tree import TreeLikeCallGraphPrinter
+from source import SubroutineFullName, InnerSubroutineName
+
+ROOT = SubroutineFullName('__test_MOD_root')
+FIRST = SubroutineFullName('__test_MOD_first')
+SECOND = SubroutineFullName('__other_MOD_second')
+INNER = InnerSubroutineName('inner.1', ROOT)
+
+'''
+Tests for the indexes of the call graph
+'''
+class CallGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.callGraph = CallGraph()
+        for subroutine in (ROOT, FIRST, SECOND, INNER):
+            self.callGraph.addSubroutine(subroutine)
+        self.callGraph.addCall(ROOT, SECOND, 20, 0)
+        self.callGraph.addCall(ROOT, FIRST, 10, 0)
+        self.callGraph.addCall(ROOT, INNER, 14, 0)
+        self.callGraph.addCall(FIRST, SECOND, 5, 0)
+
+    def testCallers(self):
+        self.assertEqual({ROOT, FIRST}, self.callGraph.getCallers(SECOND))
+        self.assertEqual(set(), self.callGraph.getCallers(ROOT))
+        self.callGraph.addCall(SECOND, ROOT, 3, 0)
+        self.assertEqual({SECOND}, self.callGraph.getCallers(ROOT))
+        self.assertRaises(ValueError, self.callGraph.getCallers, SubroutineFullName('__test_MOD_unknown'))
+
+    def testContains(self):
+        self.assertIn('first', self.callGraph)
+        self.assertIn('inner', self.callGraph)
+        self.assertIn('__test_MOD_first', self.callGraph)
+        self.assertNotIn('third', self.callGraph)
+        self.callGraph.addSubroutine(SubroutineFullName('__test_MOD_third'))
+        self.assertIn('third', self.callGraph)
+
+    def testSortedCallees(self):
+        self.assertEqual([FIRST, INNER, SECOND], self.callGraph.getSortedCallees(ROOT))
+        self.callGraph.addCall(ROOT, SECOND, 1, 0)
+        self.assertEqual([SECOND, FIRST, INNER], self.callGraph.getSortedCallees(ROOT))
+        self.assertEqual({FIRST, SECOND, INNER}, self.callGraph.getCallees(ROOT))
+
+    def testFindCalleeBySimpleName(self):
+        self.assertEqual(FIRST, self.callGraph.findCalleeBySimpleName('first', ROOT))
+        self.assertEqual(INNER, self.callGraph.findCalleeBySimpleName('inner', ROOT))
+        self.assertIsNone(self.callGraph.findCalleeBySimpleName('root', ROOT))
+
+    def testFindNextCalleesFromLine(self):
+        self.assertEqual([FIRST], self.callGraph.findNextCalleesFromLine(ROOT, 10))
+        self.assertEqual([FIRST], self.callGraph.findNextCalleesFromLine(ROOT, 0))
+        self.assertEqual([SECOND], self.callGraph.findNextCalleesFromLine(ROOT, 100))
+        self.assertEqual([INNER], self.callGraph.findNextCalleesFromLine(ROOT, 15))
+        self.assertEqual([FIRST, INNER], self.callGraph.findNextCalleesFromLine(ROOT, 12))
+        self.callGraph.addCall(ROOT, SECOND, 12, 0)
+        self.assertEqual([SECOND], self.callGraph.findNextCalleesFromLine(ROOT, 12))
+        self.assertEqual([INNER, SECOND], self.callGraph.findNextCalleesFromLine(ROOT, 13))
+        self.assertEqual([FIRST, SECOND], self.callGraph.findNextCalleesFromLine(ROOT, 11))
+        self.assertEqual([], self.callGraph.findNextCalleesFromLine(SECOND, 10))
+
+    def testSubgraph(self):
+        self.callGraph.getCallers(SECOND)
+        subgraph = self.callGraph.extractSubgraph(FIRST)
+        self.assertEqual({FIRST, SECOND}, set(subgraph.getAllSubroutineNames()))
+        self.assertEqual({FIRST}, subgraph.getCallers(SECOND))
+        self.assertNotIn('root', subgraph)
+
+    def testSubgraphView(self):
+        subgraph = self.callGraph.extractSubgraph(FIRST)
+        self.assertIsInstance(subgraph, CallGraphView)
+        self.assertEqual(FIRST, subgraph.getRoot())
+        self.assertEqual([FIRST, SECOND], list(subgraph))
+        self.assertEqual({'test', 'other'}, subgraph.getAllModuleNames())
+        self.assertIn('second', subgraph)
+        self.assertNotIn(INNER, subgraph)
+        self.assertEqual(1, len(subgraph.getAllCalls()))
+        self.assertRaises(ValueError, subgraph.getCallees, ROOT)
+        self.assertRaises(ValueError, subgraph.extractSubgraph, ROOT)
+        self.assertRaises(TypeError, subgraph.addCall, FIRST, ROOT, 1, 0)
+        self.assertRaises(TypeError, subgraph.addSubroutine, SubroutineFullName('__test_MOD_new'))
+        self.assertEqual({ROOT: None, FIRST: None, INNER: None, SECOND: None}.keys(), self.callGraph.extractSubgraph(ROOT).getAllSubroutineNames())
+
+    def testSubgraphViewSerialize(self):
+        subgraph = self.callGraph.extractSubgraph(FIRST)
+        expected = CallGraph()
+        expected.addSubroutine(FIRST)
+        expected.addSubroutine(SECOND)
+        expected.addCall(FIRST, SECOND, 5, 0)
+        self.assertEqual(expected.serialize(), subgraph.serialize())
+        self.assertEqual(expected.serialize(), subgraph.extractSubgraph(FIRST).serialize())
+        self.assertEqual(SECOND, subgraph.extractSubgraph(SECOND).getRoot())
+
+    def testSubgraphViewAfterAddCall(self):
+        subgraph = self.callGraph.extractSubgraph(FIRST)
+        self.assertNotIn('root', subgraph)
+        self.callGraph.addCall(SECOND, INNER, 7, 0)
+        self.assertIn('inner', subgraph)
+        self.assertEqual({SECOND}, subgraph.getCallers(INNER))
+        self.assertEqual(INNER, subgraph.findCalleeBySimpleName('inner', SECOND))
+
+    def testSubgraphViewsReleased(self):
+        names = [SubroutineFullName('__chain_MOD_f%d' % i) for i in range(400)]
+        callGraph = CallGraph()
+        for name in names:
+            callGraph.addSubroutine(name)
+        for caller, callee in zip(names, names[1:]):
+            callGraph.addCall(caller, callee, 1, 0)
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        for i, name in enumerate(names):
+            self.assertEqual(len(names) - i, len(callGraph.extractSubgraph(name).getAllSubroutineNames()))
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(after - before, 100000)
+
+    def testDeserialize(self):
+        callGraph = CallGraph.deserialize(self.callGraph.serialize())
+        self.assertEqual({ROOT, FIRST}, callGraph.getCallers(SECOND))
+        self.assertEqual(INNER, callGraph.findCalleeBySimpleName('inner', ROOT))
+        self.assertEqual([FIRST], callGraph.findNextCalleesFromLine(ROOT, 9))
+        self.assertIn('inner', callGraph)
+
+    def testStronglyConnectedComponents(self):
+        self.callGraph.addCall(SECOND, FIRST, 3, 0)
+        self.callGraph.addCall(INNER, INNER, 4, 0)
+        self.assertEqual([[SECOND, FIRST], [INNER], [ROOT]], self.callGraph.getStronglyConnectedComponents())
+        self.assertEqual([[SECOND, FIRST], [INNER]], self.callGraph.getCycles())
+        self.assertEqual([SECOND, FIRST, INNER, ROOT], self.callGraph.getReverseTopologicalOrder())
+
+    def testCondensation(self):
+        self.callGraph.addCall(SECOND, FIRST, 3, 0)
+        components, componentIndices, componentCallees = self.callGraph.getCondensation()
+        self.assertEqual(3, len(components))
+        self.assertEqual(componentIndices[FIRST], componentIndices[SECOND])
+        self.assertEqual({componentIndices[FIRST], componentIndices[INNER]}, componentCallees[componentIndices[ROOT]])
+        self.assertEqual(set(), componentCallees[componentIndices[SECOND]])
+
+    def testHeightsAndDepths(self):
+        self.assertEqual({ROOT: 2, FIRST: 1, SECOND: 0, INNER: 0}, self.callGraph.getHeights())
+        self.assertEqual({ROOT: 0, FIRST: 1, SECOND: 1, INNER: 1}, self.callGraph.getDepths())
+        self.assertEqual({FIRST: 0, SECOND: 1}, self.callGraph.extractSubgraph(FIRST).getDepths())
+        self.assertEqual([], self.callGraph.getCycles())
+
+    def testDeepSubgraph(self):
+        callGraph = CallGraph()
+        depth = 2 * sys.getrecursionlimit()
+        names = [SubroutineFullName('__deep_MOD_f%d' % i) for i in range(depth)]
+        for name in names:
+            callGraph.addSubroutine(name)
+        for caller, callee in zip(names, names[1:]):
+            callGraph.addCall(caller, callee, 1, 0)
+        self.assertEqual(depth - 1, len(callGraph.extractSubgraph(names[1]).getAllSubroutineNames()))
+        self.assertEqual(list(reversed(names)), callGraph.getReverseTopologicalOrder())
+        self.assertEqual(depth - 1, callGraph.getHeights()[names[0]])
+        self.assertEqual(depth - 1, callGraph.getDepths()[names[-1]])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            TreeLikeCallGraphPrinter().printCallGraph(callGraph)
+        self.assertEqual(depth, len(output.getvalue().splitlines()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import gzip
+import bz2
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assembler import GNUx86AssemblerCallGraphBuilder
+from source import SubroutineFullName
+
+'''
+Tests for the iterative traversal of GNUx86AssemblerCallGraphBuilder
+'''
+class CallGraphBuilderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def writeChain(self, module, length):
+        '''Writes an assembler file, in which every function calls the next one and the last one calls the first one of the next module'''
+        with open(os.path.join(self.tmpDir, module + '.s'), 'w') as assemblerFile:
+            for f in range(length):
+                name = '__%s_MOD_f%d' % (module, f)
+                callee = '__%s_MOD_f%d' % (module, f + 1) if f + 1 < length else '__%s2_MOD_f0' % module
+                assemblerFile.write('%s:\n\t.cfi_startproc\n\t.loc 1 %d 5\n\tcall\t%s\n\tret\n\t.cfi_endproc\n' % (name, f + 10, callee))
+
+    def testDeepChain(self):
+        length = sys.getrecursionlimit() * 2
+        self.writeChain('deep', length)
+        self.writeChain('deep2', 3)
+        callGraph = GNUx86AssemblerCallGraphBuilder(self.tmpDir).buildCallGraph(SubroutineFullName('__deep_MOD_f0'))
+        names = list(callGraph.getAllSubroutineNames())
+        self.assertEqual(length + 4, len(names))
+        self.assertEqual(SubroutineFullName('__deep_MOD_f0'), names[0])
+        self.assertEqual(SubroutineFullName('__deep2_MOD_f0'), names[length])
+        self.assertEqual(SubroutineFullName('__deep22_MOD_f0'), names[-1])
+        self.assertEqual({SubroutineFullName('__deep_MOD_f6')}, callGraph.getCallees(SubroutineFullName('__deep_MOD_f5')))
+
+    def testSameWithoutThreads(self):
+        for sampleDir in ('use', 'inner', 'recursion', 'openmp'):
+            assemblerDir = os.path.join(SAMPLES_DIR, sampleDir)
+            sequential = GNUx86AssemblerCallGraphBuilder(assemblerDir, threads = 0)
+            concurrent = GNUx86AssemblerCallGraphBuilder(assemblerDir, threads = 4)
+            for fileName in os.listdir(assemblerDir):
+                if fileName.endswith('.s'):
+                    module = fileName[:-2]
+                    for label in concurrent.getCallTable().getFunctions(os.path.join(assemblerDir, fileName)):
+                        if SubroutineFullName.validFullName(label) and SubroutineFullName(label).getModuleName() == module:
+                            root = SubroutineFullName(label)
+                            self.assertEqual(json.dumps(sequential.buildCallGraph(root).serialize()), json.dumps(concurrent.buildCallGraph(root).serialize()), str(root))
+
+    def testCompressedFiles(self):
+        assemblerDir = os.path.join(SAMPLES_DIR, 'use')
+        specialModuleFiles = {'next' : 'middle.f90'}
+        for i, fileName in enumerate(sorted(os.listdir(assemblerDir))):
+            if fileName.endswith('.s'):
+                compression = gzip if i % 2 else bz2
+                with open(os.path.join(assemblerDir, fileName), 'rb') as assemblerFile:
+                    with compression.open(os.path.join(self.tmpDir, fileName + ('.gz' if i % 2 else '.bz2')), 'wb') as compressedFile:
+                        compressedFile.write(assemblerFile.read())
+        plainBuilder = GNUx86AssemblerCallGraphBuilder(assemblerDir, specialModuleFiles)
+        compressedBuilder = GNUx86AssemblerCallGraphBuilder(self.tmpDir, specialModuleFiles)
+        self.assertEqual(len(plainBuilder.findAllFilePaths()), len(compressedBuilder.findAllFilePaths()))
+        self.assertTrue(compressedBuilder.getModuleFilePath('next').startswith(os.path.join(self.tmpDir, 'middle.s.')))
+        for root in ('__top_MOD_top', '__top_MOD_tiptop', '__middle_MOD_middle'):
+            root = SubroutineFullName(root)
+            self.assertEqual(json.dumps(plainBuilder.buildCallGraph(root).serialize()), json.dumps(compressedBuilder.buildCallGraph(root).serialize()), str(root))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from callgraphinfo import CallGraphInfoTable
+from assembler import GNUx86AssemblerCallGraphBuilder, CallGraphInfoCallGraphBuilder, GlobalCallGraphInfoCallGraphBuilder
+from source import SubroutineFullName
+
+CALL_GRAPH_INFO = '''graph: { title: "test.f90"
+node: { title: "test.f90:inner.0" label: "inner\\ntest.f90:26:20" }
+node: { title: "GOMP_parallel" label: "__builtin_GOMP_parallel\\n<built-in>" shape : ellipse }
+edge: { sourcename: "test.f90:inner.0" targetname: "GOMP_parallel" }
+node: { title: "__test_MOD_host" label: "host\\ntest.f90:11:17" }
+edge: { sourcename: "__test_MOD_host" targetname: "__other_MOD_a" label: "test.f90:13:13" }
+edge: { sourcename: "__test_MOD_host" targetname: "GOMP_parallel" }
+edge: { sourcename: "__test_MOD_host" targetname: "_gfortran_st_write" label: "test.f90:19:13" }
+edge: { sourcename: "__test_MOD_host" targetname: "__other_MOD_b" label: "test.f90:20:13" }
+edge: { sourcename: "__test_MOD_host" targetname: "GOMP_parallel" }
+node: { title: "__other_MOD_b" label: "b\\ntest.f90:20:13" shape : ellipse }
+node: { title: "__other_MOD_a" label: "a\\ntest.f90:13:13" shape : ellipse }
+node: { title: "_gfortran_st_write" label: "_gfortran_st_write\\ntest.f90:19:13" shape : ellipse }
+node: { title: "test.f90:__test_MOD_host._omp_fn.0" label: "__test_MOD_host._omp_fn.0\\ntest.f90:14:18" }
+edge: { sourcename: "test.f90:__test_MOD_host._omp_fn.0" targetname: "__other_MOD_a" label: "test.f90:15:13" }
+edge: { sourcename: "test.f90:__test_MOD_host._omp_fn.0" targetname: "GOMP_parallel" }
+node: { title: "test.f90:__test_MOD_host._omp_fn.1" label: "__test_MOD_host._omp_fn.1\\ntest.f90:16:18" }
+edge: { sourcename: "test.f90:__test_MOD_host._omp_fn.1" targetname: "__other_MOD_b" label: "test.f90:17:13" }
+node: { title: "test.f90:__test_MOD_host._omp_fn.2" label: "__test_MOD_host._omp_fn.2\\ntest.f90:21:18" }
+edge: { sourcename: "test.f90:__test_MOD_host._omp_fn.2" targetname: "__other_MOD_b" label: "test.f90:22:13" }
+edge: { sourcename: "test.f90:__test_MOD_host._omp_fn.2" targetname: "test.f90:inner.0" label: "test.f90:23:16" }
+node: { title: "test.f90:inner.0._omp_fn.0" label: "inner.0._omp_fn.0\\ntest.f90:27:20" }
+edge: { sourcename: "test.f90:inner.0._omp_fn.0" targetname: "__other_MOD_a" label: "test.f90:28:15" }
+}
+'''
+
+'''
+Tests for the table of calls in call graph files (.ci) and for the call graphs built from them
+'''
+class CallGraphInfoTableTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tmpDir, 'test.ci')
+        with open(self.filePath, 'w') as callGraphFile:
+            callGraphFile.write(CALL_GRAPH_INFO)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def testParseFile(self):
+        functions = CallGraphInfoTable.parseFile(self.filePath)
+        self.assertEqual({'__test_MOD_host', 'inner.0', '__test_MOD_host._omp_fn.0', '__test_MOD_host._omp_fn.1', '__test_MOD_host._omp_fn.2', 'inner.0._omp_fn.0'}, set(functions.keys()))
+        self.assertEqual([('__other_MOD_a', 13, 0), ('__test_MOD_host._omp_fn.0', None, None), ('__other_MOD_b', 20, 0), ('__test_MOD_host._omp_fn.2', None, None)], functions['__test_MOD_host'])
+        self.assertEqual([('__other_MOD_b', 22, 0), ('inner.0', 23, 0)], functions['__test_MOD_host._omp_fn.2'])
+        self.assertEqual([('inner.0._omp_fn.0', None, None)], functions['inner.0'])
+
+    def testNestedOmpRegions(self):
+        functions = CallGraphInfoTable.parseFile(self.filePath)
+        self.assertEqual([('__other_MOD_a', 15, 0), ('__test_MOD_host._omp_fn.1', None, None)], functions['__test_MOD_host._omp_fn.0'])
+        self.assertEqual([('__other_MOD_b', 17, 0)], functions['__test_MOD_host._omp_fn.1'])
+
+    def testMissingOmpRegion(self):
+        with open(self.filePath, 'w') as callGraphFile:
+            callGraphFile.write('\n'.join(line for line in CALL_GRAPH_INFO.splitlines() if '_omp_fn.2' not in line))
+        functions = CallGraphInfoTable.parseFile(self.filePath)
+        self.assertEqual([('__other_MOD_a', 13, 0), ('__test_MOD_host._omp_fn.0', None, None), ('__other_MOD_b', 20, 0)], functions['__test_MOD_host'])
+
+    def testCache(self):
+        cacheDir = os.path.join(self.tmpDir, 'cache')
+        expected = CallGraphInfoTable(cacheDir).getFunctions(self.filePath)
+        self.assertEqual(1, len(os.listdir(os.path.join(cacheDir, CallGraphInfoTable.SUB_DIR))))
+        self.assertEqual(expected, CallGraphInfoTable(cacheDir).getFunctions(self.filePath))
+
+    def testBuildCallGraph(self):
+        callGraph = CallGraphInfoCallGraphBuilder(self.tmpDir).buildCallGraph(SubroutineFullName('__test_MOD_host'))
+        self.assertEqual({'__other_MOD_a', '__other_MOD_b', 'inner.0'}, set(map(str, callGraph.getCallees(SubroutineFullName('__test_MOD_host')))))
+
+    def assertSameCallGraphs(self, sampleDir):
+        if shutil.which('gfortran') is None:
+            self.skipTest('gfortran not available')
+        sourceDir = os.path.join(SAMPLES_DIR, sampleDir)
+        for fileName in sorted(os.listdir(sourceDir)):
+            if fileName.endswith('.f90'):
+                subprocess.check_call(['gfortran', '-c', '-g', '-O0', '-fcallgraph-info', os.path.join(sourceDir, fileName)], cwd = self.tmpDir)
+        os.remove(self.filePath)
+
+        assemblerBuilder = GNUx86AssemblerCallGraphBuilder(sourceDir)
+        callGraphInfoBuilder = CallGraphInfoCallGraphBuilder(self.tmpDir)
+        globalCallGraphInfoBuilder = GlobalCallGraphInfoCallGraphBuilder(self.tmpDir, processes = 1)
+        labels = set()
+        for filePath in callGraphInfoBuilder.findAllFilePaths():
+            labels.update(label for label in CallGraphInfoTable.parseFile(filePath) if SubroutineFullName.validFullName(label))
+        self.assertTrue(labels)
+        for label in sorted(labels):
+            root = SubroutineFullName(label)
+            expected = json.dumps(assemblerBuilder.buildCallGraph(root).serialize())
+            self.assertEqual(expected, json.dumps(callGraphInfoBuilder.buildCallGraph(root).serialize()), label)
+            self.assertEqual(json.loads(expected), globalCallGraphInfoBuilder.buildCallGraph(root).serialize(), label)
+
+    def testUse(self):
+        self.assertSameCallGraphs('use')
+
+    def testRecursion(self):
+        self.assertSameCallGraphs('recursion')
+
+if __name__ == "__main__":
+    unittest.main()
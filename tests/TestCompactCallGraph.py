@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from callgraph import CallGraph
+from compactcallgraph import CompactCallGraph
+from source import SubroutineFullName, InnerSubroutineName
+
+ROOT = SubroutineFullName('__test_MOD_root')
+FIRST = SubroutineFullName('__test_MOD_first')
+SECOND = SubroutineFullName('__other_MOD_second')
+INNER = InnerSubroutineName('inner.1', ROOT)
+EXTERNAL = SubroutineFullName('__external_MOD_ext')
+
+'''
+Tests for the call graph with integer IDs in compressed sparse row format
+'''
+class CompactCallGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.callGraph = CallGraph()
+        for subroutine in (ROOT, FIRST, SECOND, INNER):
+            self.callGraph.addSubroutine(subroutine)
+        self.callGraph.addCall(ROOT, SECOND, 20, 0)
+        self.callGraph.addCall(ROOT, FIRST, 10, 0)
+        self.callGraph.addCall(ROOT, INNER, 14, 0)
+        self.callGraph.addCall(FIRST, SECOND, 5, 0)
+        self.callGraph.addCall(FIRST, SECOND, 5, 1)
+        self.callGraph.addCall(INNER, EXTERNAL, 30, 0)
+        self.compact = CompactCallGraph.fromCallGraph(self.callGraph)
+
+    def testIds(self):
+        self.assertEqual(4, len(self.compact))
+        self.assertEqual(6, self.compact.getCallCount())
+        self.assertEqual(ROOT, self.compact.getRoot())
+        self.assertEqual(0, self.compact.getSubroutineId(ROOT))
+        self.assertEqual(4, self.compact.getSubroutineId(EXTERNAL))
+        self.assertIsNone(self.compact.getSubroutineId(SubroutineFullName('__test_MOD_unknown')))
+        self.assertIn(SECOND, self.compact)
+        self.assertNotIn(EXTERNAL, self.compact)
+        self.assertEqual([2, 1, 3], self.compact.getCalleeIds(0).tolist())
+
+    def testCallSites(self):
+        for name in self.callGraph:
+            self.assertEqual(self.callGraph.getCallSites(name), self.compact.getCallSites(name))
+            self.assertEqual(self.callGraph.getCallees(name), self.compact.getCallees(name))
+        self.assertRaises(ValueError, self.compact.getCallees, EXTERNAL)
+
+    def testCallers(self):
+        for name in self.callGraph:
+            self.assertEqual(self.callGraph.getCallers(name), self.compact.getCallers(name))
+        self.assertEqual([3], self.compact.getCallerIds(self.compact.getSubroutineId(EXTERNAL)).tolist())
+
+    def testReachable(self):
+        for name in (FIRST, SECOND):
+            self.assertEqual(list(self.callGraph.extractSubgraph(name).getAllSubroutineNames()), self.compact.getReachableSubroutineNames(name))
+        self.assertEqual([ROOT, SECOND, FIRST, INNER, EXTERNAL], self.compact.getReachableSubroutineNames(ROOT))
+
+    def testToCallGraph(self):
+        self.assertEqual(json.dumps(self.callGraph.serialize()), json.dumps(self.compact.toCallGraph().serialize()))
+
+    def testSerialize(self):
+        compact = CompactCallGraph.deserialize(json.loads(json.dumps(self.compact.serialize())))
+        self.assertEqual(self.compact.serialize(), compact.serialize())
+        self.assertEqual(INNER, compact.getSubroutineName(3))
+        self.assertEqual(json.dumps(self.callGraph.serialize()), json.dumps(compact.toCallGraph().serialize()))
+        self.assertRaises(ValueError, CompactCallGraph.deserialize, {})
+
+    def testDeepGraph(self):
+        callGraph = CallGraph()
+        depth = 2 * sys.getrecursionlimit()
+        names = [SubroutineFullName('__deep_MOD_f%d' % i) for i in range(depth)]
+        for name in names:
+            callGraph.addSubroutine(name)
+        for caller, callee in zip(names, names[1:]):
+            callGraph.addCall(caller, callee, 1, 0)
+        self.assertEqual(names[1:], CompactCallGraph.fromCallGraph(callGraph).getReachableSubroutineNames(names[1]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,8 @@ FCG_DIR = TEST_DIR + '/..'
 sys.path.append(FCG_DIR)
 
 from fcgconfigurator import loadFortranCallGraphConfiguration, CFG_SOURCE_DIRS, CFG_ASSEMBLER_DIRS, CFG_SPECIAL_MODULE_FILES,\
-    CFG_CACHE_DIR, CFG_SOURCE_FILES_PREPROCESSED, CFG_EXCLUDE_MODULES, CFG_IGNORE_GLOBALS_FROM_MODULES, CFG_IGNORE_DERIVED_TYPES
+    CFG_CACHE_DIR, CFG_SOURCE_FILES_PREPROCESSED, CFG_EXCLUDE_MODULES, CFG_IGNORE_GLOBALS_FROM_MODULES, CFG_IGNORE_DERIVED_TYPES,\
+    CFG_CALL_GRAPH_FILES
 
 ''' 
 Tests for strange variable declarations
@@ -21,6 +22,7 @@ class ConfiguratorTest(unittest.TestCase):
         self.assertIsNotNone(config)
         self.assertEqual([TEST_DIR + '/samples/configurator/ass'], config[CFG_ASSEMBLER_DIRS])
         self.assertEqual([TEST_DIR + '/samples/configurator/src'], config[CFG_SOURCE_DIRS])
+        self.assertEqual('assembler', config[CFG_CALL_GRAPH_FILES])
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
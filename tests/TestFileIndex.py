@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+SOURCE_DIR = SAMPLES_DIR + '/use'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from fileindex import FileNameIndex
+from source import SourceFiles, SubroutineFullName
+from assembler import GNUx86AssemblerCallGraphBuilder
+from assemblercalls import AssemblerCallTable
+from treecache import CachedAssemblerCallGraphBuilder, CallGraphStore
+
+'''
+Tests for the persistent file name index
+'''
+class FileIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.srcDir = os.path.join(self.tmpDir, 'src')
+        os.makedirs(os.path.join(self.srcDir, 'sub'))
+        self.__touch(os.path.join(self.srcDir, 'Alpha.f90'))
+        self.__touch(os.path.join(self.srcDir, 'sub', 'beta.F90'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def __touch(self, path):
+        with open(path, 'w') as f:
+            f.write('')
+
+    def testFindFile(self):
+        index = FileNameIndex(self.srcDir)
+        self.assertEqual(os.path.join(self.srcDir, 'Alpha.f90'), index.findFile('alpha.f90'))
+        self.assertEqual(os.path.join(self.srcDir, 'sub', 'beta.F90'), index.findFile('BETA.f90'))
+        self.assertIsNone(index.findFile('gamma.f90'))
+        self.assertEqual(2, len(index.getPaths()))
+
+    def testPersistence(self):
+        index = FileNameIndex(self.srcDir, self.cacheDir)
+        self.assertIsNotNone(index.findFile('alpha.f90'))
+        self.assertEqual(1, len(os.listdir(self.cacheDir)))
+
+        reloaded = FileNameIndex(self.srcDir, self.cacheDir)
+        self.assertEqual(index.getPaths(), reloaded.getPaths())
+
+    def testRevalidation(self):
+        index = FileNameIndex(self.srcDir, self.cacheDir)
+        self.assertIsNone(index.findFile('gamma.f90'))
+
+        gammaPath = os.path.join(self.srcDir, 'sub', 'gamma.f90')
+        self.__touch(gammaPath)
+        stat = os.stat(os.path.join(self.srcDir, 'sub'))
+        os.utime(os.path.join(self.srcDir, 'sub'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+        reloaded = FileNameIndex(self.srcDir, self.cacheDir)
+        self.assertEqual(gammaPath, reloaded.findFile('gamma.f90'))
+
+    def testSourceFiles(self):
+        specialModuleFiles = {'next' : 'middle.f90'}
+        walkingFiles = SourceFiles(SOURCE_DIR, specialModuleFiles)
+        indexedFiles = SourceFiles(SOURCE_DIR, specialModuleFiles, fileIndex = FileNameIndex(SOURCE_DIR, self.cacheDir))
+        for moduleName in ['top', 'middle', 'next', 'bottom', 'nonexisting']:
+            walkingFile = walkingFiles.findModuleFile(moduleName)
+            indexedFile = indexedFiles.findModuleFile(moduleName)
+            if walkingFile is None:
+                self.assertIsNone(indexedFile)
+            else:
+                self.assertEqual(walkingFile.getPath(), indexedFile.getPath())
+
+    def testFindFirstFile(self):
+        self.__touch(os.path.join(self.srcDir, 'sub', 'alpha_mod.f90'))
+        index = FileNameIndex(self.srcDir)
+        self.assertEqual(os.path.join(self.srcDir, 'Alpha.f90'), index.findFirstFile(['alpha_mod.f90', 'ALPHA.f90']))
+        self.assertEqual(os.path.join(self.srcDir, 'sub', 'beta.F90'), index.findFirstFile(['gamma.f90', 'beta.f90']))
+        self.assertIsNone(index.findFirstFile(['gamma.f90']))
+        self.assertIsNone(index.findFirstFile([]))
+
+    def testAssemblerFiles(self):
+        specialModuleFiles = {'next' : 'middle.f90'}
+        sampleDirs = [os.path.join(SAMPLES_DIR, sampleDir) for sampleDir in sorted(os.listdir(SAMPLES_DIR)) if os.path.isdir(os.path.join(SAMPLES_DIR, sampleDir))]
+        walkingBuilder = GNUx86AssemblerCallGraphBuilder(sampleDirs, specialModuleFiles)
+        indexedBuilder = GNUx86AssemblerCallGraphBuilder(sampleDirs, specialModuleFiles, fileIndex = FileNameIndex(sampleDirs, self.cacheDir, 'assembler'))
+        self.assertEqual(walkingBuilder.findAllFilePaths(), indexedBuilder.findAllFilePaths())
+        for path in walkingBuilder.findAllFilePaths():
+            moduleName = os.path.basename(path)[:-2]
+            self.assertEqual(walkingBuilder.getModuleFilePath(moduleName), indexedBuilder.getModuleFilePath(moduleName))
+        for moduleName in ['next', 'next_mod', 'nonexisting']:
+            self.assertEqual(walkingBuilder.getModuleFilePath(moduleName), indexedBuilder.getModuleFilePath(moduleName))
+
+    def testCachedCallGraph(self):
+        assemblerDir = os.path.join(SAMPLES_DIR, 'use')
+        fileIndex = FileNameIndex(assemblerDir, self.cacheDir, 'assembler')
+        builder = CachedAssemblerCallGraphBuilder(self.cacheDir, GNUx86AssemblerCallGraphBuilder(assemblerDir, fileIndex = fileIndex))
+        root = SubroutineFullName('__top_MOD_tiptop')
+        built = builder.buildCallGraph(root)
+        self.assertTrue(os.path.isfile(os.path.join(self.cacheDir, CallGraphStore.getFileName(AssemblerCallTable.SUB_DIR))))
+        loaded = builder.buildCallGraph(root)
+        self.assertEqual(built.serialize(), loaded.serialize())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from manifest import FileManifest
+
+'''
+Tests for the file fingerprints with stat fields and content hashes
+'''
+class FileManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.filePath = self.writeFile('file.s', 'call\tfoo\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def writeFile(self, fileName, content):
+        filePath = os.path.join(self.tmpDir, fileName)
+        with open(filePath, 'w') as openFile:
+            openFile.write(content)
+        return filePath
+
+    def manifest(self, *filePaths):
+        return FileManifest(dict((filePath, FileManifest.fingerprint(filePath)) for filePath in filePaths))
+
+    def testUnchanged(self):
+        manifest = self.manifest(self.filePath)
+        self.assertFalse(manifest.isChanged(self.filePath))
+        self.assertEqual(set(), manifest.findChangedFiles())
+        self.assertEqual(dict(), manifest.takeUpdatedFingerprints())
+
+    def testTouched(self):
+        manifest = self.manifest(self.filePath)
+        os.utime(self.filePath, (time.time() + 10, ) * 2)
+        self.assertEqual(set(), manifest.findChangedFiles())
+        fingerprint = FileManifest.fingerprint(self.filePath)
+        self.assertEqual({self.filePath: fingerprint}, manifest.takeUpdatedFingerprints())
+        self.assertEqual(dict(), manifest.takeUpdatedFingerprints())
+        self.assertEqual(fingerprint, manifest.getFingerprints()[self.filePath])
+
+    def testContentChanged(self):
+        manifest = self.manifest(self.filePath)
+        self.writeFile('file.s', 'call\tbar\n')
+        os.utime(self.filePath, (time.time() + 10, ) * 2)
+        self.assertTrue(manifest.isChanged(self.filePath))
+        self.assertEqual({self.filePath}, manifest.findChangedFiles())
+        self.assertEqual(dict(), manifest.takeUpdatedFingerprints())
+
+    def testCopied(self):
+        manifest = self.manifest(self.filePath)
+        copyPath = os.path.join(self.tmpDir, 'copy.s')
+        shutil.copy(self.filePath, copyPath)
+        os.replace(copyPath, self.filePath)
+        self.assertFalse(manifest.isChanged(self.filePath))
+        self.assertEqual(os.stat(self.filePath).st_ino, manifest.getFingerprints()[self.filePath][2])
+
+    def testMissingFile(self):
+        missingPath = os.path.join(self.tmpDir, 'missing.s')
+        manifest = self.manifest(self.filePath, missingPath)
+        self.assertIsNone(manifest.getFingerprints()[missingPath])
+        self.assertFalse(manifest.isChanged(missingPath))
+        os.remove(self.filePath)
+        self.writeFile('missing.s', '')
+        self.assertFalse(manifest.isChanged(missingPath))
+        manifest = FileManifest(manifest.getFingerprints())
+        self.assertEqual({self.filePath, missingPath}, manifest.findChangedFiles())
+
+    def testUnknownFile(self):
+        manifest = FileManifest()
+        self.assertTrue(manifest.isChanged(self.filePath))
+        self.assertEqual({self.filePath: FileManifest.fingerprint(self.filePath)}, manifest.fingerprintFiles([self.filePath]))
+
+    def testManyFiles(self):
+        filePaths = [self.writeFile('file%d.s' % i, 'call\tf%d\n' % i) for i in range(2 * FileManifest.PARALLEL_MIN_FILES)]
+        manifest = self.manifest(*filePaths)
+        self.writeFile('file7.s', 'call\tg7\n')
+        os.utime(filePaths[7], (time.time() + 10, ) * 2)
+        os.utime(filePaths[9], (time.time() + 10, ) * 2)
+        self.assertEqual({filePaths[7]}, manifest.findChangedFiles())
+        self.assertEqual([filePaths[9]], list(manifest.takeUpdatedFingerprints()))
+        fingerprints = manifest.fingerprintFiles(filePaths)
+        self.assertEqual(dict((filePath, FileManifest.fingerprint(filePath)) for filePath in filePaths), fingerprints)
+
+    def testSerialization(self):
+        manifest = self.manifest(self.filePath, os.path.join(self.tmpDir, 'missing.s'))
+        copy = FileManifest.deserialize(json.loads(json.dumps(manifest.serialize())))
+        self.assertEqual(manifest.getFingerprints(), copy.getFingerprints())
+        self.assertEqual(set(), copy.findChangedFiles())
+        self.assertRaises(ValueError, FileManifest.deserialize, [['file.s', 1]])
+
+if __name__ == "__main__":
+    unittest.main()
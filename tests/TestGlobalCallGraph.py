@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assembler import GNUx86AssemblerCallGraphBuilder, GlobalAssemblerCallGraphBuilder
+from source import SubroutineFullName
+
+'''
+Tests whether call graphs extracted from the global call graph equal the ones built per root subroutine
+'''
+class GlobalCallGraphTest(unittest.TestCase):
+    def assertSameCallGraphs(self, sampleDir):
+        assemblerDir = os.path.join(SAMPLES_DIR, sampleDir)
+        perRootBuilder = GNUx86AssemblerCallGraphBuilder(assemblerDir)
+        globalBuilder = GlobalAssemblerCallGraphBuilder(assemblerDir, processes = 2)
+        roots = [name for name in globalBuilder.getGlobalCallGraph().getAllSubroutineNames() if isinstance(name, SubroutineFullName)]
+        self.assertTrue(roots)
+        for root in roots:
+            expected = perRootBuilder.buildCallGraph(root)
+            actual = globalBuilder.buildCallGraph(root)
+            self.assertEqual(root, actual.getRoot())
+            self.assertEqual(json.dumps(expected.serialize(), sort_keys = True), json.dumps(actual.serialize(), sort_keys = True), str(root))
+
+    def testUse(self):
+        self.assertSameCallGraphs('use')
+        globalBuilder = GlobalAssemblerCallGraphBuilder(os.path.join(SAMPLES_DIR, 'use'), processes = 1)
+        callGraph = globalBuilder.buildCallGraph(SubroutineFullName('__top_MOD_tiptop'))
+        self.assertEqual({'tiptop', 'medium', 'butt_x'}, set(name.getSimpleName() for name in callGraph.getAllSubroutineNames()))
+
+    def testInner(self):
+        self.assertSameCallGraphs('inner')
+
+    def testRecursion(self):
+        self.assertSameCallGraphs('recursion')
+
+    def testUnknownRoot(self):
+        globalBuilder = GlobalAssemblerCallGraphBuilder(os.path.join(SAMPLES_DIR, 'use'), processes = 1)
+        root = SubroutineFullName('__top_MOD_unknown')
+        callGraph = globalBuilder.buildCallGraph(root)
+        self.assertEqual([root], list(callGraph.getAllSubroutineNames()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from linemap import PreprocessorLineMap
+
+'''
+Tests for the translation of line numbers between preprocessed and original files
+'''
+class LineMapTest(unittest.TestCase):
+    def setUp(self):
+        lines = ['# 1 "main.F90"',
+                 'module m',                   # main.F90:1
+                 '# 1 "inc.h" 1',
+                 'integer :: a',               # inc.h:1
+                 'integer :: b',               # inc.h:2
+                 '# 3 "main.F90" 2',
+                 'contains',                   # main.F90:3
+                 '# 1 "inc.h" 1',
+                 'integer :: a',               # inc.h:1
+                 '# 5 "main.F90" 2',
+                 '# 8',
+                 'end module m']               # main.F90:8
+        self.lineMap = PreprocessorLineMap.fromLines(enumerate((line + '\n' for line in lines), 1))
+
+    def testToOriginal(self):
+        self.assertEqual(6, len(self.lineMap))
+        self.assertEqual([1, 1, 2, 3, 1, 8], [self.lineMap.toOriginalLineNumber(i) for i in (2, 4, 5, 7, 9, 12)])
+        self.assertEqual(['main.F90', 'inc.h', 'inc.h', 'main.F90', 'inc.h', 'main.F90'], [self.lineMap.getFileName(i) for i in (2, 4, 5, 7, 9, 12)])
+        self.assertEqual(4, self.lineMap.getOffset(12))
+
+    def testBatch(self):
+        lineNumbers = [12, 2, 9, 4, 7, 5, 4]
+        self.assertEqual([self.lineMap.toOriginalLineNumber(i) for i in lineNumbers], self.lineMap.toOriginalLineNumbers(lineNumbers))
+        self.assertEqual([], self.lineMap.toOriginalLineNumbers([]))
+        self.assertEqual([2, 7, 12, None], self.lineMap.toPreprocessedLineNumbers([1, 3, 8, 5]))
+
+    def testToPreprocessed(self):
+        self.assertEqual(5, self.lineMap.toPreprocessedLineNumber(2, 'inc.h'))
+        self.assertIn(self.lineMap.toPreprocessedLineNumber(1, 'inc.h'), (4, 9))
+        self.assertIsNone(self.lineMap.toPreprocessedLineNumber(3, 'inc.h'))
+        self.assertIsNone(self.lineMap.toPreprocessedLineNumber(1, 'other.h'))
+
+    def testWithoutDirectives(self):
+        lineMap = PreprocessorLineMap.fromLines([(1, 'module m\n'), (2, '#ifdef X\n'), (3, 'end module m\n')])
+        self.assertEqual(0, len(lineMap))
+        self.assertEqual(0, lineMap.getOffset(3))
+        self.assertIsNone(lineMap.getFileName(3))
+        self.assertEqual([3, 1], lineMap.toOriginalLineNumbers([3, 1]))
+        self.assertEqual(2, lineMap.toPreprocessedLineNumber(2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SOURCE_DIR = TEST_DIR + '/samples/use'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from linestore import LineStore
+from source import SourceFile
+
+'''
+Tests for the memory-mapped line store
+'''
+class LineStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def createFile(self, name, content):
+        path = os.path.join(self.tmpDir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def readLines(self, path):
+        with open(path) as f:
+            return list(enumerate(f, 1))
+
+    def testSameAsFileObject(self):
+        for name in os.listdir(SOURCE_DIR):
+            if name.endswith('.f90'):
+                path = os.path.join(SOURCE_DIR, name)
+                store = LineStore(path)
+                self.assertEqual(self.readLines(path), list(store.getLines()))
+                self.assertEqual(self.readLines(path), store.getLines())
+
+    def testLineBreaks(self):
+        path = self.createFile('crlf.f90', b'MODULE a\r\n  INTEGER :: i\r\rEND MODULE a')
+        store = LineStore(path)
+        self.assertEqual(4, store.getLineCount())
+        self.assertEqual(self.readLines(path), list(store.getLines()))
+        self.assertEqual('  INTEGER :: i\n', store.getLine(2))
+        self.assertEqual('END MODULE a', store.getLine(4))
+
+    def testEmptyFile(self):
+        store = LineStore(self.createFile('empty.f90', b''))
+        self.assertEqual(0, store.getLineCount())
+        self.assertEqual([], list(store.getLines()))
+
+    def testViews(self):
+        path = self.createFile('view.f90', b''.join(b'line ' + str(i).encode() + b'\n' for i in range(1, 11)))
+        lines = LineStore(path).getLines()
+        self.assertEqual(10, len(lines))
+        self.assertEqual((3, 'line 3\n'), lines[2])
+        self.assertEqual((10, 'line 10\n'), lines[-1])
+        view = lines[3:6]
+        self.assertEqual([(4, 'line 4\n'), (5, 'line 5\n'), (6, 'line 6\n')], list(view))
+        self.assertEqual([6, 5, 4], [i for i, _ in reversed(view)])
+        self.assertEqual([(5, 'line 5\n')], list(view[1:2]))
+        self.assertEqual(0, len(lines[20:]))
+
+    def testReopen(self):
+        maxOpenFiles = LineStore.MAX_OPEN_FILES
+        LineStore.MAX_OPEN_FILES = 2
+        try:
+            stores = [LineStore(self.createFile(str(i) + '.f90', b'x = ' + str(i).encode() + b'\n')) for i in range(5)]
+            for i, store in enumerate(stores):
+                self.assertEqual('x = ' + str(i) + '\n', store.getLine(1))
+            for i, store in enumerate(stores):
+                self.assertEqual('x = ' + str(i) + '\n', store.getLine(1))
+        finally:
+            LineStore.MAX_OPEN_FILES = maxOpenFiles
+
+    def testSourceFile(self):
+        sourceFile = SourceFile(os.path.join(SOURCE_DIR, 'middle.f90'))
+        module = sourceFile.getModule('middle')
+        self.assertEqual(list(sourceFile.getLines())[module.getFirstLineNumber() - 1:module.getLastLineNumber()], list(module.getLines()))
+        for subroutine in module.getSubroutines().values():
+            first = subroutine.getFirstLineNumber()
+            self.assertEqual(sourceFile.getLine(first), subroutine.getLine(first))
+            self.assertEqual(first, subroutine.getLines()[0][0])
+
+if __name__ == "__main__":
+    unittest.main()
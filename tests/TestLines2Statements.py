@@ -28,6 +28,32 @@ class Lines2StatementsTest(unittest.TestCase):
         statement = 'CALL sub(a)'
         self.assertStatement(line, statement)
         
+        line = "WRITE (*,*) 'Hello! World' ! Comment"
+        statement = "WRITE(*,*) ''"
+        self.assertStatement(line, statement)
+        
+    def testStrings(self):
+        line = 'str = "a \\" b" // \'c\''
+        statement = 'str=""//\'\''
+        self.assertStatement(line, statement)
+        
+        line = "str = 'unterminated ; string"
+        statement = "str='"
+        self.assertStatement(line, statement)
+        
+    def testBlanks(self):
+        line = '  a   =  b ( 1 ,  2 )  +   c  %  d'
+        statement = 'a=b(1,2)+c%d'
+        self.assertStatement(line, statement)
+        
+        line = 'INTEGER    :: i'
+        statement = 'INTEGER::i'
+        self.assertStatement(line, statement)
+        
+    def testContinuationAndSemicolons(self):
+        lines = [(1, 'CALL sub(a, &\n'), (2, '! comment\n'), (3, '    & b)  ; x = 1;\n'), (4, '\n'), (5, 'y = 2\n')]
+        expStatements = [(1, 'CALL sub(a,b)', 3), (1, 'x=1', 3), (5, 'y=2', 5)]
+        self.assertEqual(expStatements, SourceFile.linesToStatements(lines))
         
     def assertStatement(self, line, expStatement):    
         statements = SourceFile.linesToStatements([(0,line)])
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SOURCE_DIR = TEST_DIR + '/samples/use'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SourceFiles, SubroutineFullName
+
+'''
+Tests for the eviction of parsed source files when the memory limit is exceeded
+'''
+class MemoryLimitTest(unittest.TestCase):
+    def testNoLimit(self):
+        sourceFiles = SourceFiles(SOURCE_DIR)
+        top = sourceFiles.findModuleFile('top')
+        sourceFiles.findModuleFile('bottom')
+        self.assertIs(top, sourceFiles.findModuleFile('top'))
+        self.assertEqual(0, sourceFiles.getEvictionCount())
+        self.assertEqual(0, sourceFiles.getMemorySize())
+
+    def testEviction(self):
+        sourceFiles = SourceFiles(SOURCE_DIR, memoryLimit = 1)
+        top = sourceFiles.findModuleFile('top')
+        top.getStatements()
+        self.assertIs(top, sourceFiles.findModuleFile('top'))
+        self.assertEqual(0, sourceFiles.getEvictionCount())
+        self.assertGreater(sourceFiles.getMemorySize(), 1)
+
+        sourceFiles.findModuleFile('bottom').getStatements()
+        self.assertEqual(1, sourceFiles.getEvictionCount())
+        sourceFiles.findModuleFile('bottom')
+        self.assertEqual(1, sourceFiles.getEvictionCount())
+
+        reparsed = sourceFiles.findModuleFile('top')
+        self.assertIsNot(top, reparsed)
+        self.assertEqual(top, reparsed)
+        self.assertEqual(top.getStatements(), reparsed.getStatements())
+        self.assertEqual(2, sourceFiles.getEvictionCount())
+
+        self.assertTrue(sourceFiles.existsSubroutine(SubroutineFullName('__middle_MOD_medium')))
+        self.assertEqual('middle', sourceFiles.findModule('middle').getName())
+
+    def testVariablesCounted(self):
+        sourceFiles = SourceFiles(SOURCE_DIR, memoryLimit = 1024 * 1024)
+        module = sourceFiles.findModule('middle')
+        module.getStatements()
+        sourceFiles.findModule('middle')
+        size = sourceFiles.getMemorySize()
+        module.getVariables()
+        for subroutine in module.getSubroutines().values():
+            subroutine.getVariables()
+        sourceFiles.findModule('middle')
+        self.assertGreater(sourceFiles.getMemorySize(), size)
+        self.assertEqual(module.getSourceFile().getMemorySize(), sourceFiles.getMemorySize())
+
+    def testLimitNotReached(self):
+        sourceFiles = SourceFiles(SOURCE_DIR, memoryLimit = 1024 * 1024)
+        top = sourceFiles.findModuleFile('top')
+        for moduleName in ['middle', 'bottom']:
+            sourceFiles.findModule(moduleName).getStatements()
+        self.assertIs(top, sourceFiles.findModuleFile('top'))
+        self.assertEqual(0, sourceFiles.getEvictionCount())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SOURCE_DIR = TEST_DIR + '/samples/use'
+ASSEMBLER_DIR = SOURCE_DIR
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from fileindex import FileNameIndex
+from moduleindex import ModuleFileIndex
+from source import SourceFiles
+from assembler import GNUx86AssemblerCallGraphBuilder
+from source import SubroutineFullName
+
+'''
+Tests for the content-based module file index
+'''
+class ModuleIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.moduleIndex = ModuleFileIndex(FileNameIndex(SOURCE_DIR), self.cacheDir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def testModuleNames(self):
+        self.assertEqual({'top', 'middle', 'next', 'bottom'}, set(self.moduleIndex.getModuleNames()))
+        self.assertEqual('middle.f90', self.moduleIndex.findModuleFileName('next'))
+        self.assertEqual(SOURCE_DIR + '/top.f90', self.moduleIndex.findModuleFile('TOP'))
+        self.assertIsNone(self.moduleIndex.findModuleFile('butt_x'))
+
+    def testSourceFiles(self):
+        sourceFiles = SourceFiles(SOURCE_DIR, moduleIndex = self.moduleIndex)
+        self.assertTrue(sourceFiles.existsModule('next'))
+        self.assertEqual('middle.f90', sourceFiles.findModuleFile('next').getFileName())
+        self.assertIsNone(sourceFiles.findModuleFile('nonexisting'))
+
+    def testAssembler(self):
+        if not os.path.exists(ASSEMBLER_DIR + '/middle.s'):
+            self.skipTest('Assembler file not found: ' + ASSEMBLER_DIR + '/middle.s')
+        builder = GNUx86AssemblerCallGraphBuilder(ASSEMBLER_DIR, moduleIndex = self.moduleIndex)
+        self.assertEqual(ASSEMBLER_DIR + '/middle.s', builder.getModuleFilePath('next'))
+        self.assertIsNone(builder.getModuleFilePath('nonexisting'))
+
+    def testStatements(self):
+        srcDir = self.writeSource('a.f90', 'module foo; implicit none\nend module foo\nmodule &\n  & bar ! continued\nend module\nPROGRAM &\n  baz\nEND PROGRAM baz\n')
+        moduleIndex = ModuleFileIndex(FileNameIndex(srcDir), self.cacheDir)
+        self.assertEqual(['foo', 'bar', 'baz'], list(moduleIndex.getModuleNames()))
+
+    def testSourceFilesNotIndexed(self):
+        srcDir = self.writeSource('foo.f90', 'module foo; implicit none\nend module foo\n')
+        sourceFiles = SourceFiles(srcDir, moduleIndex = self.moduleIndex)
+        self.assertIsNone(self.moduleIndex.findModuleFile('foo'))
+        self.assertIsNotNone(sourceFiles.findModule('foo'))
+        self.assertEqual('foo.f90', sourceFiles.findModuleFile('foo').getFileName())
+
+    def testAssemblerNotIndexed(self):
+        if not os.path.exists(ASSEMBLER_DIR + '/top.s'):
+            self.skipTest('Assembler file not found: ' + ASSEMBLER_DIR + '/top.s')
+        moduleIndex = ModuleFileIndex(FileNameIndex(self.writeSource('other.f90', '')), self.cacheDir)
+        builder = GNUx86AssemblerCallGraphBuilder(ASSEMBLER_DIR, moduleIndex = moduleIndex)
+        self.assertEqual(ASSEMBLER_DIR + '/top.s', builder.getModuleFilePath('top'))
+        callGraph = builder.buildCallGraph(SubroutineFullName('__top_MOD_tiptop'))
+        expected = GNUx86AssemblerCallGraphBuilder(ASSEMBLER_DIR).buildCallGraph(SubroutineFullName('__top_MOD_tiptop'))
+        self.assertEqual(expected.getAllSubroutineNames(), callGraph.getAllSubroutineNames())
+        self.assertEqual(3, len(callGraph.getAllSubroutineNames()))
+
+    def writeSource(self, fileName, content):
+        srcDir = os.path.join(self.tmpDir, 'src')
+        if not os.path.exists(srcDir):
+            os.makedirs(srcDir)
+        with open(os.path.join(srcDir, fileName), 'w') as f:
+            f.write(content)
+        return srcDir
+
+    def testIncremental(self):
+        srcDir = os.path.join(self.tmpDir, 'src')
+        os.makedirs(srcDir)
+        with open(os.path.join(srcDir, 'a.f90'), 'w') as f:
+            f.write('MODULE alpha\nEND MODULE alpha\n')
+        moduleIndex = ModuleFileIndex(FileNameIndex(srcDir), self.cacheDir)
+        self.assertEqual('a.f90', moduleIndex.findModuleFileName('alpha'))
+
+        with open(os.path.join(srcDir, 'a.f90'), 'w') as f:
+            f.write('MODULE beta ! renamed\n  INTERFACE x\n    MODULE PROCEDURE y\n  END INTERFACE\nEND MODULE beta\n')
+        moduleIndex = ModuleFileIndex(FileNameIndex(srcDir), self.cacheDir)
+        self.assertIsNone(moduleIndex.findModuleFileName('alpha'))
+        self.assertEqual('a.f90', moduleIndex.findModuleFileName('beta'))
+        self.assertEqual(['beta'], list(moduleIndex.getModuleNames()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assemblercalls import AssemblerCallTable
+from objectcalls import ObjectFileCallTable
+from assembler import GNUx86AssemblerCallGraphBuilder, ObjectFileCallGraphBuilder, GlobalObjectFileCallGraphBuilder
+from source import SubroutineFullName
+
+ASSEMBLER = '''	.file	"test.f90"
+	.text
+	.file 1 "test.f90"
+	.type	inner.1, @function
+inner.1:
+	.loc 1 20 9
+	.cfi_startproc
+	pushq	%rbp
+	.loc 1 21 9
+	call	__other_MOD_callee@PLT
+	popq	%rbp
+	ret
+	.cfi_endproc
+	.size	inner.1, .-inner.1
+	.type	__test_MOD_outer._omp_fn.0, @function
+__test_MOD_outer._omp_fn.0:
+	.cfi_startproc
+	.loc 1 15 11
+	call	__other_MOD_parallel@PLT
+	ret
+	.cfi_endproc
+	.size	__test_MOD_outer._omp_fn.0, .-__test_MOD_outer._omp_fn.0
+	.globl	__test_MOD_outer
+	.type	__test_MOD_outer, @function
+__test_MOD_outer:
+	.loc 1 10 5
+	.cfi_startproc
+	.loc 1 12 7
+	call	__other_MOD_callee@PLT
+	.loc 1 13 7 is_stmt 0 discriminator 2
+	call	inner.1
+	call	_gfortran_st_write@PLT
+	leaq	__test_MOD_outer._omp_fn.0(%rip), %rdi
+	call	GOMP_parallel@PLT
+	movl	$232, %eax
+	call	__test_MOD_outer
+	ret
+	.cfi_endproc
+	.size	__test_MOD_outer, .-__test_MOD_outer
+'''
+
+'''
+Tests whether the call tables and call graphs read from object files equal the ones read from the assembler files they were assembled from
+'''
+class ObjectFileCallTableTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        if shutil.which('as') is None:
+            self.skipTest('GNU assembler not available')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def assemble(self, assemblerFilePath):
+        objectFilePath = os.path.join(self.tmpDir, os.path.basename(assemblerFilePath)[:-2] + '.o')
+        subprocess.check_call(['as', '-o', objectFilePath, assemblerFilePath])
+        return objectFilePath
+
+    def testParseFile(self):
+        assemblerFilePath = os.path.join(self.tmpDir, 'test.s')
+        with open(assemblerFilePath, 'w') as assemblerFile:
+            assemblerFile.write(ASSEMBLER)
+        functions = ObjectFileCallTable.parseFile(self.assemble(assemblerFilePath))
+        self.assertEqual(AssemblerCallTable.parseFile(assemblerFilePath), functions)
+        self.assertEqual([('__other_MOD_callee', 12, 0), ('inner.1', 13, 2), ('__test_MOD_outer._omp_fn.0', None, None), ('__test_MOD_outer', 13, 2)], functions['__test_MOD_outer'])
+
+    def testNoObjectFile(self):
+        assemblerFilePath = os.path.join(self.tmpDir, 'test.s')
+        with open(assemblerFilePath, 'w') as assemblerFile:
+            assemblerFile.write(ASSEMBLER)
+        self.assertRaises(ValueError, ObjectFileCallTable.parseFile, assemblerFilePath)
+
+    def assertSameCallGraphs(self, sampleDir):
+        assemblerDir = os.path.join(SAMPLES_DIR, sampleDir)
+        assemblerFilePaths = [os.path.join(assemblerDir, fileName) for fileName in sorted(os.listdir(assemblerDir)) if fileName.endswith('.s')]
+        if not assemblerFilePaths:
+            self.skipTest('No assembler files in ' + assemblerDir)
+        labels = set()
+        for assemblerFilePath in assemblerFilePaths:
+            functions = ObjectFileCallTable.parseFile(self.assemble(assemblerFilePath))
+            expected = AssemblerCallTable.parseFile(assemblerFilePath)
+            for label, calls in functions.items():
+                self.assertEqual(expected[label], calls, label)
+                if SubroutineFullName.validFullName(label):
+                    labels.add(label)
+
+        assemblerBuilder = GNUx86AssemblerCallGraphBuilder(assemblerDir)
+        objectFileBuilder = ObjectFileCallGraphBuilder(self.tmpDir)
+        globalObjectFileBuilder = GlobalObjectFileCallGraphBuilder(self.tmpDir, processes = 1)
+        for label in sorted(labels):
+            root = SubroutineFullName(label)
+            expected = json.dumps(assemblerBuilder.buildCallGraph(root).serialize())
+            self.assertEqual(expected, json.dumps(objectFileBuilder.buildCallGraph(root).serialize()), label)
+            self.assertEqual(json.loads(expected), globalObjectFileBuilder.buildCallGraph(root).serialize(), label)
+
+    def testUse(self):
+        self.assertSameCallGraphs('use')
+
+    def testInner(self):
+        self.assertSameCallGraphs('inner')
+
+    def testRecursion(self):
+        self.assertSameCallGraphs('recursion')
+
+    def testOpenMP(self):
+        self.assertSameCallGraphs('openmp')
+
+if __name__ == "__main__":
+    unittest.main()
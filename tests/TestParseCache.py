@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import multiprocessing
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SOURCE_DIR = TEST_DIR + '/samples/use'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SourceFiles, SourceFile, SubroutineFullName
+from parsecache import SourceFileCache
+
+def saveStatistics(cacheDir):
+    for _ in range(5):
+        parseCache = SourceFileCache(cacheDir)
+        parseCache.addStatistics(1, 0, 0.0, 0.0)
+        parseCache.saveStatistics()
+
+'''
+Tests for the parallel pre-parsing and the cache of parse results
+'''
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.srcDir = os.path.join(self.tmpDir, 'src')
+        shutil.copytree(SOURCE_DIR, self.srcDir)
+        self.parseCache = SourceFileCache(os.path.join(self.tmpDir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def testParseAll(self):
+        sourceFiles = SourceFiles(self.srcDir, parseCache = self.parseCache)
+        self.assertEqual((3, 0), sourceFiles.parseAll(2))
+        self.assertEqual((0, 3), sourceFiles.parseAll(2))
+
+    def testCachedSourceFile(self):
+        path = os.path.join(self.srcDir, 'middle.f90')
+        fresh = SourceFile(path, parseCache = self.parseCache)
+        self.assertFalse(fresh.isFromCache())
+        cached = SourceFile(path, parseCache = self.parseCache)
+        self.assertTrue(cached.isFromCache())
+
+        self.assertEqual(fresh.getStatements(), cached.getStatements())
+        self.assertEqual(set(fresh.getModules().keys()), set(cached.getModules().keys()))
+        for name, module in fresh.getModules().items():
+            cachedModule = cached.getModule(name)
+            self.assertEqual(module.getIndex(), cachedModule.getIndex())
+            self.assertEqual(module.getLines(), cachedModule.getLines())
+            self.assertEqual(module.getStatements(), cachedModule.getStatements())
+            self.assertEqual(set(module.getSubroutines().keys()), set(cachedModule.getSubroutines().keys()))
+            for subroutineName, subroutine in module.getSubroutines().items():
+                cachedSubroutine = cachedModule.getSubroutine(subroutineName)
+                self.assertEqual(subroutine.getName(), cachedSubroutine.getName())
+                self.assertEqual(subroutine.isFunction(), cachedSubroutine.isFunction())
+                self.assertEqual(subroutine.getLines(), cachedSubroutine.getLines())
+                self.assertEqual(subroutine.getStatements(), cachedSubroutine.getStatements())
+
+        sourceFiles = SourceFiles(self.srcDir, parseCache = self.parseCache)
+        self.assertTrue(sourceFiles.existsSubroutine(SubroutineFullName('__middle_MOD_medium')))
+
+    def testModifiedFile(self):
+        path = os.path.join(self.srcDir, 'top.f90')
+        SourceFile(path, parseCache = self.parseCache)
+        with open(path, 'a') as f:
+            f.write('\nMODULE appended\nEND MODULE appended\n')
+        sourceFile = SourceFile(path, parseCache = self.parseCache)
+        self.assertFalse(sourceFile.isFromCache())
+        self.assertIn('appended', sourceFile)
+
+    def testContentHash(self):
+        path = os.path.join(self.srcDir, 'top.f90')
+        SourceFile(path, parseCache = self.parseCache)
+        copy = os.path.join(self.srcDir, 'copy.f90')
+        shutil.copy(path, copy)
+        os.utime(copy, (0, 0))
+        self.assertTrue(SourceFile(copy, parseCache = self.parseCache).isFromCache())
+        self.assertFalse(SourceFile(copy, preprocessed = True, parseCache = self.parseCache).isFromCache())
+
+    def testStatistics(self):
+        sourceFiles = SourceFiles(self.srcDir, parseCache = self.parseCache)
+        sourceFiles.parseAll(2)
+        self.assertEqual(0, self.parseCache.getHitCount())
+        self.assertEqual(3, self.parseCache.getMissCount())
+        self.assertGreater(self.parseCache.getParseTime(), 0.0)
+        self.parseCache.saveStatistics()
+
+        parseCache = SourceFileCache(self.parseCache.getCacheDir())
+        SourceFiles(self.srcDir, parseCache = parseCache).parseAll(2)
+        self.assertEqual(3, parseCache.getHitCount())
+        self.assertEqual(0, parseCache.getMissCount())
+        parseCache.saveStatistics()
+
+        runs = parseCache.loadStatistics()
+        self.assertEqual(2, len(runs))
+        self.assertEqual([0, 3], [run['hits'] for run in runs])
+        self.assertEqual([3, 0], [run['misses'] for run in runs])
+
+    def testConcurrentStatistics(self):
+        cacheDir = self.parseCache.getCacheDir()
+        processes = [multiprocessing.Process(target = saveStatistics, args = (cacheDir, )) for _ in range(8)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(40, len(self.parseCache.loadStatistics()))
+
+if __name__ == "__main__":
+    unittest.main()
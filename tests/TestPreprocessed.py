@@ -73,6 +73,17 @@ class TypeProcedureTest(unittest.TestCase):
     def testOffset(self):
         sourceFile = self.sourceFiles.findSourceFile('preprocessed.f90')
         self.assertEqual(11, sourceFile.getPreprocessorOffset(47))
+        
+    def testLineMap(self):
+        lineMap = self.sourceFiles.findSourceFile('preprocessed.f90').getLineMap()
+        self.assertEqual(6, len(lineMap))
+        self.assertEqual('../src/preprocessed.f90', lineMap.getMainFileName())
+        self.assertEqual('../src/interface.inc', lineMap.getFileName(12))
+        self.assertEqual('../src/preprocessed.f90', lineMap.getFileName(47))
+        self.assertEqual(36, lineMap.toOriginalLineNumber(47))
+        self.assertEqual(47, lineMap.toPreprocessedLineNumber(36))
+        self.assertEqual(12, lineMap.toPreprocessedLineNumber(2, '../src/interface.inc'))
+        self.assertEqual([36, 2, 4], lineMap.toOriginalLineNumbers([47, 12, 8]))
     
     def testTracker(self):
         if not self.filesExist:
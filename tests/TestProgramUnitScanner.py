@@ -0,0 +1,89 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import glob
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from source import SourceFile, Module, ProgramUnitScanner, SubroutineFullName
+
+TRICKY_SOURCE = '''x = 1 ! statement before module
+MODULE tricky ! subroutine in comment
+  TYPE :: t
+  CONTAINS
+    PROCEDURE :: p
+  END TYPE
+  CHARACTER(len=20) :: str = 'SUBROUTINE fake(x)'
+  INTERFACE
+    SUBROUTINE ext(a)
+    END SUBROUTINE ext
+  END INTERFACE
+CONTAINS
+
+  ! doc
+  SUBROUTINE s1(a, &
+! comment inside
+      b)
+    INTEGER :: a, b
+  CONTAINS
+    SUBROUTINE inner()
+    END SUBROUTINE
+  END SUBROUTINE s1
+  INTEGER FUNCTION f(&
+    x)
+    INTEGER :: x
+  END FUNCTION f
+END MODULE tricky
+'''
+
+'''
+Tests for the lazy module and subroutine boundary detection
+'''
+class ProgramUnitScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def testTricky(self):
+        path = os.path.join(self.tmpDir, 'tricky.f90')
+        with open(path, 'w') as f:
+            f.write(TRICKY_SOURCE)
+        sourceFile = SourceFile(path)
+        self.assertEqual([('tricky', 0, 2, 2, 27, [('s1', False, 14, 15, 22), ('f', True, 23, 23, 26)])], ProgramUnitScanner(sourceFile).scan())
+        self.assertSameAsStatementBased(sourceFile)
+
+    def testSamples(self):
+        for path in glob.glob(SAMPLES_DIR + '/**/*.f90', recursive = True):
+            self.assertSameAsStatementBased(SourceFile(path, 'preprocessed' in path))
+
+    def testLazyStatements(self):
+        sourceFile = SourceFile(SAMPLES_DIR + '/use/middle.f90')
+        module = sourceFile.getModule('middle')
+        self.assertIn(SubroutineFullName('__middle_MOD_medium'), sourceFile)
+        self.assertFalse(module.hasStatements())
+
+        subroutine = module.getSubroutine('medium')
+        self.assertEqual(SourceFile.sliceStatements(sourceFile.getStatements(), subroutine.getFirstLineNumber(), subroutine.getLastLineNumber()), subroutine.getStatements())
+        self.assertFalse(module.hasStatements())
+        self.assertEqual(subroutine.getStatements()[0][0], subroutine.getDeclarationLineNumber())
+
+    def assertSameAsStatementBased(self, sourceFile):
+        '''Compares with the subroutines found on the complete statements of the module'''
+        for name, module in sourceFile.getModules().items():
+            statements = SourceFile.sliceStatements(sourceFile.getStatements(), module.getFirstLineNumber(), module.getLastLineNumber())
+            reference = Module(name, module.getFirstLineNumber(), module.getLastLineNumber(), sourceFile, module.getIndex(), statements)
+            self.assertEqual(statements[0][0], module.getDeclarationLineNumber(), sourceFile.getPath())
+            self.assertEqual(reference.getSubroutineRanges(), module.getSubroutineRanges(), sourceFile.getPath())
+
+if __name__ == "__main__":
+    unittest.main()
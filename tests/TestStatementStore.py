@@ -0,0 +1,78 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from statementstore import StatementStore, StatementView
+
+'''
+Tests for the columnar statement storage
+'''
+class StatementStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.statements = [(1, 'module m', 1), (3, 'integer::a', 4), (3, 'integer::b', 4), (6, 'contains', 6), (7, '', 7), (8, 'end module m', 8)]
+        self.store = StatementStore(self.statements)
+        self.view = self.store.getView()
+
+    def testIndex(self):
+        self.assertEqual(len(self.statements), len(self.store))
+        self.assertEqual(len(self.statements), len(self.view))
+        for i, statement in enumerate(self.statements):
+            self.assertEqual(statement, self.view[i])
+            self.assertEqual(statement, self.store.getStatement(i))
+        self.assertEqual((8, 'end module m', 8), self.view[-1])
+        self.assertEqual((1, 'module m', 1), self.view[-6])
+        self.assertRaises(IndexError, self.view.__getitem__, 6)
+        self.assertRaises(IndexError, self.view.__getitem__, -7)
+
+    def testIteration(self):
+        self.assertEqual(self.statements, list(self.view))
+        self.assertEqual(list(reversed(self.statements)), list(reversed(self.view)))
+        self.assertEqual(self.statements[2:5], list(self.view[2:5]))
+
+    def testSlice(self):
+        part = self.view[1:4]
+        self.assertIsInstance(part, StatementView)
+        self.assertIs(self.store, part.getStore())
+        self.assertEqual(self.statements[1:4], part)
+        self.assertEqual(self.statements[2:3], part[1:2])
+        self.assertEqual((6, 'contains', 6), part[-1])
+        self.assertEqual(self.statements[-2:], self.view[-2:])
+        self.assertEqual(0, len(self.view[4:2]))
+        self.assertEqual(self.statements[::2], self.view[::2])
+
+    def testEquality(self):
+        self.assertEqual(self.view, self.store.getView())
+        self.assertEqual(self.view, StatementStore(self.statements).getView())
+        self.assertEqual(self.view, tuple(self.statements))
+        self.assertNotEqual(self.view, self.statements[1:])
+        self.assertNotEqual(self.view[1:2], [(3, 'integer::b', 4)])
+        self.assertNotEqual(self.view, 'module m')
+
+    def testSliceByLineNumbers(self):
+        self.assertEqual(self.statements[1:4], self.view.sliceByLineNumbers(2, 6))
+        self.assertEqual(self.statements[1:3], self.view.sliceByLineNumbers(3, 3))
+        self.assertEqual(self.statements[3:5], self.view[2:].sliceByLineNumbers(5, 7))
+        self.assertEqual([], self.view.sliceByLineNumbers(9, 10))
+        self.assertEqual(6, self.view[2:].getFirstLineNumber(1))
+        self.assertEqual(8, self.view.getFirstLineNumber(-1))
+
+    def testEmpty(self):
+        empty = StatementStore().getView()
+        self.assertEqual(0, len(empty))
+        self.assertEqual([], list(empty))
+        self.assertEqual([], empty)
+        self.assertEqual([], empty.sliceByLineNumbers(1, 10))
+        self.assertRaises(IndexError, empty.__getitem__, 0)
+
+    def testMemorySize(self):
+        self.assertGreater(self.store.getMemorySize(), sum(len(statement[1]) for statement in self.statements))
+
+if __name__ == "__main__":
+    unittest.main()
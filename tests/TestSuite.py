@@ -22,6 +22,23 @@ import TestVariable
 import TestLineNumbers
 import TestLines2Statements
 import TestConfigurator
+import TestFileIndex
+import TestModuleIndex
+import TestParseCache
+import TestLineStore
+import TestProgramUnitScanner
+import TestStatementStore
+import TestLineMap
+import TestMemoryLimit
+import TestAssemblerCallTable
+import TestGlobalCallGraph
+import TestCallGraphBuilder
+import TestObjectFileCallTable
+import TestCallGraphInfoTable
+import TestTreeCache
+import TestCallGraph
+import TestCompactCallGraph
+import TestFileManifest
 
 # initialize the test suite
 loader = unittest.TestLoader()
@@ -47,6 +64,23 @@ suite.addTests(loader.loadTestsFromModule(TestVariable))
 suite.addTests(loader.loadTestsFromModule(TestLineNumbers))
 suite.addTests(loader.loadTestsFromModule(TestLines2Statements))
 suite.addTests(loader.loadTestsFromModule(TestConfigurator))
+suite.addTests(loader.loadTestsFromModule(TestFileIndex))
+suite.addTests(loader.loadTestsFromModule(TestModuleIndex))
+suite.addTests(loader.loadTestsFromModule(TestParseCache))
+suite.addTests(loader.loadTestsFromModule(TestLineStore))
+suite.addTests(loader.loadTestsFromModule(TestProgramUnitScanner))
+suite.addTests(loader.loadTestsFromModule(TestStatementStore))
+suite.addTests(loader.loadTestsFromModule(TestLineMap))
+suite.addTests(loader.loadTestsFromModule(TestMemoryLimit))
+suite.addTests(loader.loadTestsFromModule(TestAssemblerCallTable))
+suite.addTests(loader.loadTestsFromModule(TestGlobalCallGraph))
+suite.addTests(loader.loadTestsFromModule(TestCallGraphBuilder))
+suite.addTests(loader.loadTestsFromModule(TestObjectFileCallTable))
+suite.addTests(loader.loadTestsFromModule(TestCallGraphInfoTable))
+suite.addTests(loader.loadTestsFromModule(TestTreeCache))
+suite.addTests(loader.loadTestsFromModule(TestCallGraph))
+suite.addTests(loader.loadTestsFromModule(TestCompactCallGraph))
+suite.addTests(loader.loadTestsFromModule(TestFileManifest))
 
 # initialize a runner, pass it your suite and run it
 runner = unittest.TextTestRunner(verbosity=3)
@@ -0,0 +1,175 @@
+#!/usr/bin/python
+
+import unittest
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SAMPLES_DIR = TEST_DIR + '/samples'
+
+FCG_DIR = TEST_DIR + '/..'
+sys.path.append(FCG_DIR)
+
+from assembler import GNUx86AssemblerCallGraphBuilder, CallGraphInfoCallGraphBuilder
+from callgraphinfo import CallGraphInfoTable
+from assemblercalls import AssemblerCallTable
+from treecache import CachedAssemblerCallGraphBuilder, CallGraphStore
+from supertypes import CallGraphBuilder
+from source import SubroutineFullName
+
+class WithoutSourcesBuilder(CallGraphBuilder):
+    def __init__(self, assemblerDir):
+        self.builder = GNUx86AssemblerCallGraphBuilder(assemblerDir)
+        self.builtRoots = []
+
+    def buildCallGraph(self, rootSubroutine):
+        self.builtRoots.append(rootSubroutine)
+        return self.builder.buildCallGraph(rootSubroutine)
+
+    def getModuleFilePath(self, moduleName):
+        return self.builder.getModuleFilePath(moduleName)
+
+class RecordingCallTable(AssemblerCallTable):
+    def __init__(self):
+        super(RecordingCallTable, self).__init__()
+        self.readFiles = []
+
+    def getFunctions(self, filePath):
+        if os.path.basename(filePath) not in self.readFiles:
+            self.readFiles.append(os.path.basename(filePath))
+        return super(RecordingCallTable, self).getFunctions(filePath)
+
+'''
+Tests for the call graph cache, which only rereads changed assembler files
+'''
+class TreeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.assemblerDir = os.path.join(self.tmpDir, 'use')
+        os.makedirs(self.assemblerDir)
+        for fileName in ('top.s', 'middle.s', 'bottom.s'):
+            shutil.copy(os.path.join(SAMPLES_DIR, 'use', fileName), self.assemblerDir)
+        self.root = SubroutineFullName('__top_MOD_tiptop')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def buildCallGraph(self, clear = False, root = None):
+        self.callTable = RecordingCallTable()
+        builder = CachedAssemblerCallGraphBuilder(self.cacheDir, GNUx86AssemblerCallGraphBuilder(self.assemblerDir, callTable = self.callTable, threads = 0))
+        return builder.buildCallGraph(root or self.root, clear)
+
+    def expectedCallGraph(self, root = None):
+        return json.dumps(GNUx86AssemblerCallGraphBuilder(self.assemblerDir).buildCallGraph(root or self.root).serialize())
+
+    def changeFile(self, fileName, old, new):
+        filePath = os.path.join(self.assemblerDir, fileName)
+        with open(filePath) as assemblerFile:
+            content = assemblerFile.read()
+        self.assertIn(old, content)
+        with open(filePath, 'w') as assemblerFile:
+            assemblerFile.write(content.replace(old, new))
+        os.utime(filePath, (1, 1))
+
+    def testUnchanged(self):
+        expected = json.dumps(self.buildCallGraph().serialize())
+        self.assertEqual(['top.s', 'middle.s', 'bottom.s'], self.callTable.readFiles)
+        self.assertEqual(expected, json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+        self.assertEqual(expected, json.dumps(self.buildCallGraph(True).serialize()))
+        self.assertEqual(['top.s', 'middle.s', 'bottom.s'], self.callTable.readFiles)
+
+    def testChangedFile(self):
+        self.buildCallGraph()
+        self.changeFile('bottom.s', '_gfortran_st_write', '_gfortran_st_read')
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual(['bottom.s'], self.callTable.readFiles)
+
+    def testTouchedFile(self):
+        self.buildCallGraph()
+        os.utime(os.path.join(self.assemblerDir, 'bottom.s'), (time.time() + 10, ) * 2)
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+
+    def testNewSubtree(self):
+        self.buildCallGraph()
+        self.changeFile('middle.s', 'call\t__bottom_MOD_butt_x@PLT', 'call\t__middle_MOD_average_f@PLT')
+        callGraph = self.buildCallGraph()
+        self.assertEqual(self.expectedCallGraph(), json.dumps(callGraph.serialize()))
+        self.assertEqual(['middle.s'], self.callTable.readFiles)
+        self.assertIn(SubroutineFullName('__middle_MOD_average_f'), callGraph)
+        self.assertNotIn(SubroutineFullName('__bottom_MOD_butt_x'), callGraph)
+
+        # The calls read from bottom.s are still stored
+        self.changeFile('middle.s', 'call\t__middle_MOD_average_f@PLT', 'call\t__bottom_MOD_butt_x@PLT')
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual(['middle.s'], self.callTable.readFiles)
+
+    def testOtherRoot(self):
+        self.buildCallGraph()
+        root = SubroutineFullName('__middle_MOD_medium')
+        self.assertEqual(self.expectedCallGraph(root), json.dumps(self.buildCallGraph(root = root).serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+        self.changeFile('bottom.s', '_gfortran_st_write', '_gfortran_st_read')
+        self.assertEqual(self.expectedCallGraph(root), json.dumps(self.buildCallGraph(root = root).serialize()))
+        self.assertEqual(['bottom.s'], self.callTable.readFiles)
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+
+    def testCallGraphWithoutFiles(self):
+        graphBuilder = WithoutSourcesBuilder(self.assemblerDir)
+        builder = CachedAssemblerCallGraphBuilder(self.cacheDir, graphBuilder)
+        expected = json.dumps(builder.buildCallGraph(self.root).serialize())
+        self.assertEqual(expected, json.dumps(builder.buildCallGraph(self.root).serialize()))
+        self.assertEqual([self.root], graphBuilder.builtRoots)
+
+        os.utime(os.path.join(self.assemblerDir, 'bottom.s'), (time.time() + 10, ) * 2)
+        self.assertEqual(expected, json.dumps(builder.buildCallGraph(self.root).serialize()))
+        self.assertEqual([self.root], graphBuilder.builtRoots)
+
+        self.changeFile('bottom.s', '_gfortran_st_write', '_gfortran_st_read')
+        self.assertEqual(self.expectedCallGraph(), json.dumps(builder.buildCallGraph(self.root).serialize()))
+        self.assertEqual([self.root, self.root], graphBuilder.builtRoots)
+
+    def testCorruptStore(self):
+        os.makedirs(self.cacheDir)
+        with open(os.path.join(self.cacheDir, CallGraphStore.getFileName(AssemblerCallTable.SUB_DIR)), 'w') as storeFile:
+            storeFile.write('no database')
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual(self.expectedCallGraph(), json.dumps(self.buildCallGraph().serialize()))
+        self.assertEqual([], self.callTable.readFiles)
+
+    def testBackends(self):
+        with open(os.path.join(self.assemblerDir, 'top.ci'), 'w') as callGraphFile:
+            callGraphFile.write('graph: { title: "top.f90"\n'
+                                'node: { title: "__top_MOD_tiptop" label: "tiptop\\ntop.f90:5:14" }\n'
+                                'edge: { sourcename: "__top_MOD_tiptop" targetname: "__other_MOD_random" label: "top.f90:9:13" }\n'
+                                '}\n')
+        assemblerBuilder = GNUx86AssemblerCallGraphBuilder(self.assemblerDir)
+        callGraphInfoBuilder = CallGraphInfoCallGraphBuilder(self.assemblerDir)
+        expected = json.dumps(callGraphInfoBuilder.buildCallGraph(self.root).serialize())
+        self.assertNotEqual(self.expectedCallGraph(), expected)
+
+        for _ in range(2):
+            self.assertEqual(self.expectedCallGraph(), json.dumps(CachedAssemblerCallGraphBuilder(self.cacheDir, assemblerBuilder).buildCallGraph(self.root).serialize()))
+            self.assertEqual(expected, json.dumps(CachedAssemblerCallGraphBuilder(self.cacheDir, callGraphInfoBuilder).buildCallGraph(self.root).serialize()))
+        for backend in (AssemblerCallTable.SUB_DIR, CallGraphInfoTable.SUB_DIR):
+            self.assertTrue(os.path.isfile(os.path.join(self.cacheDir, CallGraphStore.getFileName(backend))))
+
+    def testLegacyFilesRemoved(self):
+        os.makedirs(self.cacheDir)
+        legacyFilePath = os.path.join(self.cacheDir, str(self.root) + CallGraphStore.LEGACY_FILE_SUFFIX)
+        with open(legacyFilePath, 'w') as legacyFile:
+            legacyFile.write('{}')
+        self.buildCallGraph()
+        self.assertFalse(os.path.exists(legacyFilePath))
+
+if __name__ == "__main__":
+    unittest.main()
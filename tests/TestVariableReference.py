@@ -18,7 +18,7 @@ class VariableReferenceTest(unittest.TestCase):
     
     def setUp(self):
         filE = SourceFile('test', isTestDummy = True)
-        module = Module('test', [], filE, 0)
+        module = Module('test', 1, 0, filE, 0)
         ttest = Type('ttest')
         ttest.setDeclaredIn(module)
         subroutineName = SubroutineFullName('__test_MOD_sub')
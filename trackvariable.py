@@ -41,6 +41,7 @@ class VariableTracker(CallGraphAnalyzer):
         self.__excludeFromRecursionVariables = set()
         self.__excludeFromRecursionRoutines = set()
         self.__outAssignments = set()
+        self.__originalLineNumbers = (None, dict())
     
     def getOutAssignments(self):
         return self.__outAssignments
@@ -225,6 +226,7 @@ class VariableTracker(CallGraphAnalyzer):
         variableReferences = set()
         subroutine = self.__sourceFiles.findSubroutine(subroutineName)
         if subroutine is not None:
+            self.__translateLineNumbers(subroutine, startAtLine)
             for lineNumber, statement, _ in subroutine.getStatements():
                 if startAtLine <= 0 or lineNumber >= startAtLine:
                     variableReferences |= self.__analyzeStatement(statement, subroutine, lineNumber)
@@ -677,16 +679,26 @@ class VariableTracker(CallGraphAnalyzer):
                         return subroutineFullName
         return None
     
+    def __translateLineNumbers(self, subroutine, startAtLine):
+        '''Translates the line numbers of all statements referencing the variable into original line numbers in one batch, see __findNextCalleesFromLine'''
+        self.__originalLineNumbers = (None, dict())
+        sourceFile = subroutine.getSourceFile()
+        if sourceFile is None or not len(sourceFile.getLineMap()):
+            return
+        variableRegEx = re.compile(r'^((.*[^a-z0-9_%])?)' + self.__variable.getName() + r'(([^a-z0-9_].*)?)$', re.IGNORECASE);
+        lineNumbers = [lineNumber for lineNumber, statement, _ in subroutine.getStatements() if (startAtLine <= 0 or lineNumber >= startAtLine) and variableRegEx.match(statement) is not None]
+        self.__originalLineNumbers = (subroutine.getName(), dict(zip(lineNumbers, sourceFile.getLineMap().toOriginalLineNumbers(lineNumbers))))
+    
     def __findNextCalleesFromLine(self, callerSubroutine, lineNumber):
-        lineNumber -= self.__findLineNumberOffset(callerSubroutine, lineNumber)
+        subroutineName, originalLineNumbers = self.__originalLineNumbers
+        if subroutineName == callerSubroutine.getName() and lineNumber in originalLineNumbers:
+            lineNumber = originalLineNumbers[lineNumber]
+        else:
+            sourceFile = callerSubroutine.getSourceFile()
+            if sourceFile is not None:
+                lineNumber = sourceFile.getLineMap().toOriginalLineNumber(lineNumber)
         return self.__callGraph.findNextCalleesFromLine(callerSubroutine.getName(), lineNumber)
     
-    def __findLineNumberOffset(self, subroutine, lineNumber):
-        sourceFile = subroutine.getSourceFile()
-        if sourceFile is not None:
-            return sourceFile.getPreprocessorOffset(lineNumber)
-        return 0
-    
     def __analyzeInnerSubroutineCall(self, regExMatch, subroutine, lineNumber):
         calledSubroutineSimpleName = regExMatch.group('routine').strip().lower()
         if self.__settings.matchIgnoreSubroutineRegex(calledSubroutineSimpleName):
@@ -8,22 +8,29 @@ class TreeLikeCallGraphPrinter(CallGraphPrinter):
     def printCallGraph(self, callGraph):
         assertType(callGraph, 'callGraph', CallGraph)
         
-        self.__printCallGraphRecursive(callGraph.getRoot(), callGraph, ());
-        
-    def __printCallGraphRecursive(self, rootSubroutine, callGraph, callStack):
-        if self._ignoreRegex is not None and self._ignoreRegex.match(rootSubroutine.getSimpleName()):
-            return
-        
-        level = len(callStack);
-        if self._maxLevel is None or level <= self._maxLevel:
-            if rootSubroutine in callStack:
-                printLine(self.__getTreeLine(level, rootSubroutine) + " [RECURSIVE]")
-                return;
-            else:
-                printLine(self.__getTreeLine(level, rootSubroutine))
-                callStack = callStack + (rootSubroutine,);
-                for calledSubroutine in callGraph.getSortedCallees(rootSubroutine):
-                        self.__printCallGraphRecursive(calledSubroutine, callGraph, callStack);
+        # callees[i] iterates over the callees of callStack[i - 1], callees[0] over the root
+        callStack = []
+        onCallStack = set()
+        callees = [iter((callGraph.getRoot(),))]
+        while callees:
+            subroutine = next(callees[-1], None)
+            if subroutine is None:
+                callees.pop()
+                if callStack:
+                    onCallStack.discard(callStack.pop())
+                continue
+            if self._ignoreRegex is not None and self._ignoreRegex.match(subroutine.getSimpleName()):
+                continue
+            
+            level = len(callStack);
+            if self._maxLevel is None or level <= self._maxLevel:
+                if subroutine in onCallStack:
+                    printLine(self.__getTreeLine(level, subroutine) + " [RECURSIVE]")
+                else:
+                    printLine(self.__getTreeLine(level, subroutine))
+                    callStack.append(subroutine)
+                    onCallStack.add(subroutine)
+                    callees.append(iter(callGraph.getSortedCallees(subroutine)))
 
     def __getTreeLine(self, level, subroutine):
         return str(level) + ' ' + (level * '  ') + str(subroutine);
\ No newline at end of file
@@ -1,78 +1,435 @@
 from assertions import assertType
 import os
+import sqlite3
+import glob
 from supertypes import CallGraphBuilder
-from source import SubroutineFullName
+from source import SubroutineFullName, InnerSubroutineName
 import json
 from callgraph import CallGraph
 from json.encoder import JSONEncoder
 from json.decoder import JSONDecoder
+from printout import printWarning
+from manifest import FileManifest
+from assembler import GNUx86AssemblerCallGraphBuilder
 
 class CachedAssemblerCallGraphBuilder(CallGraphBuilder):
+    '''Stores the call graphs built by another builder in a CallGraphStore in the cache directory, together with the assembler file each subroutine's calls were read from.
+       When some of these files have changed, only the calls of their subroutines are read again, the other calls are taken from the store.
+       This includes calls stored for other call graphs, when they were read from the assembler file of the subroutine's module.
+       The files are compared with their fingerprints in a FileManifest, so touching a file doesn't make its calls to be read again.
+       Call graphs built by builders which don't tell the files are stored together with the fingerprints of their modules' assembler files
+       and built again when any of these files has changed.'''
     
-    FILE_SUFFIX = '.tree'
+    ATTR_GRAPH = 'graph'
+    ATTR_FILES = 'files'
+    ATTR_MODULES_WITHOUT_FILE = 'modulesWithoutFile'
     
     def __init__(self, cacheDir, graphBuilder):
         assertType(graphBuilder, 'graphBuilder', CallGraphBuilder)
         
         self.__cacheDir = cacheDir;
         self.__graphBuilder = graphBuilder
-
+        backend = None
+        if isinstance(graphBuilder, GNUx86AssemblerCallGraphBuilder):
+            backend = graphBuilder.getCallTable().SUB_DIR
+        self.__store = CallGraphStore(cacheDir, backend)
+    
     def buildCallGraph(self, rootSubroutine, clear = False):
         assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
         assertType(clear, 'clear', bool)
         
-        callgraph = None
         if clear:
-            self.__clearGraph(rootSubroutine)
-        else:
-            callgraph = self.__loadGraph(rootSubroutine)
-            
-        if callgraph is None:
-            callgraph = self.__graphBuilder.buildCallGraph(rootSubroutine);
-            self.__saveGraph(callgraph)
-        
-        return callgraph
+            self.__store.removeRoot(rootSubroutine)
+            callgraph, sources = self.__graphBuilder.buildCallGraphWithSources(rootSubroutine)
+            self.__saveGraph(callgraph, sources, dict(), FileManifest())
+            return callgraph
+        return self.__loadGraph(rootSubroutine)
     
     def getModuleFilePath(self, moduleName):
         assertType(moduleName, 'moduleName', str)
-            
+        
         return self.__graphBuilder.getModuleFilePath(moduleName)
     
-    def __getCacheFilePath(self, subroutineName):
-        return os.path.join(self.__cacheDir, str(subroutineName) + CachedAssemblerCallGraphBuilder.FILE_SUFFIX)
-    
-    def __clearGraph(self, subroutineName):
-        cacheFilePath = self.__getCacheFilePath(subroutineName)
-        if os.path.isfile(cacheFilePath):
-            os.remove(cacheFilePath) 
-    
     def __loadGraph(self, subroutineName):
-        cacheFilePath = self.__getCacheFilePath(subroutineName)
-        if not os.path.isfile(cacheFilePath):
-            return None 
+        '''Returns the stored call graph, updated if necessary, or a new one'''
+        manifest = FileManifest()
+        modulePaths = dict()
+        knownCalls = _StoredCalls(lambda name: self.__findStoredCalls(name, manifest, modulePaths))
+        stored = self.__store.loadRoot(subroutineName)
+        if stored is not None:
+            subroutineCount, ser, members, fingerprints = stored
+            if ser is not None:
+                callgraph = self.__loadWholeGraph(subroutineName, ser)
+                if callgraph is not None:
+                    return callgraph
+            else:
+                for filePath, fingerprint in fingerprints.items():
+                    manifest.addFile(filePath, fingerprint)
+                changedFiles = manifest.findChangedFiles()
+                self.__store.updateFiles(manifest.takeUpdatedFingerprints())
+                unchanged = [member for member in members if member[2] is None or member[2] not in changedFiles]
+                if len(unchanged) == len(members) == subroutineCount:
+                    return self.__toCallGraph(members)
+                for subroutineId, name, filePath, calls in unchanged:
+                    knownCalls.putStoredCalls(name, subroutineId, calls, filePath)
         
-        cacheFile = open(cacheFilePath)
-        callgraph = json.load(cacheFile, cls=CallGraphJSONDecoder)
+        callgraph, sources = self.__graphBuilder.buildCallGraphWithSources(subroutineName, knownCalls)
+        self.__saveGraph(callgraph, sources, knownCalls.getStoredSubroutines(), manifest)
+        return callgraph
+    
+    def __saveGraph(self, callgraph, sources, storedSubroutines, manifest):
+        if sources is None:
+            self.__saveWholeGraph(callgraph, manifest)
+        else:
+            filePaths = sorted(set(filePath for filePath in sources.values() if filePath is not None))
+            self.__store.saveCallGraph(callgraph, sources, storedSubroutines, manifest.fingerprintFiles(filePaths))
+    
+    def __loadWholeGraph(self, subroutineName, ser):
+        '''Returns the call graph stored as a whole, if the assembler files of its modules are unchanged and no module without file has got one'''
+        try:
+            ser = json.loads(ser)
+            callgraph = CallGraph.deserialize(ser[CachedAssemblerCallGraphBuilder.ATTR_GRAPH])
+            manifest = FileManifest.deserialize(ser[CachedAssemblerCallGraphBuilder.ATTR_FILES])
+            modulesWithoutFile = ser[CachedAssemblerCallGraphBuilder.ATTR_MODULES_WITHOUT_FILE]
+        except (ValueError, KeyError, TypeError):
+            printWarning('Ignoring corrupt stored call graph: ' + str(subroutineName), 'CachedAssemblerCallGraphBuilder')
+            return None
         
-        cacheTime = os.path.getmtime(cacheFilePath)
-        for module in callgraph.getAllModuleNames():
-            moduleFilePath = self.getModuleFilePath(module)
-            if moduleFilePath is not None and os.path.getmtime(moduleFilePath) > cacheTime:
-                return None
+        if manifest.findChangedFiles() or any(self.getModuleFilePath(moduleName) is not None for moduleName in modulesWithoutFile):
+            return None
+        if manifest.takeUpdatedFingerprints():
+            self.__saveWholeGraph(callgraph, manifest)
+        return callgraph
+    
+    def __saveWholeGraph(self, callgraph, manifest):
+        '''Stores the call graph as a whole, together with the fingerprints of its modules' assembler files, taken from the manifest if they are unchanged'''
+        filePaths = []
+        modulesWithoutFile = []
+        for moduleName in sorted(callgraph.getAllModuleNames()):
+            moduleFilePath = self.getModuleFilePath(moduleName)
+            if moduleFilePath is None:
+                modulesWithoutFile.append(moduleName)
+            elif moduleFilePath not in filePaths:
+                filePaths.append(moduleFilePath)
         
-        return callgraph 
+        ser = dict()
+        ser[CachedAssemblerCallGraphBuilder.ATTR_GRAPH] = callgraph.serialize()
+        ser[CachedAssemblerCallGraphBuilder.ATTR_FILES] = FileManifest(manifest.fingerprintFiles(filePaths)).serialize()
+        ser[CachedAssemblerCallGraphBuilder.ATTR_MODULES_WITHOUT_FILE] = modulesWithoutFile
+        self.__store.saveWholeCallGraph(callgraph.getRoot(), json.dumps(ser))
     
-    def __saveGraph(self, callgraph):
-        subroutineName = callgraph.getRoot()
+    def __findStoredCalls(self, subroutineName, manifest, modulePaths):
+        '''Returns (subroutine ID, list of calls, file path) of calls stored for another call graph, or None.
+           Only calls read from the unchanged assembler file of the subroutine's module are taken, since the builder would read the same file.
+           modulePaths: Dictionary with the module file paths found so far'''
+        for subroutineId, filePath, fingerprint in self.__store.findSubroutines(subroutineName):
+            if filePath is not None:
+                manifest.addFile(filePath, fingerprint)
+                if manifest.isChanged(filePath):
+                    continue
+                self.__store.updateFiles(manifest.takeUpdatedFingerprints())
+                moduleName = subroutineName.getModuleName()
+                if moduleName not in modulePaths:
+                    modulePaths[moduleName] = self.getModuleFilePath(moduleName)
+                if filePath == modulePaths[moduleName]:
+                    return (subroutineId, self.__store.loadCalls(subroutineId), filePath)
+        return None
+    
+    @staticmethod
+    def __toCallGraph(members):
+        callgraph = CallGraph()
+        for _, name, _, _ in members:
+            callgraph.addSubroutine(name)
+        for _, name, _, calls in members:
+            for calleeName, lineNumber, discriminator in calls:
+                callgraph.addCall(name, calleeName, lineNumber, discriminator)
+        return callgraph
 
-        if not os.path.exists(self.__cacheDir):
-            os.makedirs(self.__cacheDir) 
+class _StoredCalls(dict):
+    '''Dictionary subroutine name => (list of calls, file path) for CallGraphBuilder.buildCallGraphWithSources.
+       Subroutines which aren't in the dictionary are looked up with the given function when the builder asks for them.'''
+
+    def __init__(self, findStoredCalls):
+        super(_StoredCalls, self).__init__()
+        self.__findStoredCalls = findStoredCalls
+        self.__subroutineIds = dict()
+        self.__notFound = set()
+
+    def __contains__(self, subroutineName):
+        if dict.__contains__(self, subroutineName):
+            return True
+        if subroutineName in self.__notFound:
+            return False
+        found = self.__findStoredCalls(subroutineName)
+        if found is None:
+            self.__notFound.add(subroutineName)
+            return False
+        self.putStoredCalls(subroutineName, *found)
+        return True
+
+    def __missing__(self, subroutineName):
+        if subroutineName in self:
+            return dict.__getitem__(self, subroutineName)
+        raise KeyError(subroutineName)
+
+    def putStoredCalls(self, subroutineName, subroutineId, calls, filePath):
+        self[subroutineName] = (calls, filePath)
+        self.__subroutineIds[subroutineName] = (subroutineId, filePath)
+
+    def getStoredSubroutines(self):
+        '''Returns the dictionary subroutine name => (subroutine ID, file path) of the subroutines taken from the store'''
+        return self.__subroutineIds
+
+class CallGraphStore(object):
+    '''SQLite database of the calls read from assembler files, shared by all call graphs in the cache directory.
+       The calls of a subroutine are stored once per assembler file they were read from, together with the fingerprint of the file, see FileManifest.
+       When the content of a file has changed, all subroutines stored for it are removed. For every root subroutine, the database holds the subroutines
+       of its call graph in their order, so the call graph is put together with one query over the indexed calls.
+       Call graphs of builders which don't tell the files are stored as a whole in JSON.
+       The database uses write-ahead logging, so several processes can read it while one of them writes.
+       Call graphs built from different kinds of files, e.g. assembler or object files, are stored in separate databases.
+       The .tree files of former versions are removed when a database is created.'''
+
+    FILE_PREFIX = 'callgraphs'
+    FILE_SUFFIX = '.sqlite'
+    LEGACY_FILE_SUFFIX = '.tree'
+    SCHEMA_VERSION = 2
+    TIMEOUT = 60
+
+    __SCHEMA = ('CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, size INTEGER, mtime INTEGER, inode INTEGER, hash TEXT)',
+                'CREATE TABLE subroutines (id INTEGER PRIMARY KEY, name TEXT NOT NULL, host TEXT NOT NULL, file INTEGER)',
+                'CREATE INDEX subroutinesByName ON subroutines (name, host)',
+                'CREATE INDEX subroutinesByFile ON subroutines (file)',
+                'CREATE TABLE calls (subroutine INTEGER NOT NULL, position INTEGER NOT NULL, callee TEXT NOT NULL, calleeHost TEXT NOT NULL, '
+                'lineNumber INTEGER NOT NULL, discriminator INTEGER NOT NULL, PRIMARY KEY (subroutine, position)) WITHOUT ROWID',
+                'CREATE TABLE roots (name TEXT PRIMARY KEY, subroutineCount INTEGER, graph TEXT)',
+                'CREATE TABLE rootSubroutines (root TEXT NOT NULL, position INTEGER NOT NULL, subroutine INTEGER NOT NULL, PRIMARY KEY (root, position)) WITHOUT ROWID')
+    __TABLES = ('files', 'subroutines', 'calls', 'roots', 'rootSubroutines')
+
+    def __init__(self, cacheDir, backend = None):
+        '''backend: Kind of the files the call graphs are built from, e.g. AssemblerCallTable.SUB_DIR'''
+        assertType(cacheDir, 'cacheDir', str)
+        assertType(backend, 'backend', str, True)
+
+        self.__filePath = os.path.join(cacheDir, CallGraphStore.getFileName(backend))
+        self.__connection = None
+        self.__pid = None
+        self.__names = dict()
+
+    @staticmethod
+    def getFileName(backend = None):
+        if backend is None:
+            return CallGraphStore.FILE_PREFIX + CallGraphStore.FILE_SUFFIX
+        return CallGraphStore.FILE_PREFIX + '-' + backend + CallGraphStore.FILE_SUFFIX
+
+    def getFilePath(self):
+        return self.__filePath
+
+    def loadRoot(self, rootSubroutine):
+        '''Returns None if there is no call graph stored for the given root, otherwise the tuple (subroutineCount, graph, members, fingerprints).
+           graph is the JSON text of a call graph stored as a whole, or None.
+           members is the list of the tuples (subroutine ID, subroutine name, file path, list of calls) in the order of the call graph,
+           fingerprints the dictionary file path => fingerprint of the members' files.'''
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
+
+        def load(connection):
+            root = connection.execute('SELECT subroutineCount, graph FROM roots WHERE name = ?', (str(rootSubroutine), )).fetchone()
+            if root is None:
+                return None
+            members = []
+            fingerprints = dict()
+            lastPosition = None
+            for row in connection.execute('SELECT rs.position, s.id, s.name, s.host, f.path, f.size, f.mtime, f.inode, f.hash, c.callee, c.calleeHost, c.lineNumber, c.discriminator '
+                                          'FROM rootSubroutines rs JOIN subroutines s ON s.id = rs.subroutine LEFT JOIN files f ON f.id = s.file '
+                                          'LEFT JOIN calls c ON c.subroutine = s.id WHERE rs.root = ? ORDER BY rs.position, c.position', (str(rootSubroutine), )):
+                if row[0] != lastPosition:
+                    lastPosition = row[0]
+                    members.append((row[1], self.__subroutineName(row[2], row[3]), row[4], []))
+                    if row[4] is not None:
+                        fingerprints[row[4]] = CallGraphStore.__fingerprint(row[5:9])
+                if row[9] is not None:
+                    members[-1][3].append((self.__subroutineName(row[9], row[10]), row[11], row[12]))
+            return root + (members, fingerprints)
+
+        return self.__transaction(load, 'BEGIN')
+
+    def findSubroutines(self, subroutineName):
+        '''Returns the list of tuples (subroutine ID, file path, fingerprint) of the stored calls of the given subroutine'''
+        rows = self.__transaction(lambda connection: connection.execute('SELECT s.id, f.path, f.size, f.mtime, f.inode, f.hash FROM subroutines s LEFT JOIN files f ON f.id = s.file '
+                                                                        'WHERE s.name = ? AND s.host = ?', self.__key(subroutineName)).fetchall())
+        return [(row[0], row[1], CallGraphStore.__fingerprint(row[2:])) for row in rows]
+
+    def loadCalls(self, subroutineId):
+        '''Returns the list of the calls (calleeName, lineNumber, discriminator) of the subroutine with the given ID, in their order'''
+        rows = self.__transaction(lambda connection: connection.execute('SELECT callee, calleeHost, lineNumber, discriminator FROM calls '
+                                                                        'WHERE subroutine = ? ORDER BY position', (subroutineId, )).fetchall())
+        return [(self.__subroutineName(callee, calleeHost), lineNumber, discriminator) for callee, calleeHost, lineNumber, discriminator in rows]
+
+    def updateFiles(self, fingerprints):
+        '''Stores new fingerprints of files whose content hasn't changed'''
+        assertType(fingerprints, 'fingerprints', dict)
+
+        if fingerprints:
+            self.__transaction(lambda connection: connection.executemany('UPDATE files SET size = ?, mtime = ?, inode = ?, hash = ? WHERE path = ?',
+                                                                         (tuple(fingerprint) + (filePath, ) for filePath, fingerprint in fingerprints.items())), 'BEGIN IMMEDIATE')
+
+    def removeRoot(self, rootSubroutine):
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
+
+        def remove(connection):
+            connection.execute('DELETE FROM roots WHERE name = ?', (str(rootSubroutine), ))
+            connection.execute('DELETE FROM rootSubroutines WHERE root = ?', (str(rootSubroutine), ))
+        self.__transaction(remove, 'BEGIN IMMEDIATE')
+
+    def saveCallGraph(self, callgraph, sources, storedSubroutines, fingerprints):
+        '''Stores the call graph with the files its subroutines' calls were read from.
+           sources: dictionary subroutine name => file path, see CallGraphBuilder.buildCallGraphWithSources
+           storedSubroutines: dictionary subroutine name => (subroutine ID, file path) of the subroutines whose calls were taken from the store
+           fingerprints: dictionary file path => current fingerprint of all files in sources'''
+        assertType(callgraph, 'callgraph', CallGraph)
+        assertType(sources, 'sources', dict)
+        assertType(storedSubroutines, 'storedSubroutines', dict)
+        assertType(fingerprints, 'fingerprints', dict)
+
+        def save(connection):
+            fileIds = dict()
+            changedFiles = set()
+            for filePath, fingerprint in sorted(fingerprints.items()):
+                values = tuple(fingerprint) if fingerprint is not None else (None, None, None, None)
+                row = connection.execute('SELECT id, size, mtime, inode, hash FROM files WHERE path = ?', (filePath, )).fetchone()
+                if row is None:
+                    fileIds[filePath] = connection.execute('INSERT INTO files (path, size, mtime, inode, hash) VALUES (?, ?, ?, ?, ?)', (filePath, ) + values).lastrowid
+                else:
+                    fileIds[filePath] = row[0]
+                    if row[1:] != values:
+                        if row[4] is None or row[4] != values[3]:
+                            changedFiles.add(filePath)
+                            connection.execute('DELETE FROM calls WHERE subroutine IN (SELECT id FROM subroutines WHERE file = ?)', (row[0], ))
+                            connection.execute('DELETE FROM subroutines WHERE file = ?', (row[0], ))
+                        connection.execute('UPDATE files SET size = ?, mtime = ?, inode = ?, hash = ? WHERE id = ?', values + (row[0], ))
+
+            subroutineIds = []
+            for subroutineName in callgraph.getAllSubroutineNames():
+                filePath = sources.get(subroutineName)
+                stored = storedSubroutines.get(subroutineName)
+                if stored is not None and stored[1] == filePath and filePath not in changedFiles:
+                    subroutineIds.append(stored[0])
+                    continue
+                name, host = self.__key(subroutineName)
+                fileId = fileIds.get(filePath)
+                connection.execute('DELETE FROM calls WHERE subroutine IN (SELECT id FROM subroutines WHERE name = ? AND host = ? AND file IS ?)', (name, host, fileId))
+                connection.execute('DELETE FROM subroutines WHERE name = ? AND host = ? AND file IS ?', (name, host, fileId))
+                subroutineId = connection.execute('INSERT INTO subroutines (name, host, file) VALUES (?, ?, ?)', (name, host, fileId)).lastrowid
+                connection.executemany('INSERT INTO calls (subroutine, position, callee, calleeHost, lineNumber, discriminator) VALUES (?, ?, ?, ?, ?, ?)',
+                                       ((subroutineId, position) + self.__key(calleeName) + (lineNumber, discriminator)
+                                        for position, (calleeName, lineNumber, discriminator) in enumerate(callgraph.getCallSites(subroutineName))))
+                subroutineIds.append(subroutineId)
+
+            root = str(callgraph.getRoot())
+            connection.execute('DELETE FROM rootSubroutines WHERE root = ?', (root, ))
+            connection.executemany('INSERT INTO rootSubroutines (root, position, subroutine) VALUES (?, ?, ?)', ((root, position, subroutineId) for position, subroutineId in enumerate(subroutineIds)))
+            connection.execute('INSERT OR REPLACE INTO roots (name, subroutineCount, graph) VALUES (?, ?, NULL)', (root, len(subroutineIds)))
+
+        self.__transaction(save, 'BEGIN IMMEDIATE')
+
+    def saveWholeCallGraph(self, rootSubroutine, graph):
+        '''Stores the JSON text of a call graph as a whole'''
+        assertType(rootSubroutine, 'rootSubroutine', SubroutineFullName)
+        assertType(graph, 'graph', str)
+
+        def save(connection):
+            connection.execute('DELETE FROM rootSubroutines WHERE root = ?', (str(rootSubroutine), ))
+            connection.execute('INSERT OR REPLACE INTO roots (name, subroutineCount, graph) VALUES (?, NULL, ?)', (str(rootSubroutine), graph))
+        self.__transaction(save, 'BEGIN IMMEDIATE')
+
+    @staticmethod
+    def __fingerprint(row):
+        '''Returns the fingerprint from the columns size, mtime, inode and hash, None for a file that was missing'''
+        if row[0] is None:
+            return None
+        return tuple(row)
+
+    def close(self):
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __transaction(self, function, begin = None):
+        '''Calls the function with the connection, within a transaction if begin is given'''
+        connection = self.__connect()
+        if begin is None:
+            return function(connection)
+        connection.execute(begin)
+        try:
+            result = function(connection)
+        except:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def __connect(self):
+        '''Opens the database, once per process, and creates the tables if the database is new, has another schema version or is corrupt'''
+        if self.__connection is not None and self.__pid == os.getpid():
+            return self.__connection
+
+        cacheDir = os.path.dirname(self.__filePath)
+        if cacheDir and not os.path.exists(cacheDir):
+            os.makedirs(cacheDir, exist_ok=True)
+        try:
+            connection = self.__open()
+        except sqlite3.DatabaseError:
+            printWarning('Ignoring corrupt cache database: ' + self.__filePath, 'CallGraphStore')
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.isfile(self.__filePath + suffix):
+                    os.remove(self.__filePath + suffix)
+            connection = self.__open()
+        self.__connection = connection
+        self.__pid = os.getpid()
+        return connection
+
+    def __open(self):
+        connection = sqlite3.connect(self.__filePath, timeout = CallGraphStore.TIMEOUT, isolation_level = None)
+        try:
+            connection.execute('PRAGMA journal_mode = WAL')
+            if connection.execute('PRAGMA user_version').fetchone()[0] != CallGraphStore.SCHEMA_VERSION:
+                connection.execute('BEGIN IMMEDIATE')
+                if connection.execute('PRAGMA user_version').fetchone()[0] != CallGraphStore.SCHEMA_VERSION:
+                    for table in CallGraphStore.__TABLES:
+                        connection.execute('DROP TABLE IF EXISTS ' + table)
+                    for statement in CallGraphStore.__SCHEMA:
+                        connection.execute(statement)
+                    connection.execute('PRAGMA user_version = ' + str(CallGraphStore.SCHEMA_VERSION))
+                    self.__removeLegacyFiles()
+                connection.execute('COMMIT')
+        except:
+            connection.close()
+            raise
+        return connection
+
+    def __removeLegacyFiles(self):
+        for filePath in glob.glob(os.path.join(glob.escape(os.path.dirname(self.__filePath)), '*' + CallGraphStore.LEGACY_FILE_SUFFIX)):
+            try:
+                os.remove(filePath)
+            except OSError:
+                pass
+
+    @staticmethod
+    def __key(subroutineName):
+        if isinstance(subroutineName, InnerSubroutineName):
+            return (str(subroutineName), str(subroutineName.getHostName()))
+        return (str(subroutineName), '')
+
+    def __subroutineName(self, name, host):
+        subroutineName = self.__names.get((name, host))
+        if subroutineName is None:
+            if host:
+                subroutineName = InnerSubroutineName(name, SubroutineFullName(host))
+            else:
+                subroutineName = SubroutineFullName(name)
+            self.__names[(name, host)] = subroutineName
+        return subroutineName
 
-        cacheFilePath = self.__getCacheFilePath(subroutineName)
-        cacheFile = open(cacheFilePath, 'w')
-        json.dump(callgraph, cacheFile, cls=CallGraphJSONEncoder)
-        cacheFile.close()
- 
 class CallGraphJSONEncoder(JSONEncoder):
      
     def default(self, o):